@@ -5,10 +5,16 @@ This module provides a FastAPI application for solving graph coloring problems,
 including special cases like antiprism graphs, using various optimization methods.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .api.endpoints import router as api_router
+from .api.metrics import router as metrics_router
+from .services.job_service import JOB_MANAGER
+from .services.metrics import Metrics_Middleware
+from .utils.render import RENDER_POOL
 
 # Application configuration
 GRAPH_ORDER_START = 3  # T_n
@@ -19,6 +25,13 @@ MAX_GRAPHS = -1         # Maximum number of graphs to process
 SAMPLE_GRAPHS = 3       # Number of sample graphs to generate
 OUTPUT_DIRECTORY = "../graphs/batches"
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick up batch jobs a previous process left unfinished
+    JOB_MANAGER.resume_pending()
+    yield
+    RENDER_POOL.shutdown()
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application.
     
@@ -28,7 +41,8 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="R-Dynamic Graph Coloring API",
         description="API for solving graph coloring problems with r-dynamic constraints",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
     
     # Configure CORS
@@ -40,8 +54,12 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Stamp requests for the parse phase of /metrics
+    app.add_middleware(Metrics_Middleware)
+    
     # Include API routes
     app.include_router(api_router, prefix="/api/v1")
+    app.include_router(metrics_router)
     
     return app
 
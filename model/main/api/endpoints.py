@@ -1,21 +1,29 @@
-from fastapi.responses import Response
+import asyncio
+import json
+from fastapi.responses import Response, StreamingResponse
 from ..schemas.request_plot import CirculantPlotRequest, Planar3TreePlotRequest
-from ..utils.network import plot_graph_to_bytes
+from ..utils.network import submit_graph_plot
+from ..utils.render import RENDER_POOL, Render_Queue_Full
 from fastapi import APIRouter, HTTPException
 from loguru import logger
-from typing import Dict, List
+from typing import Any, AsyncIterator, Dict, List, Literal, Union
 
 from ..auth.helper import AUTH_DEPENDENCIES
-from ..utils.planar3 import generate_planar_3_tree
-from ..utils.antiprism import create_antiprism_adjacency_matrix, create_circulant_adjacency_matrix
-from ..schemas.requests import ColoringGraphRequest, AntiprismRequest, AntiprismBatchRequest, Planar3TreeRequest, CirculantRequest, CirculantBatchRequest
+from ..utils.planar3 import generate_planar_3_tree, planar_3_tree_size
+from ..utils.antiprism import create_antiprism_graph, create_circulant_graph
+from ..schemas.requests import ColoringGraphRequest, AntiprismRequest, AntiprismBatchRequest, Planar3TreeRequest, CirculantRequest, CirculantBatchRequest, VerifyColoringRequest
+from ..coloring.verify import coloring_violations
 from ..services.coloring_service import ColoringService
+from ..services.job_service import JOB_MANAGER
+from ..services.metrics import request_parsed, request_phase
+from ..services.scheduler import SOLVER_SCHEDULER
+from ..services.solution_cache import SOLUTION_CACHE
 from ..utils.graph_utils import adjacency_matrix_to_adjacency_list
 
 router = APIRouter(dependencies=AUTH_DEPENDENCIES)
 
 @router.post("/color/graph")
-async def assign_colors(request: ColoringGraphRequest) -> Dict[str, Dict[int, int]]:
+async def assign_colors(request: ColoringGraphRequest) -> Dict[str, Any]:
     """
     Assign colors to a graph using the specified method.
     
@@ -23,26 +31,58 @@ async def assign_colors(request: ColoringGraphRequest) -> Dict[str, Dict[int, in
         request: The coloring request containing graph and parameters
         
     Returns:
-        Dictionary mapping vertices to their assigned colors
+        The coloring (null on timeout_no_solution), its status (optimal, feasible
+        or timeout_no_solution), colors used, proven lower bound and gap
     """
     try:
+        request_parsed('custom', request.method, len(request.graph))
         if request.graph_type == 'adjacency_matrix':
-            request.graph = adjacency_matrix_to_adjacency_list(request.graph)
+            with request_phase('convert', request.method, len(request.graph)):
+                request.graph = adjacency_matrix_to_adjacency_list(request.graph)
             
-        color_assignment = ColoringService.color_graph(
+        result = await ColoringService.color_graph_async(
             adjacency_list=request.graph,
             method=request.method,
             k=request.k,
-            r=request.r
+            r=request.r,
+            solver=request.solver,
+            threads=request.threads,
+            symmetry_breaking=request.symmetry_breaking,
+            time_limit=request.time_limit,
+            mip_gap=request.mip_gap
         )
         
-        return {"coloring": color_assignment}
+        return result.to_dict()
     except Exception as e:
         logger.error(f"Error in assign_colors: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/verify")
+async def verify_coloring(request: VerifyColoringRequest) -> Dict[str, Any]:
+    """
+    Check that a coloring is proper and r-dynamic.
+    
+    Args:
+        request: The graph, its coloring and r
+        
+    Returns:
+        Validity, colors used and every violating vertex
+    """
+    try:
+        request_parsed('custom', 'none', len(request.graph))
+        if request.graph_type == 'adjacency_matrix':
+            with request_phase('convert', 'none', len(request.graph)):
+                request.graph = adjacency_matrix_to_adjacency_list(request.graph)
+
+        with request_phase('verify', 'none', len(request.graph)):
+            violations = await asyncio.to_thread(coloring_violations, request.graph, request.coloring, request.r)
+        return violations.to_dict()
+    except Exception as e:
+        logger.error(f"Error in verify_coloring: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/circulant")
-async def circulant_assignment(request: CirculantRequest) -> Dict[str, Dict[int, int]]:
+async def circulant_assignment(request: CirculantRequest) -> Dict[str, Any]:
     """
     Assign colors to a circulant graph.
     
@@ -50,23 +90,31 @@ async def circulant_assignment(request: CirculantRequest) -> Dict[str, Dict[int,
         request: The circulant coloring request
         
     Returns:
-        Dictionary mapping vertices to their assigned colors
+        The coloring (null on timeout_no_solution), its status (optimal, feasible
+        or timeout_no_solution), colors used, proven lower bound and gap
     """
     try:
+        request_parsed('circulant', request.method, request.n)
         logger.info(f'Circulant Request: {request}')
         
-        adjacency_matrix = create_circulant_adjacency_matrix(request.n, *request.connections)
-        adjacency_list = adjacency_matrix_to_adjacency_list(adjacency_matrix)
-        logger.info(f'Adjacency List: {adjacency_list}')
+        with request_phase('generate', request.method, request.n):
+            adjacency_matrix = create_circulant_graph(request.n, *request.connections)
+        logger.info(f'Circulant graph: {request.n} vertices, {adjacency_matrix.nnz // 2} edges')
 
-        color_assignment = ColoringService.color_graph(
-            adjacency_list=adjacency_list,
+        result = await ColoringService.color_graph_async(
+            adjacency_list=adjacency_matrix,
             method=request.method,
             k=request.k,
-            r=request.r
+            r=request.r,
+            solver=request.solver,
+            threads=request.threads,
+            symmetry_breaking=request.symmetry_breaking,
+            circulant_mode=request.circulant_mode,
+            time_limit=request.time_limit,
+            mip_gap=request.mip_gap
         )
         
-        return {"coloring": color_assignment}
+        return result.to_dict()
     except Exception as e:
         logger.error(f"Error in circulant_assignment: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -83,14 +131,18 @@ async def circulant_plot(request: CirculantPlotRequest) -> Dict[str, bytes]:
         Dictionary mapping vertices to their assigned colors
     """
     try:
+        request_parsed('circulant', 'plot', request.n)
         logger.info(f'Circulant Plot Request: {request}')
         
-        adjacency_matrix = create_circulant_adjacency_matrix(request.n, *request.connections)
-        adjacency_list = adjacency_matrix_to_adjacency_list(adjacency_matrix)
-        logger.info(f'Adjacency List: {adjacency_list}')
+        with request_phase('generate', 'plot', request.n):
+            adjacency_list = create_circulant_graph(request.n, *request.connections, output_format='list')
 
-        image_bytes = plot_graph_to_bytes(adjacency_list, request.coloring)
+        with request_phase('plot', 'plot', request.n):
+            image_bytes = await asyncio.wrap_future(submit_graph_plot(adjacency_list, request.coloring, layout='circular', block=False))
         return Response(content=image_bytes, media_type="image/png")
+    except Render_Queue_Full as e:
+        logger.warning(f"Rejected circulant_plot: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error in circulant_plot: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -107,13 +159,42 @@ async def circulant_batch_assignment(request: CirculantBatchRequest) -> Dict[int
         Nested dictionary of color assignments: {r: {n: color_assignment}}
     """
     try:
-        return ColoringService.process_circulant_batch(request)
+        request_parsed('circulant', request.method)
+        return await asyncio.to_thread(ColoringService.process_circulant_batch, request)
     except Exception as e:
         logger.error(f"Error in circulant_batch_assignment: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def stream_records(records: AsyncIterator[dict], format: Literal['ndjson', 'sse']) -> StreamingResponse:
+    """Send batch records as NDJSON lines or server-sent events as they arrive."""
+    async def encode():
+        async for record in records:
+            if format == 'sse':
+                yield f"data: {json.dumps(record)}\n\n"
+            else:
+                yield json.dumps(record) + "\n"
+
+    media_type = "text/event-stream" if format == 'sse' else "application/x-ndjson"
+    return StreamingResponse(encode(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@router.post("/batch/circulant/stream")
+async def circulant_batch_stream(request: CirculantBatchRequest, format: Literal['ndjson', 'sse'] = 'ndjson') -> StreamingResponse:
+    """
+    Stream a batch of circulant colorings as each case finishes.
+    
+    Args:
+        request: The batch request containing parameters for multiple colorings
+        format: 'ndjson' for one JSON object per line, 'sse' for server-sent events
+        
+    Returns:
+        Stream of {r, n, coloring, colors_used, solve_ms} records
+    """
+    request_parsed('circulant', request.method)
+    logger.info(f'Circulant Batch Stream Request: {request}')
+    return stream_records(ColoringService.stream_batch_cases(request, connections=request.connections), format)
+
 @router.post("/circulant/antiprism")
-async def antiprism_assignment(request: AntiprismRequest) -> Dict[str, Dict[int, int]]:
+async def antiprism_assignment(request: AntiprismRequest) -> Dict[str, Any]:
     """
     Assign colors to an antiprism graph.
     
@@ -121,23 +202,31 @@ async def antiprism_assignment(request: AntiprismRequest) -> Dict[str, Dict[int,
         request: The antiprism coloring request
         
     Returns:
-        Dictionary mapping vertices to their assigned colors
+        The coloring (null on timeout_no_solution), its status (optimal, feasible
+        or timeout_no_solution), colors used, proven lower bound and gap
     """
     try:
+        request_parsed('antiprism', request.method, 2 * request.n)
         logger.info(f'Antiprism Request: {request}')
         
-        adjacency_matrix = create_antiprism_adjacency_matrix(request.n)
-        adjacency_list = adjacency_matrix_to_adjacency_list(adjacency_matrix)
-        logger.info(f'Adjacency List: {adjacency_list}')
+        with request_phase('generate', request.method, 2 * request.n):
+            adjacency_matrix = create_antiprism_graph(request.n)
+        logger.info(f'Antiprism graph: {2 * request.n} vertices, {adjacency_matrix.nnz // 2} edges')
 
-        color_assignment = ColoringService.color_graph(
-            adjacency_list=adjacency_list,
+        result = await ColoringService.color_graph_async(
+            adjacency_list=adjacency_matrix,
             method=request.method,
             k=request.k,
-            r=request.r
+            r=request.r,
+            solver=request.solver,
+            threads=request.threads,
+            symmetry_breaking=request.symmetry_breaking,
+            circulant_mode=request.circulant_mode,
+            time_limit=request.time_limit,
+            mip_gap=request.mip_gap
         )
         
-        return {"coloring": color_assignment}
+        return result.to_dict()
     except Exception as e:
         logger.error(f"Error in antiprism_assignment: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -154,13 +243,30 @@ async def antiprism_batch_assignment(request: AntiprismBatchRequest) -> Dict[int
         Nested dictionary of color assignments: {r: {n: color_assignment}}
     """
     try:
-        return ColoringService.process_antiprism_batch(request)
+        request_parsed('antiprism', request.method)
+        return await asyncio.to_thread(ColoringService.process_antiprism_batch, request)
     except Exception as e:
         logger.error(f"Error in antiprism_batch_assignment: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/batch/circulant/antiprism/stream")
+async def antiprism_batch_stream(request: AntiprismBatchRequest, format: Literal['ndjson', 'sse'] = 'ndjson') -> StreamingResponse:
+    """
+    Stream a batch of antiprism colorings as each case finishes.
+    
+    Args:
+        request: The batch request containing parameters for multiple colorings
+        format: 'ndjson' for one JSON object per line, 'sse' for server-sent events
+        
+    Returns:
+        Stream of {r, n, coloring, colors_used, solve_ms} records
+    """
+    request_parsed('antiprism', request.method)
+    logger.info(f'Antiprism Batch Stream Request: {request}')
+    return stream_records(ColoringService.stream_batch_cases(request), format)
+
 @router.post("/planar3tree/symmetric")
-async def planar3_assignment(request: Planar3TreeRequest) -> Dict[str, Dict[int, int]]:
+async def planar3_assignment(request: Planar3TreeRequest) -> Dict[str, Any]:
     """
     Assign colors to a planar 3-tree graph.
     
@@ -168,23 +274,31 @@ async def planar3_assignment(request: Planar3TreeRequest) -> Dict[str, Dict[int,
         request: The planar 3-tree coloring request
         
     Returns:
-        Dictionary mapping vertices to their assigned colors
+        The coloring (null on timeout_no_solution), its status (optimal, feasible
+        or timeout_no_solution), colors used, proven lower bound and gap
     """
     try:
+        n_vertices = planar_3_tree_size(request.n)[0]
+        request_parsed('planar3', request.method, n_vertices)
         logger.info(f'Planar 3-tree Request: {request}')
         
-        adjacency_matrix = generate_planar_3_tree(request.n, output_format='matrix')
-        adjacency_list = adjacency_matrix_to_adjacency_list(adjacency_matrix)
-        logger.info(f'Adjacency List: {adjacency_list}')
+        with request_phase('generate', request.method, n_vertices):
+            adjacency_matrix = generate_planar_3_tree(request.n, output_format='csr')
+        logger.info(f'Planar 3-tree: {adjacency_matrix.shape[0]} vertices, {adjacency_matrix.nnz // 2} edges')
 
-        color_assignment = ColoringService.color_graph(
-            adjacency_list=adjacency_list,
+        result = await ColoringService.color_graph_async(
+            adjacency_list=adjacency_matrix,
             method=request.method,
             k=request.k,
-            r=request.r
+            r=request.r,
+            solver=request.solver,
+            threads=request.threads,
+            symmetry_breaking=request.symmetry_breaking,
+            time_limit=request.time_limit,
+            mip_gap=request.mip_gap
         )
         
-        return {"coloring": color_assignment}
+        return result.to_dict()
     except Exception as e:
         logger.error(f"Error in planar3_assignment: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -201,14 +315,117 @@ async def planar3_plot(request: Planar3TreePlotRequest) -> Dict[str, bytes]:
         Dictionary mapping vertices to their assigned colors
     """
     try:
+        n_vertices = planar_3_tree_size(request.n)[0]
+        request_parsed('planar3', 'plot', n_vertices)
         logger.info(f'Planar 3-tree Plot Request: {request}')
         
-        adjacency_matrix = generate_planar_3_tree(request.n, output_format='matrix')
-        adjacency_list = adjacency_matrix_to_adjacency_list(adjacency_matrix)
-        logger.info(f'Adjacency List: {adjacency_list}')
+        with request_phase('generate', 'plot', n_vertices):
+            adjacency_list = generate_planar_3_tree(request.n, output_format='list')
 
-        image_bytes = plot_graph_to_bytes(adjacency_list, request.coloring)
+        with request_phase('plot', 'plot', n_vertices):
+            image_bytes = await asyncio.wrap_future(submit_graph_plot(adjacency_list, request.coloring, layout='planar3', block=False))
         return Response(content=image_bytes, media_type="image/png")
+    except Render_Queue_Full as e:
+        logger.warning(f"Rejected planar3_plot: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error in planar3_plot: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache/stats")
+async def cache_stats() -> Dict[str, int]:
+    """
+    Report the solution cache counters.
+    
+    Returns:
+        Memory hits, disk hits, misses and number of cached keys
+    """
+    return SOLUTION_CACHE.stats()
+
+@router.get("/render/stats")
+async def render_stats() -> Dict[str, Union[int, float]]:
+    """
+    Report the render pool counters.
+    
+    Returns:
+        Rendered and failed plots, pending renders and mean render and queue seconds
+    """
+    return RENDER_POOL.stats()
+
+@router.get("/scheduler/stats")
+async def scheduler_stats() -> Dict[str, int]:
+    """
+    Report the solver scheduler load.
+    
+    Returns:
+        CPU budget, CPUs in use, running and queued jobs
+    """
+    return SOLVER_SCHEDULER.stats()
+
+@router.post("/jobs/batch/circulant")
+async def circulant_batch_job(request: CirculantBatchRequest) -> Dict[str, str]:
+    """
+    Start a circulant batch in the background.
+    
+    Args:
+        request: The batch request containing parameters for multiple colorings
+        
+    Returns:
+        Id of the job to poll with GET /jobs/{job_id}
+    """
+    try:
+        request_parsed('circulant', request.method)
+        return {"job_id": JOB_MANAGER.submit('circulant', request)}
+    except Exception as e:
+        logger.error(f"Error in circulant_batch_job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/jobs/batch/circulant/antiprism")
+async def antiprism_batch_job(request: AntiprismBatchRequest) -> Dict[str, str]:
+    """
+    Start an antiprism batch in the background.
+    
+    Args:
+        request: The batch request containing parameters for multiple colorings
+        
+    Returns:
+        Id of the job to poll with GET /jobs/{job_id}
+    """
+    try:
+        request_parsed('antiprism', request.method)
+        return {"job_id": JOB_MANAGER.submit('antiprism', request)}
+    except Exception as e:
+        logger.error(f"Error in antiprism_batch_job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}")
+async def batch_job_status(job_id: str) -> Dict[str, Any]:
+    """
+    Report the progress of a batch job.
+    
+    Args:
+        job_id: Id returned when the job was started
+        
+    Returns:
+        Status, completed/total case counts and the results so far as {r: {n: coloring}}
+    """
+    job = JOB_MANAGER.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.delete("/jobs/{job_id}")
+async def cancel_batch_job(job_id: str) -> Dict[str, Any]:
+    """
+    Cancel the cases of a batch job that have not started yet.
+    
+    Args:
+        job_id: Id returned when the job was started
+        
+    Returns:
+        The job status after cancelling
+    """
+    job = JOB_MANAGER.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
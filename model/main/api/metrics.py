@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..services.metrics import METRICS
+
+# Scraped by Prometheus, so outside the API key dependency of the main router
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Report phase timing histograms and solver and render gauges.
+    
+    Returns:
+        Every metric in the Prometheus text exposition format
+    """
+    return PlainTextResponse(METRICS.expose(), media_type="text/plain; version=0.0.4; charset=utf-8")
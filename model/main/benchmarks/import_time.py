@@ -0,0 +1,89 @@
+"""Import-time guard for the solving path.
+
+Run from main/ as `python -m benchmarks.import_time`. Every target is imported
+in a fresh interpreter; the run fails if a target loads a plotting or
+dataframe module, or if its best import time exceeds its budget.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+MAIN_DIRECTORY = Path(__file__).resolve().parent.parent
+
+# Modules only plotting and export may load
+HEAVY_MODULES: Tuple[str, ...] = ('matplotlib', 'networkx', 'pandas', 'pulp')
+
+PROBE = """
+import json, sys
+from time import perf_counter
+start = perf_counter()
+import {module}
+seconds = perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+@dataclass(frozen=True)
+class Import_Target:
+    module: str
+    # Seconds allowed for the import on a developer machine
+    budget: float
+    # Directory the interpreter starts in: main/ for script imports, its parent for the package
+    root: Path = MAIN_DIRECTORY
+
+IMPORT_TARGETS: List[Import_Target] = [
+    Import_Target('coloring.r_dynamic', 0.6),
+    Import_Target('coloring.verify', 0.6),
+    Import_Target('utils.antiprism', 0.6),
+    Import_Target('utils.planar3', 0.6),
+    Import_Target('graph.graph_coloring', 0.8),
+    Import_Target('utils.solve_graphs', 1.0),
+    Import_Target('main.services.coloring_service', 1.5, MAIN_DIRECTORY.parent),
+    Import_Target('main', 1.5, MAIN_DIRECTORY.parent),
+]
+
+@dataclass
+class Import_Result:
+    module: str
+    seconds: float
+    budget: float
+    loaded: List[str]
+
+    def passed(self) -> bool:
+        return not self.loaded and self.seconds <= self.budget
+
+def measure_import(target: Import_Target, repeats: int = 3) -> Import_Result:
+    """Best of repeats imports of target, each in a new interpreter."""
+    environment = dict(os.environ, PYTHONPATH=str(target.root), C_MODEL_API_KEY=os.environ.get('C_MODEL_API_KEY', 'import-time'))
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=target.module, heavy=HEAVY_MODULES)],
+            cwd=target.root, env=environment, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    best = min(runs, key=lambda run: run['seconds'])
+    return Import_Result(target.module, best['seconds'], target.budget, sorted({m for run in runs for m in run['loaded']}))
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget, for slower machines')
+    args = parser.parse_args()
+
+    failed = 0
+    for target in IMPORT_TARGETS:
+        result = measure_import(Import_Target(target.module, target.budget * args.scale, target.root), args.repeats)
+        failed += not result.passed()
+        print(
+            f"{'ok  ' if result.passed() else 'FAIL'} {result.module:<34} {result.seconds:6.3f}s / {result.budget:.2f}s"
+            + (f"  loads {', '.join(result.loaded)}" if result.loaded else '')
+        )
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
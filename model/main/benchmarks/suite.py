@@ -0,0 +1,236 @@
+"""Benchmarks of the coloring pipeline over the graph families the API serves.
+
+Run from main/ as `python -m benchmarks.suite`. Every case is timed in stages:
+
+    generate  building the graph (circulant, antiprism, planar 3-tree, T_n, T-star)
+    build     build_sparse_model
+    solve     the solver backend call
+    extract   reading the coloring back from the solution vector
+    api       the matching /api/v1 request through a TestClient, solution cache off
+
+Each stage reports the median and minimum of --repeats runs. --save writes
+the results as JSON; --baseline compares the run against such a file and
+exits with 1 when a stage's median is slower than the baseline by more than
+--tolerance (relative) and --min-delta (seconds).
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+MAIN_DIRECTORY = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+STAGES = ('generate', 'build', 'solve', 'extract', 'api')
+
+# Repeated API requests must reach the solver, not the solution cache
+os.environ['COLORING_CACHE_SIZE'] = '0'
+os.environ.pop('COLORING_CACHE_DIR', None)
+os.environ.setdefault('C_MODEL_API_KEY', 'benchmark')
+
+from coloring.model import MODEL_METHOD
+from coloring.solvers import get_backend
+from coloring.sparse_model import build_sparse_model
+from coloring.verify import assert_valid_coloring
+from utils.antiprism import create_antiprism_graph, create_circulant_graph
+from utils.planar3 import generate_planar_3_tree
+
+@dataclass
+class Benchmark_Case:
+    family: str
+    parameters: Dict[str, Any]
+    r: int
+    k: int
+    # Returns the adjacency (list or CSR) of the graph
+    generate: Callable[[], Any]
+    endpoint: str
+    # Request body for endpoint, given the generated graph
+    payload: Callable[[Any], dict]
+    method: str = 'ACR'
+
+    @property
+    def name(self) -> str:
+        parameters = ','.join(f'{key}={value}' for key, value in self.parameters.items())
+        return f'{self.family}/{parameters},r={self.r},k={self.k}'
+
+@dataclass
+class Case_Result:
+    name: str
+    # Stage -> seconds of every repeat
+    runs: Dict[str, List[float]] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            stage: {'median': median(seconds), 'min': min(seconds)}
+            for stage, seconds in self.runs.items()
+        }
+
+def t_grid_graph(n: int, r: int, k: int):
+    from graph.graph_coloring import T_Grid_Graph
+
+    graph = T_Grid_Graph(n, r, k)
+    graph.define_graph()
+    return graph.details.code.adjacency_list
+
+def t_star_graph(n: int, r: int, k: int):
+    from star.star_algorithm import T_Star_Grid_Graphs
+
+    _, graph = next(T_Star_Grid_Graphs(n, r, k).iterate_graphs(max_graphs=1))
+    return graph.details.code.adjacency_list
+
+def adjacency_list_payload(r: int, k: int):
+    return lambda graph: {'graph_type': 'adjacency_list', 'graph': graph, 'method': 'ACR', 'r': r, 'k': k}
+
+def benchmark_cases() -> List[Benchmark_Case]:
+    cases = []
+    for n, connections, r, k in [(12, (1, 3), 3, 6), (20, (1, 2, 5), 3, 7)]:
+        cases.append(Benchmark_Case(
+            'circulant', {'n': n, 'S': '-'.join(map(str, connections))}, r, k,
+            lambda n=n, connections=connections: create_circulant_graph(n, *connections),
+            '/circulant',
+            lambda _, n=n, connections=connections, r=r, k=k: {'n': n, 'connections': list(connections), 'method': 'ACR', 'r': r, 'k': k},
+        ))
+    for n, r, k in [(8, 3, 6), (16, 3, 6), (10, 4, 7)]:
+        cases.append(Benchmark_Case(
+            'antiprism', {'n': n}, r, k,
+            lambda n=n: create_antiprism_graph(n),
+            '/circulant/antiprism',
+            lambda _, n=n, r=r, k=k: {'n': n, 'method': 'ACR', 'r': r, 'k': k},
+        ))
+    for n, r, k in [(2, 3, 8), (3, 3, 8)]:
+        cases.append(Benchmark_Case(
+            'planar3', {'level': n}, r, k,
+            lambda n=n: generate_planar_3_tree(n, output_format='csr'),
+            '/planar3tree/symmetric',
+            lambda _, n=n, r=r, k=k: {'n': n, 'method': 'ACR', 'r': r, 'k': k},
+        ))
+    for n, r, k in [(4, 3, 8), (6, 3, 8)]:
+        cases.append(Benchmark_Case(
+            't_grid', {'n': n}, r, k,
+            lambda n=n, r=r, k=k: t_grid_graph(n, r, k),
+            '/color/graph', adjacency_list_payload(r, k),
+        ))
+    for n, r, k in [(3, 3, 8), (4, 3, 8)]:
+        cases.append(Benchmark_Case(
+            't_star', {'n': n}, r, k,
+            lambda n=n, r=r, k=k: t_star_graph(n, r, k),
+            '/color/graph', adjacency_list_payload(r, k),
+        ))
+    return cases
+
+def api_client():
+    """TestClient of the app, imported from the package root next to main/."""
+    if str(MAIN_DIRECTORY.parent) not in sys.path:
+        sys.path.insert(0, str(MAIN_DIRECTORY.parent))
+    from fastapi.testclient import TestClient
+    from main import app
+
+    return TestClient(app, headers={'X-API-Key': os.environ['C_MODEL_API_KEY']})
+
+def run_case(case: Benchmark_Case, repeats: int, client=None, solver: Optional[str] = None) -> Case_Result:
+    result = Case_Result(case.name, {stage: [] for stage in STAGES if stage != 'api' or client is not None})
+    backend = get_backend(solver)
+
+    def timed(stage: str, function: Callable):
+        start = perf_counter()
+        value = function()
+        result.runs[stage].append(perf_counter() - start)
+        return value
+
+    for _ in range(repeats):
+        graph = timed('generate', case.generate)
+        model = timed('build', lambda: build_sparse_model(graph, MODEL_METHOD.parse(case.method), k=case.k, r=case.r))
+        solver_result, values = timed('solve', lambda: backend.solve(model))
+        coloring = timed('extract', lambda: model.to_solution(solver_result.status, values).color_assignment())
+        assert_valid_coloring(graph, coloring, case.r)
+
+        if client is not None:
+            payload = case.payload(graph)
+            response = timed('api', lambda: client.post(f'/api/v1{case.endpoint}', json=payload))
+            if response.status_code != 200:
+                raise RuntimeError(f'{case.name}: {case.endpoint} answered {response.status_code} {response.text}')
+    return result
+
+def environment() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=MAIN_DIRECTORY, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = 'unknown'
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': str(os.cpu_count()),
+    }
+
+def compare(results: Dict[str, Dict[str, Dict[str, float]]], baseline: dict, tolerance: float, min_delta: float) -> List[str]:
+    """Stages whose median regressed against the baseline, as report lines."""
+    regressions = []
+    for name, stages in results.items():
+        for stage, timing in stages.items():
+            reference = baseline.get('results', {}).get(name, {}).get(stage)
+            if reference is None:
+                continue
+            delta = timing['median'] - reference['median']
+            if delta > min_delta and timing['median'] > reference['median'] * (1 + tolerance):
+                regressions.append(
+                    f"{name} {stage}: {timing['median']:.4f}s vs {reference['median']:.4f}s "
+                    f"(+{delta / reference['median']:.0%})"
+                )
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--family', action='append', help='Only these families (repeatable)')
+    parser.add_argument('--solver', default=None, help='Solver backend, HIGHS by default')
+    parser.add_argument('--no-api', action='store_true', help='Skip the end-to-end requests')
+    parser.add_argument('--save', type=Path, nargs='?', const=DEFAULT_BASELINE, help='Write the results as a baseline')
+    parser.add_argument('--baseline', type=Path, nargs='?', const=DEFAULT_BASELINE, help='Baseline to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown of a median')
+    parser.add_argument('--min-delta', type=float, default=0.02, help='Slowdowns below this many seconds are noise')
+    args = parser.parse_args()
+
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    client = None if args.no_api else api_client()
+    results = {}
+    for case in benchmark_cases():
+        if args.family and case.family not in args.family:
+            continue
+        summary = run_case(case, args.repeats, client, args.solver).summary()
+        results[case.name] = summary
+        print(case.name)
+        for stage, timing in summary.items():
+            print(f"    {stage:<9} median {timing['median']:.4f}s  min {timing['min']:.4f}s")
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'environment': environment(), 'repeats': args.repeats, 'results': results}, file, indent=2)
+        print(f'Saved {len(results)} cases to {args.save}')
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        print(f"Compared with {args.baseline} (commit {baseline.get('environment', {}).get('commit', 'unknown')})")
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        if regressions:
+            return 1
+        print('No regressions')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Timings of the ACR model with and without color symmetry breaking on circulants.
+
+Run from main/ as `python -m benchmarks.symmetry_breaking`. Every C_n(S) of
+--n and r of --r is solved once plain and once with symmetry_breaking=True,
+each solve capped at --time-limit seconds, and one row is printed per pair
+with the status, number of colors and seconds of both. The statuses and
+numbers of colors must agree; test/symmetry_breaking.py checks that on small
+graphs.
+"""
+from time import perf_counter
+from typing import Any, Dict, Sequence
+import argparse
+import sys
+
+from coloring.model import MODEL_METHOD
+from coloring.r_dynamic import linear_programming_model
+from utils.antiprism import create_circulant_graph
+
+def compare_symmetry_breaking(
+    n: int, connections: Sequence[int], r: int, k: int,
+    model_name: MODEL_METHOD = MODEL_METHOD.ACR, time_limit: float = 60
+) -> Dict[str, Any]:
+    adjacency_list = create_circulant_graph(n, *connections, output_format='list')
+    row = {'n': n, 'S': tuple(connections), 'r': r, 'k': k}
+    for symmetry_breaking in [False, True]:
+        start = perf_counter()
+        solution = linear_programming_model(
+            adjacency_list=adjacency_list, model_name=model_name, k=k, r=r,
+            time_limit=time_limit, symmetry_breaking=symmetry_breaking
+        )
+        label = 'symmetric' if symmetry_breaking else 'plain'
+        row[f'{label}_status'] = solution.status
+        row[f'{label}_colors'] = len(set(solution.color_assignment().values())) if solution.has_solution() else None
+        row[f'{label}_seconds'] = round(perf_counter() - start, 3)
+    return row
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, nargs='+', default=[12, 16, 20], help='Circulant orders')
+    parser.add_argument('--connections', type=int, nargs='+', default=[1, 2, 3], help='Connection set S of C_n(S)')
+    parser.add_argument('--r', type=int, nargs='+', default=[4, 5, 6], help='Dynamic coloring orders')
+    parser.add_argument('-k', type=int, default=8, help='Number of colors of the model')
+    parser.add_argument('--time-limit', type=float, default=60, help='Seconds per solve')
+    args = parser.parse_args()
+
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    for n in args.n:
+        for r in args.r:
+            print(compare_symmetry_breaking(n, args.connections, r, args.k, time_limit=args.time_limit))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
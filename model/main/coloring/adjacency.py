@@ -0,0 +1,67 @@
+from typing import Dict, List, Tuple, TypeVar, Union
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy import sparse
+
+T = TypeVar('T')
+Adjacency_Type = Union[Dict[T, List[T]], List[List[int]], sparse.csr_array]
+
+def adjacency_to_csr(adjacency: Adjacency_Type) -> Tuple[List[T], sparse.csr_array]:
+    """Convert a graph into a symmetric 0/1 CSR adjacency matrix.
+
+    Args:
+        adjacency: Adjacency list (dict of neighbor lists, or a list whose entry v
+            holds the neighbors of v) or a square sparse matrix. Vertex labels of a
+            dict are kept in insertion order; a list or sparse matrix is labeled 0..n-1.
+
+    Returns:
+        Tuple of (vertex labels, CSR matrix) where row i belongs to labels[i].
+        Duplicate edges and self loops are dropped and the matrix is symmetrized.
+    """
+    if isinstance(adjacency, list):
+        adjacency = dict(enumerate(adjacency))
+    if sparse.issparse(adjacency):
+        n_vertices = adjacency.shape[0]
+        labels = list(range(n_vertices))
+        matrix = sparse.coo_array(adjacency)
+        rows, cols = matrix.row, matrix.col
+    else:
+        labels = list(adjacency.keys())
+        n_vertices = len(labels)
+        lengths = np.fromiter((len(adjacency[v]) for v in labels), dtype=np.int64, count=n_vertices)
+        rows = np.repeat(np.arange(n_vertices, dtype=np.int64), lengths)
+        if labels == list(range(n_vertices)):
+            cols = np.fromiter((u for v in labels for u in adjacency[v]), dtype=np.int64, count=len(rows))
+        else:
+            index = {label: i for i, label in enumerate(labels)}
+            cols = np.fromiter((index[u] for v in labels for u in adjacency[v]), dtype=np.int64, count=len(rows))
+
+    off_diagonal = rows != cols
+    rows, cols = rows[off_diagonal], cols[off_diagonal]
+    matrix = sparse.coo_array(
+        (np.ones(2 * len(rows), dtype=np.int8), (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+        shape=(n_vertices, n_vertices)
+    ).tocsr()
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    matrix.sort_indices()
+    return labels, matrix
+
+def csr_arcs(matrix: sparse.csr_array) -> Tuple[NDArray[np.int64], NDArray[np.int64]]:
+    """Return every directed arc (v, u) of a CSR adjacency matrix as two index arrays."""
+    heads = np.repeat(np.arange(matrix.shape[0], dtype=np.int64), np.diff(matrix.indptr))
+    return heads, matrix.indices.astype(np.int64)
+
+def csr_edges(matrix: sparse.csr_array) -> Tuple[NDArray[np.int64], NDArray[np.int64]]:
+    """Return every undirected edge (u, v) with u < v of a symmetric CSR adjacency matrix."""
+    heads, tails = csr_arcs(matrix)
+    upper = heads < tails
+    return heads[upper], tails[upper]
+
+def csr_to_adjacency_list(matrix: sparse.csr_array, labels: List[T] = None) -> Dict[T, List[T]]:
+    """Convert a CSR adjacency matrix back into an adjacency list."""
+    indptr, indices = matrix.indptr, matrix.indices.tolist()
+    if labels is None:
+        return {v: indices[indptr[v]:indptr[v + 1]] for v in range(matrix.shape[0])}
+    return {labels[v]: [labels[u] for u in indices[indptr[v]:indptr[v + 1]]] for v in range(matrix.shape[0])}
@@ -0,0 +1,91 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy import sparse
+
+from .adjacency import Adjacency_Type, adjacency_to_csr
+from .heuristic import dsatur_r_dynamic
+from .symmetry import greedy_max_clique
+
+@dataclass
+class Color_Bounds:
+    lower: int
+    upper: int
+    # Coloring that attains the upper bound, indexed like the CSR rows
+    upper_coloring: NDArray[np.int64]
+
+def square_graph(adjacency_matrix: sparse.csr_array) -> sparse.csr_array:
+    """Adjacency matrix of G², where vertices at distance 1 or 2 are adjacent."""
+    square = (adjacency_matrix + adjacency_matrix @ adjacency_matrix).tocsr()
+    square.setdiag(0)
+    square.eliminate_zeros()
+    square.data[:] = 1
+    return square
+
+def greedy_square_coloring(adjacency_matrix: sparse.csr_array, square: Optional[sparse.csr_array] = None) -> NDArray[np.int64]:
+    """Greedy proper coloring of G² in largest-degree-first order.
+
+    Every neighborhood of G is a clique of G², so the result is an r-dynamic
+    coloring of G for every r. square is G² when the caller already has it.
+    """
+    n_vertices = adjacency_matrix.shape[0]
+    if square is None:
+        square = square_graph(adjacency_matrix)
+    indptr, indices = square.indptr, square.indices
+    colors = np.full(n_vertices, -1, dtype=np.int64)
+    for v in np.argsort(-np.diff(indptr), kind='stable').tolist():
+        used = colors[indices[indptr[v]:indptr[v + 1]]]
+        taken = np.zeros(len(used) + 1, dtype=bool)
+        taken[used[(used >= 0) & (used <= len(used))]] = True
+        colors[v] = int(np.argmin(taken))
+    return colors
+
+def lower_bound(adjacency_matrix: sparse.csr_array, r: int, square: Optional[sparse.csr_array] = None) -> int:
+    """Cheap lower bound on the r-dynamic chromatic number.
+
+    A vertex of degree Δ needs min(r, Δ) distinct colors around it plus its own,
+    every clique of G needs distinct colors and, when r >= Δ, so does every
+    clique of G² (square, computed here when not given).
+    """
+    if adjacency_matrix.shape[0] == 0:
+        return 0
+    max_degree = int(np.diff(adjacency_matrix.indptr).max())
+    bound = max(min(r, max_degree) + 1, len(greedy_max_clique(adjacency_matrix)))
+    if r >= max_degree:
+        if square is None:
+            square = square_graph(adjacency_matrix)
+        bound = max(bound, len(greedy_max_clique(square)))
+    return bound
+
+def color_bounds(
+    adjacency: Adjacency_Type,
+    r: int,
+    square: Optional[sparse.csr_array] = None,
+    square_coloring: Optional[NDArray[np.int64]] = None,
+) -> Color_Bounds:
+    """Lower bound and the best greedy upper bound (DSatur or G² coloring).
+
+    G² is only built when r >= Δ, where its cliques bound the colors; below
+    that the G² coloring competes with DSatur only when square_coloring is
+    given. Callers that bound several r of one graph pass G² and its greedy
+    coloring, which do not depend on r, to compute them once.
+    """
+    _, adjacency_matrix = adjacency_to_csr(adjacency)
+    max_degree = int(np.diff(adjacency_matrix.indptr).max(initial=0))
+    if r >= max_degree and adjacency_matrix.shape[0] > 0:
+        if square is None:
+            square = square_graph(adjacency_matrix)
+        if square_coloring is None:
+            square_coloring = greedy_square_coloring(adjacency_matrix, square)
+    candidates = [dsatur_r_dynamic(adjacency_matrix, r)]
+    if square_coloring is not None:
+        candidates.append(square_coloring)
+    upper_coloring = min(candidates, key=lambda colors: colors.max() if len(colors) else 0)
+    upper = int(upper_coloring.max()) + 1 if len(upper_coloring) else 0
+    return Color_Bounds(
+        lower=min(lower_bound(adjacency_matrix, r, square), upper),
+        upper=upper,
+        upper_coloring=upper_coloring,
+    )
@@ -0,0 +1,97 @@
+import hashlib
+from typing import Optional
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy import sparse
+
+from .adjacency import csr_arcs
+
+def _mix(values: NDArray[np.uint64]) -> NDArray[np.uint64]:
+    """splitmix64 finalizer, applied elementwise with wrapping uint64 arithmetic."""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+def wl_colors(adjacency_matrix: sparse.csr_array) -> NDArray[np.uint64]:
+    """Weisfeiler-Lehman color refinement until the partition is stable.
+
+    A vertex's new color hashes its color with the multiset of neighbor colors
+    (as a sum of mixed hashes, so no sorting is needed). Colors depend only on
+    structure, so isomorphic graphs get the same color multiset.
+
+    Args:
+        adjacency_matrix: Symmetric CSR adjacency matrix
+
+    Returns:
+        Stable 64-bit color per CSR row
+    """
+    heads, tails = csr_arcs(adjacency_matrix)
+    colors = _mix(np.diff(adjacency_matrix.indptr).astype(np.uint64))
+    n_classes = len(np.unique(colors))
+    while True:
+        neighborhood = np.zeros(len(colors), dtype=np.uint64)
+        np.add.at(neighborhood, heads, _mix(colors[tails]))
+        refined = _mix(colors ^ _mix(neighborhood))
+        refined_classes = len(np.unique(refined))
+        colors = refined
+        if refined_classes == n_classes:
+            return colors
+        n_classes = refined_classes
+
+def graph_fingerprint(adjacency_matrix: sparse.csr_array) -> str:
+    """Isomorphism-invariant hex digest of the graph (a WL hash).
+
+    Isomorphic graphs always share the fingerprint. Non-isomorphic graphs
+    almost never do, but a match still has to be confirmed with find_isomorphism.
+    """
+    colors = np.sort(wl_colors(adjacency_matrix))
+    digest = hashlib.sha1()
+    digest.update(np.asarray([adjacency_matrix.shape[0], adjacency_matrix.nnz], dtype=np.int64).tobytes())
+    digest.update(colors.tobytes())
+    return digest.hexdigest()
+
+def find_isomorphism(source: sparse.csr_array, target: sparse.csr_array) -> Optional[NDArray[np.int64]]:
+    """Find an isomorphism between two graphs.
+
+    Identical matrices map by identity. Otherwise VF2 runs with the WL colors
+    as node labels, which prunes most of the search.
+
+    Args:
+        source: Symmetric CSR adjacency matrix
+        target: Symmetric CSR adjacency matrix
+
+    Returns:
+        Array mapping every source row to a target row, or None when the
+        graphs are not isomorphic
+    """
+    if source.shape != target.shape or source.nnz != target.nnz:
+        return None
+    n_vertices = source.shape[0]
+    if np.array_equal(source.indptr, target.indptr) and np.array_equal(source.indices, target.indices):
+        return np.arange(n_vertices, dtype=np.int64)
+
+    source_colors, target_colors = wl_colors(source), wl_colors(target)
+    if not np.array_equal(np.sort(source_colors), np.sort(target_colors)):
+        return None
+
+    import networkx as nx
+    from networkx.algorithms.isomorphism import GraphMatcher
+
+    def labeled_graph(matrix: sparse.csr_array, colors: NDArray[np.uint64]) -> nx.Graph:
+        graph = nx.from_scipy_sparse_array(matrix)
+        nx.set_node_attributes(graph, dict(enumerate(colors.tolist())), 'wl')
+        return graph
+
+    matcher = GraphMatcher(
+        labeled_graph(source, source_colors),
+        labeled_graph(target, target_colors),
+        node_match=lambda a, b: a['wl'] == b['wl']
+    )
+    if not matcher.is_isomorphic():
+        return None
+    mapping = np.empty(n_vertices, dtype=np.int64)
+    for u, v in matcher.mapping.items():
+        mapping[u] = v
+    return mapping
@@ -0,0 +1,134 @@
+from enum import Enum
+from time import perf_counter
+from typing import List, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy import sparse
+
+from .model import MODEL_METHOD
+from .sparse_model import build_sparse_model
+from .solvers import SOLVER_BACKEND, solve_sparse_model
+
+class CIRCULANT_MODE(Enum):
+    # Plain model, no use of the rotational symmetry
+    GENERIC = "GENERIC"
+    # Vertex 0 in color 0, color 0 the smallest class
+    SYMMETRIC = "SYMMETRIC"
+    # SYMMETRIC, started from the best p-periodic coloring
+    PERIODIC = "PERIODIC"
+    # Exact transfer-matrix search over color windows, no model
+    TRANSFER = "TRANSFER"
+
+def circulant_connections(adjacency_matrix: sparse.csr_array) -> Optional[List[int]]:
+    """Connection set S when the graph is C_n(S) with the identity labeling.
+
+    Returns:
+        Sorted connections s <= n/2, or None when the rotation i -> i + 1 is not
+        an automorphism of the labeled graph
+    """
+    n_vertices = adjacency_matrix.shape[0]
+    if n_vertices == 0:
+        return None
+    indptr, indices = adjacency_matrix.indptr, adjacency_matrix.indices
+    degrees = np.diff(indptr)
+    if np.any(degrees != degrees[0]):
+        return None
+
+    offsets = np.sort(indices[indptr[0]:indptr[1]])
+    heads = np.repeat(np.arange(n_vertices), degrees)
+    row_offsets = np.sort(((indices - heads) % n_vertices).reshape(n_vertices, degrees[0]), axis=1)
+    if not np.all(row_offsets == offsets[None, :]):
+        return None
+    return sorted(int(s) for s in offsets if s <= n_vertices // 2)
+
+def canonical_rotation(colors: NDArray[np.int64]) -> NDArray[np.int64]:
+    """Rotate and rename a coloring of a circulant to meet the SYMMETRIC fixings.
+
+    The first vertex of the smallest class is rotated to 0 and that class is
+    renamed to color 0.
+    """
+    colors = np.asarray(colors, dtype=np.int64)
+    if len(colors) == 0:
+        return colors
+    used, sizes = np.unique(colors, return_counts=True)
+    smallest = used[np.argmin(sizes)]
+    rotated = np.roll(colors, -int(np.argmax(colors == smallest)))
+    # Swap the names of color 0 and the smallest class
+    renamed = rotated.copy()
+    renamed[rotated == smallest] = 0
+    renamed[rotated == 0] = smallest
+    return renamed
+
+def periodic_quotient(n_vertices: int, connections: List[int], period: int) -> Optional[sparse.csr_array]:
+    """Graph on Z_p whose colorings are the p-periodic colorings of C_n(S).
+
+    color(i) = color(i mod p) is proper on C_n(S) only when no connection is a
+    multiple of p; vertex j of the quotient is adjacent to j ± s mod p.
+    """
+    if n_vertices % period != 0:
+        return None
+    offsets = {s % period for s in connections} | {-s % period for s in connections}
+    if 0 in offsets:
+        return None
+    offsets = np.asarray(sorted(offsets), dtype=np.int64)
+    rows = np.repeat(np.arange(period), len(offsets))
+    cols = (rows + np.tile(offsets, period)) % period
+    return sparse.csr_array((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(period, period))
+
+def periodic_upper_bound(
+    adjacency_matrix: sparse.csr_array,
+    r: int,
+    k: int,
+    lower_bound: int = None,
+    solver: SOLVER_BACKEND = None,
+    threads: int = None,
+    time_limit: float = None,
+    deadline: float = None,
+) -> Optional[NDArray[np.int64]]:
+    """Best p-periodic r-dynamic coloring over the proper divisors p of n.
+
+    Each period is solved as the ACR model of the quotient graph on p vertices,
+    with constraint 5 still asking for min(r, deg) colors of the original
+    degree, and only colorings better than the best so far are searched. The
+    loop stops once the lower bound is reached, or once deadline (a
+    perf_counter() instant shared by all periods) passes; each solve gets at
+    most time_limit and what is left before the deadline.
+
+    Returns:
+        Lifted coloring of the whole graph in canonical rotation, or None when
+        the graph is not circulant or no period admits a coloring with k colors
+    """
+    connections = circulant_connections(adjacency_matrix)
+    if connections is None:
+        return None
+    n_vertices = adjacency_matrix.shape[0]
+    required = min(r, int(np.diff(adjacency_matrix.indptr)[0]))
+
+    best: Optional[NDArray[np.int64]] = None
+    for period in range(1, n_vertices):
+        quotient = periodic_quotient(n_vertices, connections, period)
+        if quotient is None or quotient.indptr[1] < required:
+            continue
+        colors_allowed = min(k, period) if best is None else int(best.max())
+        if colors_allowed < max(required + 1, lower_bound or 0):
+            continue
+
+        model = build_sparse_model(
+            quotient, MODEL_METHOD.ACR, k=colors_allowed, r=r,
+            lower_bound=lower_bound, required_colors=np.full(period, required)
+        )
+        remaining = time_limit
+        if deadline is not None:
+            remaining = min(deadline - perf_counter(), remaining if remaining is not None else np.inf)
+            if remaining <= 0:
+                break
+        solution = solve_sparse_model(model, solver=solver, threads=threads, time_limit=remaining)
+        if not solution.has_solution():
+            continue
+        quotient_colors = np.asarray(list(solution.color_assignment().values()), dtype=np.int64)
+        best = quotient_colors[np.arange(n_vertices) % period]
+        if lower_bound is not None and best.max() + 1 <= lower_bound:
+            break
+
+    return canonical_rotation(best) if best is not None else None
@@ -0,0 +1,95 @@
+import heapq
+from typing import Dict, List, Tuple, TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy import sparse
+
+from .adjacency import Adjacency_Type, adjacency_to_csr
+
+T = TypeVar('T')
+
+# Request method name of the heuristic engine, next to the MODEL_METHOD values
+HEURISTIC_METHOD = 'HEURISTIC'
+
+def dsatur_r_dynamic(adjacency_matrix: sparse.csr_array, r: int) -> NDArray[np.int64]:
+    """DSatur-style greedy r-dynamic coloring.
+
+    Vertices are colored in order of saturation (distinct colors already in
+    their neighborhood), then degree. Every vertex u tracks how many distinct
+    colors N(u) still needs to reach min(r, deg(u)). When that equals the number
+    of uncolored neighbors left, u is tight: its next neighbor must get a color
+    new to N(u). Keeping need <= uncolored for every vertex makes the result a
+    valid r-dynamic coloring. Among the allowed colors the one that helps the
+    most neighbors still short of colors is chosen, and a new color is opened
+    only when none is allowed.
+
+    Runs in O((V + E) * k) for k colors used.
+
+    Args:
+        adjacency_matrix: Symmetric CSR adjacency matrix
+        r: Dynamic coloring order
+
+    Returns:
+        Color index per CSR row
+    """
+    n_vertices = adjacency_matrix.shape[0]
+    indptr = adjacency_matrix.indptr.tolist()
+    indices = adjacency_matrix.indices.tolist()
+    degree = [indptr[v + 1] - indptr[v] for v in range(n_vertices)]
+
+    colors = [-1] * n_vertices
+    need = [min(r, d) for d in degree]
+    uncolored = list(degree)
+    # Per vertex: color -> number of neighbors with that color
+    neighbor_colors: List[Dict[int, int]] = [{} for _ in range(n_vertices)]
+    n_colors = 0
+
+    heap = [(0, -degree[v], v) for v in range(n_vertices)]
+    heapq.heapify(heap)
+    while heap:
+        saturation, _, v = heapq.heappop(heap)
+        if colors[v] != -1 or -saturation != len(neighbor_colors[v]):
+            continue
+
+        neighbors = indices[indptr[v]:indptr[v + 1]]
+        forbidden = set()
+        needy = []
+        for u in neighbors:
+            if colors[u] != -1:
+                forbidden.add(colors[u])
+            missing = need[u] - len(neighbor_colors[u])
+            if missing <= 0:
+                continue
+            if missing >= uncolored[u]:
+                forbidden.update(neighbor_colors[u])
+            needy.append(u)
+
+        color, best_gain = n_colors, -1
+        for c in range(n_colors):
+            if c in forbidden:
+                continue
+            gain = sum(1 for u in needy if c not in neighbor_colors[u])
+            if gain > best_gain:
+                color, best_gain = c, gain
+        n_colors = max(n_colors, color + 1)
+
+        colors[v] = color
+        for u in neighbors:
+            uncolored[u] -= 1
+            counts = neighbor_colors[u]
+            counts[color] = counts.get(color, 0) + 1
+            if colors[u] == -1 and counts[color] == 1:
+                heapq.heappush(heap, (-len(counts), -degree[u], u))
+
+    return np.asarray(colors, dtype=np.int64)
+
+def heuristic_coloring(adjacency: Adjacency_Type, r: int) -> Tuple[List[T], NDArray[np.int64]]:
+    """Run the DSatur heuristic on an adjacency list or sparse matrix."""
+    labels, adjacency_matrix = adjacency_to_csr(adjacency)
+    return labels, dsatur_r_dynamic(adjacency_matrix, r)
+
+def heuristic_color_assignment(adjacency: Adjacency_Type, r: int) -> Dict[T, int]:
+    """Map every vertex label to its heuristic color."""
+    labels, colors = heuristic_coloring(adjacency, r)
+    return dict(zip(labels, colors.tolist()))
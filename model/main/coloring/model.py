@@ -1,18 +1,95 @@
-from pulp import LpProblem, LpVariable
 from enum import Enum
+from typing import Dict, List, Optional, TypeVar, Union
 import numpy.typing as npt
 import numpy as np
 from dataclasses import dataclass
 
+T = TypeVar('T')
+
 class MODEL_METHOD(Enum):
     ACR = 'ACR'
     ACR_H = 'ACR-H'
     ACR_R = 'ACR-R'
     ACR_RH = 'ACR-RH'
 
+    @classmethod
+    def parse(cls, value: Union['MODEL_METHOD', Enum, str]) -> 'MODEL_METHOD':
+        """Accept an enum member, its value ('ACR-H') or its name ('ACR_H')."""
+        if isinstance(value, Enum):
+            value = value.value
+        return cls(str(value).replace('_', '-'))
+
+# Solver status names, kept identical to pulp.LpStatus
+STATUS_OPTIMAL = 'Optimal'
+STATUS_NOT_SOLVED = 'Not Solved'
+STATUS_INFEASIBLE = 'Infeasible'
+STATUS_UNBOUNDED = 'Unbounded'
+STATUS_UNDEFINED = 'Undefined'
+
+@dataclass
+class Solver_Result:
+    backend: str
+    status: str
+    objective: Optional[float]
+    bound: Optional[float]
+    wall_time: float
+
 @dataclass
 class Coloring_Solution:
-    model: LpProblem
-    w: npt.NDArray[LpVariable]
-    x: npt.NDArray[npt.NDArray[LpVariable]]
-    q: npt.NDArray[npt.NDArray[LpVariable]]
\ No newline at end of file
+    status: str
+    labels: List[T]
+    w: Optional[npt.NDArray[np.int_]]
+    x: Optional[npt.NDArray[np.int_]]
+    q: Optional[npt.NDArray[np.int_]]
+    result: Optional[Solver_Result] = None
+
+    def has_solution(self) -> bool:
+        return self.x is not None
+
+    def color_assignment(self) -> Dict[T, int]:
+        """Map every vertex label to the color index selected by x."""
+        if not self.has_solution():
+            raise ValueError(f"Model has no solution (status '{self.status}')")
+        return dict(zip(self.labels, self.x.argmax(axis=1).tolist()))
+
+class COLORING_STATUS(Enum):
+    # The coloring uses the proven minimum number of colors
+    OPTIMAL = 'optimal'
+    # Best coloring found before the time limit or gap stopped the search
+    FEASIBLE = 'feasible'
+    TIMEOUT_NO_SOLUTION = 'timeout_no_solution'
+
+@dataclass
+class Coloring_Result:
+    coloring: Optional[Dict[T, int]]
+    status: COLORING_STATUS
+    # Proven lower bound on the number of colors
+    lower_bound: int
+
+    @property
+    def colors_used(self) -> Optional[int]:
+        return max(self.coloring.values(), default=-1) + 1 if self.coloring is not None else None
+
+    @property
+    def gap(self) -> Optional[float]:
+        """Relative gap (colors used - lower bound) / colors used."""
+        if not self.colors_used:
+            return None
+        return max(self.colors_used - self.lower_bound, 0) / self.colors_used
+
+    @staticmethod
+    def from_coloring(coloring: Dict[T, int], lower_bound: int) -> 'Coloring_Result':
+        """OPTIMAL when the coloring meets the lower bound, FEASIBLE otherwise."""
+        colors_used = max(coloring.values(), default=-1) + 1
+        lower_bound = min(lower_bound, colors_used)
+        status = COLORING_STATUS.OPTIMAL if colors_used <= lower_bound else COLORING_STATUS.FEASIBLE
+        return Coloring_Result(coloring, status, lower_bound)
+
+    def to_dict(self) -> dict:
+        return {
+            'coloring': self.coloring,
+            'status': self.status.value,
+            'colors_used': self.colors_used,
+            'lower_bound': self.lower_bound,
+            'gap': self.gap,
+        }
@@ -0,0 +1,146 @@
+from time import perf_counter
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from loguru import logger
+import numpy as np
+
+from .adjacency import Adjacency_Type, adjacency_to_csr
+from .bounds import color_bounds, greedy_square_coloring, square_graph
+from .circulant import canonical_rotation
+from .model import COLORING_STATUS, MODEL_METHOD, STATUS_NOT_SOLVED, STATUS_UNDEFINED, Coloring_Result
+from .solvers import SOLVER_BACKEND, get_backend
+from .sparse_model import build_sparse_model
+from .verify import assert_valid_coloring, coloring_violations
+
+def r_sweep(
+    adjacency: Adjacency_Type,
+    model_name: Union[MODEL_METHOD, str],
+    r_values: Iterable[int],
+    k: Optional[int] = None,
+    k_range: Optional[Tuple[int, int]] = None,
+    solver: Union[SOLVER_BACKEND, str, None] = None,
+    threads: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    mip_gap: Optional[float] = None,
+    symmetry_breaking: bool = False,
+    circulant_symmetry: bool = False,
+) -> Iterator[Tuple[int, Coloring_Result, float]]:
+    """Color one graph for every r of r_values with a single model.
+
+    Only the right-hand sides of constraint 5, min(r, deg(v)), depend on r, so
+    the model is built and loaded into the solver once and each r changes
+    just those rows. r values are visited in increasing order: χ_r is
+    nondecreasing in r, so the proven lower bound of one r carries over to
+    the next as fixed w columns, and colors beyond the best coloring known
+    for r are fixed out of the model. The previous coloring is kept without a
+    solve when it is still r-dynamic and meets the new lower bound, and
+    otherwise warm-starts the solve when it beats the greedy coloring.
+    Constraint 5 is the same for every r >= Δ, so the sweep stops there and
+    larger r reuse the result of Δ.
+
+    Args:
+        adjacency: Adjacency list or square sparse matrix
+        model_name: ACR, ACR-H, ACR-R or ACR-RH
+        r_values: Dynamic coloring orders
+        k: Number of colors of the model (None for the largest greedy upper bound of the sweep)
+        k_range: Inclusive range the number of colors is clamped to
+        solver: Solver backend (HIGHS, GLPK or CBC)
+        threads: Thread budget for the solver
+        time_limit: Wall time limit in seconds of each solve
+        mip_gap: Relative gap at which each solve may stop
+        symmetry_breaking: Color symmetry-breaking fixings (see build_sparse_model)
+        circulant_symmetry: Rotational fixings of circulants labeled as C_n(S)
+
+    Yields:
+        (r, coloring result, seconds spent on r) in increasing r. The first r
+        that k colors cannot cover raises ValueError
+    """
+    method = MODEL_METHOD.parse(model_name)
+    r_values = sorted(set(r_values))
+    if not r_values:
+        return
+
+    start = perf_counter()
+    _, adjacency_matrix = adjacency_to_csr(adjacency)
+    max_degree = int(np.diff(adjacency_matrix.indptr).max(initial=0))
+    # G² and its greedy coloring do not depend on r: build them once for every bound
+    square = square_graph(adjacency_matrix)
+    square_coloring = greedy_square_coloring(adjacency_matrix, square)
+    bounds = {
+        order: color_bounds(adjacency_matrix, order, square, square_coloring)
+        for order in {min(r, max_degree) for r in r_values}
+    }
+    if k is None:
+        k = max(bound.upper for bound in bounds.values())
+    if k_range is not None:
+        k = min(max(k, k_range[0]), k_range[1])
+    k = max(k, 1)
+
+    model = build_sparse_model(
+        adjacency, method, k=k, r=min(r_values[0], max_degree),
+        symmetry_breaking=symmetry_breaking, circulant_symmetry=circulant_symmetry
+    )
+    session = get_backend(solver).open_session(model, threads)
+    # Color of every w, x and q column, and the column bounds as built
+    column_colors = np.tile(np.arange(k), 1 + 2 * model.n_vertices)
+    columns = np.arange(model.n_columns)
+    col_lower, col_upper = model.col_lower.copy(), model.col_upper.copy()
+    hard_colors = method in [MODEL_METHOD.ACR_H, MODEL_METHOD.ACR_RH]
+    logger.debug(f'Sweep model: {model.matrix.shape[0]} rows, {model.n_columns} columns, r in {r_values}')
+
+    results = {}
+    previous = None
+    proven = 0
+    for r in r_values:
+        order = min(r, max_degree)
+        if order in results:
+            yield r, results[order], 0.0
+            continue
+
+        lower = max(bounds[order].lower, proven)
+        if lower > k:
+            raise ValueError(f"k={k} is below the lower bound of {lower} colors for r={r}")
+        session.set_row_bounds(model.required_rows, model.required_colors(order), np.inf)
+
+        candidates = [bounds[order].upper_coloring]
+        if previous is not None and coloring_violations(model.adjacency, previous, order).is_valid():
+            candidates.insert(0, previous)
+        best = min(candidates, key=lambda colors: colors.max(initial=-1))
+        if circulant_symmetry:
+            best = canonical_rotation(best)
+        best_used = int(best.max(initial=-1)) + 1
+
+        # Colors past the best known coloring are not needed: fix their columns to 0
+        cap = min(best_used, k)
+        lower_fixed = col_lower.copy()
+        if not hard_colors:
+            lower_fixed[:lower] = 1
+        session.set_col_bounds(columns, lower_fixed, np.where(column_colors < cap, col_upper, 0))
+
+        if best_used <= lower:
+            colors = best
+            logger.info(f'r={r}: {best_used} colors meet the lower bound, no solve needed')
+        else:
+            solver_result, values = session.solve(time_limit=time_limit, warm_start=model.solution_vector(best), mip_gap=mip_gap)
+            solution = model.to_solution(solver_result.status, values)
+            if solver_result.bound is not None:
+                lower = max(lower, int(np.ceil(solver_result.bound - 1e-6)))
+            if solution.has_solution():
+                colors = solution.x.argmax(axis=1)
+            elif time_limit is None or solution.status not in (STATUS_NOT_SOLVED, STATUS_UNDEFINED):
+                raise ValueError(f"No coloring found with k={k}, r={r} (status '{solution.status}')")
+            else:
+                colors = best if best_used <= k else None
+            logger.info(f'r={r}: {solver_result}')
+
+        if colors is None:
+            result = Coloring_Result(None, COLORING_STATUS.TIMEOUT_NO_SOLUTION, lower)
+        else:
+            assert_valid_coloring(model.adjacency, colors, order)
+            result = Coloring_Result.from_coloring(dict(zip(model.labels, colors.tolist())), lower)
+            previous = colors
+        proven = result.lower_bound
+        results[order] = result
+
+        yield r, result, perf_counter() - start
+        start = perf_counter()
@@ -0,0 +1,292 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+from time import perf_counter
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .model import (
+    Coloring_Solution, Solver_Result,
+    STATUS_INFEASIBLE, STATUS_NOT_SOLVED, STATUS_OPTIMAL, STATUS_UNBOUNDED, STATUS_UNDEFINED,
+)
+from .sparse_model import Sparse_Coloring_Model
+
+class SOLVER_BACKEND(Enum):
+    HIGHS = 'HIGHS'
+    GLPK = 'GLPK'
+    CBC = 'CBC'
+
+DEFAULT_SOLVER_BACKEND = SOLVER_BACKEND.HIGHS
+
+class Solver_Backend(ABC):
+    """A MILP solver that takes a Sparse_Coloring_Model in one call."""
+    name: SOLVER_BACKEND
+
+    @abstractmethod
+    def solve(
+        self,
+        model: Sparse_Coloring_Model,
+        threads: Optional[int] = None,
+        time_limit: Optional[float] = None,
+        warm_start: Optional[NDArray[np.float64]] = None,
+        mip_gap: Optional[float] = None,
+    ) -> Tuple[Solver_Result, Optional[NDArray[np.float64]]]:
+        """Solve the model.
+
+        Args:
+            model: Model in matrix form
+            threads: Thread budget for the solve (None lets the solver decide)
+            time_limit: Wall time limit in seconds (None for no limit)
+            warm_start: Feasible column vector used as the first incumbent, when supported
+            mip_gap: Relative gap between incumbent and bound at which to stop (None for the solver default)
+
+        Returns:
+            Tuple of (solver result, column values or None when no solution was found)
+        """
+
+    def available(self) -> bool:
+        return True
+
+    def open_session(self, model: Sparse_Coloring_Model, threads: Optional[int] = None) -> 'Solver_Session':
+        """Session that solves model repeatedly, changing only its bounds in between."""
+        return Solver_Session(self, model, threads)
+
+class Solver_Session:
+    """A model solved several times with only row and column bounds changed in between.
+
+    The bounds are changed on the model itself. This default hands the whole
+    model to the backend again on every solve; backends that keep a model
+    loaded pass on only the changed bounds.
+    """
+
+    def __init__(self, backend: Solver_Backend, model: Sparse_Coloring_Model, threads: Optional[int] = None):
+        self.backend = backend
+        self.model = model
+        self.threads = threads
+
+    def set_row_bounds(self, rows: NDArray[np.int64], lower: NDArray[np.float64], upper: NDArray[np.float64]):
+        self.model.row_lower[rows] = lower
+        self.model.row_upper[rows] = upper
+
+    def set_col_bounds(self, columns: NDArray[np.int64], lower: NDArray[np.float64], upper: NDArray[np.float64]):
+        self.model.col_lower[columns] = lower
+        self.model.col_upper[columns] = upper
+
+    def solve(
+        self,
+        time_limit: Optional[float] = None,
+        warm_start: Optional[NDArray[np.float64]] = None,
+        mip_gap: Optional[float] = None,
+    ) -> Tuple[Solver_Result, Optional[NDArray[np.float64]]]:
+        """Solve the model with its current bounds, as Solver_Backend.solve."""
+        return self.backend.solve(self.model, self.threads, time_limit, warm_start, mip_gap)
+
+# HiGHS default of mip_rel_gap, restored between the solves of a session
+MIP_REL_GAP_DEFAULT = 1e-4
+
+class HiGHS_Backend(Solver_Backend):
+    """In-process HiGHS through highspy: no subprocess, no temporary files, multi-threaded."""
+    name = SOLVER_BACKEND.HIGHS
+
+    def solve(self, model, threads=None, time_limit=None, warm_start=None, mip_gap=None):
+        start = perf_counter()
+        highs = self._load(model, threads)
+        return self._run(highs, start, time_limit, warm_start, mip_gap)
+
+    def open_session(self, model, threads=None):
+        return HiGHS_Session(self, model, threads)
+
+    @staticmethod
+    def _load(model: Sparse_Coloring_Model, threads: Optional[int]):
+        import highspy
+
+        highs = highspy.Highs()
+        highs.setOptionValue('output_flag', False)
+        if threads is not None:
+            highs.setOptionValue('threads', int(threads))
+
+        lp = highspy.HighsLp()
+        lp.num_col_ = model.n_columns
+        lp.num_row_ = model.matrix.shape[0]
+        lp.col_cost_ = model.objective
+        lp.col_lower_ = model.col_lower
+        lp.col_upper_ = model.col_upper
+        lp.row_lower_ = model.row_lower
+        lp.row_upper_ = model.row_upper
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        lp.a_matrix_.num_col_ = model.n_columns
+        lp.a_matrix_.num_row_ = model.matrix.shape[0]
+        lp.a_matrix_.start_ = model.matrix.indptr
+        lp.a_matrix_.index_ = model.matrix.indices
+        lp.a_matrix_.value_ = model.matrix.data
+        lp.integrality_ = np.where(model.integrality == 1, highspy.HighsVarType.kInteger, highspy.HighsVarType.kContinuous).tolist()
+        highs.passModel(lp)
+        return highs
+
+    def _run(self, highs, start: float, time_limit: Optional[float], warm_start: Optional[NDArray[np.float64]], mip_gap: Optional[float]):
+        """Solve the model loaded in highs; unset options go back to the HiGHS defaults."""
+        import highspy
+
+        highs.setOptionValue('time_limit', float(time_limit) if time_limit is not None else highspy.kHighsInf)
+        highs.setOptionValue('mip_rel_gap', float(mip_gap) if mip_gap is not None else MIP_REL_GAP_DEFAULT)
+        if warm_start is not None:
+            solution = highspy.HighsSolution()
+            solution.col_value = warm_start.tolist()
+            solution.value_valid = True
+            highs.setSolution(solution)
+        highs.run()
+
+        model_status = highs.getModelStatus()
+        info = highs.getInfo()
+        has_solution = info.primal_solution_status == highspy.SolutionStatus.kSolutionStatusFeasible
+        values = np.asarray(highs.getSolution().col_value) if has_solution else None
+
+        result = Solver_Result(
+            backend=self.name.value,
+            status=self._status(highspy, model_status),
+            objective=info.objective_function_value if has_solution else None,
+            bound=info.mip_dual_bound if np.isfinite(info.mip_dual_bound) else None,
+            wall_time=perf_counter() - start,
+        )
+        return result, values
+
+    @staticmethod
+    def _status(highspy, model_status) -> str:
+        status = highspy.HighsModelStatus
+        if model_status == status.kOptimal:
+            return STATUS_OPTIMAL
+        if model_status in (status.kInfeasible, status.kUnboundedOrInfeasible):
+            return STATUS_INFEASIBLE
+        if model_status == status.kUnbounded:
+            return STATUS_UNBOUNDED
+        if model_status in (status.kTimeLimit, status.kIterationLimit, status.kSolutionLimit, status.kInterrupt, status.kObjectiveBound, status.kObjectiveTarget):
+            return STATUS_NOT_SOLVED
+        return STATUS_UNDEFINED
+
+class HiGHS_Session(Solver_Session):
+    """One HiGHS instance loaded once; bound changes are passed to it in place.
+
+    Only the bounds that differ from the current ones are sent, and each
+    solve starts from its warm start instead of a newly built model.
+    """
+
+    def __init__(self, backend: HiGHS_Backend, model: Sparse_Coloring_Model, threads: Optional[int] = None):
+        super().__init__(backend, model, threads)
+        self.highs = backend._load(model, threads)
+
+    def set_row_bounds(self, rows, lower, upper):
+        rows = np.asarray(rows, dtype=np.int64)
+        lower = np.broadcast_to(np.asarray(lower, dtype=np.float64), rows.shape)
+        upper = np.broadcast_to(np.asarray(upper, dtype=np.float64), rows.shape)
+        changed = (self.model.row_lower[rows] != lower) | (self.model.row_upper[rows] != upper)
+        super().set_row_bounds(rows, lower, upper)
+        # highspy only binds the single-row call
+        for row, row_lower, row_upper in zip(rows[changed].tolist(), lower[changed].tolist(), upper[changed].tolist()):
+            self.highs.changeRowBounds(row, row_lower, row_upper)
+
+    def set_col_bounds(self, columns, lower, upper):
+        columns = np.asarray(columns, dtype=np.int64)
+        super().set_col_bounds(columns, lower, upper)
+        self.highs.changeColsBounds(
+            len(columns), columns.astype(np.int32), self.model.col_lower[columns], self.model.col_upper[columns]
+        )
+
+    def solve(self, time_limit=None, warm_start=None, mip_gap=None):
+        return self.backend._run(self.highs, perf_counter(), time_limit, warm_start, mip_gap)
+
+class PuLP_Backend(Solver_Backend):
+    """Command line solvers driven through PuLP (one subprocess per solve)."""
+
+    @abstractmethod
+    def _solver(self, threads: Optional[int], time_limit: Optional[float], warm_start: bool, mip_gap: Optional[float] = None):
+        """PuLP solver command configured for one solve."""
+
+    def available(self) -> bool:
+        return self._solver(None, None, False).available()
+
+    def solve(self, model, threads=None, time_limit=None, warm_start=None, mip_gap=None):
+        from pulp import LpStatus, LpSolutionIntegerFeasible, LpSolutionOptimal
+
+        start = perf_counter()
+        solver = self._solver(threads, time_limit, warm_start is not None, mip_gap)
+        if not solver.available():
+            raise ValueError(f"Solver backend '{self.name.value}' is not available")
+
+        problem = model.to_lp_problem()
+        variables = problem.variablesDict()
+        columns = [variables[name] for name in model.column_names()]
+        if warm_start is not None:
+            for variable, value in zip(columns, warm_start):
+                variable.setInitialValue(value)
+        problem.solve(solver=solver)
+
+        has_solution = problem.sol_status in (LpSolutionOptimal, LpSolutionIntegerFeasible)
+        values = None
+        if has_solution:
+            values = np.array([variable.varValue or 0 for variable in columns], dtype=np.float64)
+
+        status = LpStatus[problem.status]
+        if status == STATUS_OPTIMAL and problem.sol_status != LpSolutionOptimal:
+            # Stopped by the time limit with an incumbent: feasible, not proven optimal
+            status = STATUS_NOT_SOLVED
+        objective = float(np.dot(model.objective, values)) if has_solution else None
+        result = Solver_Result(
+            backend=self.name.value,
+            status=status,
+            objective=objective,
+            # Stopping at a gap is also reported as optimal, so only an exact solve proves the bound
+            bound=objective if status == STATUS_OPTIMAL and not mip_gap else None,
+            wall_time=perf_counter() - start,
+        )
+        return result, values
+
+class GLPK_Backend(PuLP_Backend):
+    """glpsol subprocess; GLPK branch-and-bound is single-threaded and takes no warm start."""
+    name = SOLVER_BACKEND.GLPK
+
+    def _solver(self, threads, time_limit, warm_start, mip_gap=None):
+        from pulp import GLPK_CMD
+        return GLPK_CMD(msg=False, timeLimit=time_limit, options=['--mipgap', str(mip_gap)] if mip_gap is not None else None)
+
+class CBC_Backend(PuLP_Backend):
+    name = SOLVER_BACKEND.CBC
+
+    def _solver(self, threads, time_limit, warm_start, mip_gap=None):
+        from pulp import PULP_CBC_CMD
+        return PULP_CBC_CMD(msg=False, threads=threads, timeLimit=time_limit, warmStart=warm_start, gapRel=mip_gap)
+
+SOLVER_BACKENDS: Dict[SOLVER_BACKEND, Solver_Backend] = {}
+
+def register_backend(backend: Solver_Backend):
+    SOLVER_BACKENDS[backend.name] = backend
+
+def get_backend(name: Union[SOLVER_BACKEND, str, None] = None) -> Solver_Backend:
+    if name is None:
+        name = DEFAULT_SOLVER_BACKEND
+    try:
+        return SOLVER_BACKENDS[SOLVER_BACKEND(name.value if isinstance(name, Enum) else name)]
+    except (KeyError, ValueError):
+        raise ValueError(f"Solver backend '{name}' must be one of {[backend.value for backend in SOLVER_BACKENDS]}")
+
+register_backend(HiGHS_Backend())
+register_backend(GLPK_Backend())
+register_backend(CBC_Backend())
+
+def solve_sparse_model(
+    model: Sparse_Coloring_Model,
+    solver: Union[SOLVER_BACKEND, str, None] = None,
+    threads: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    initial_coloring: Optional[NDArray[np.int64]] = None,
+    mip_gap: Optional[float] = None,
+) -> Coloring_Solution:
+    """Hand the matrix model to a solver backend and read the solution back as arrays.
+
+    initial_coloring (one color per vertex) is passed as a warm start when it fits the model.
+    """
+    warm_start = model.solution_vector(initial_coloring) if initial_coloring is not None else None
+    result, values = get_backend(solver).solve(model, threads=threads, time_limit=time_limit, warm_start=warm_start, mip_gap=mip_gap)
+    solution = model.to_solution(result.status, values)
+    solution.result = result
+    return solution
@@ -0,0 +1,316 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy import sparse
+
+from .adjacency import Adjacency_Type, adjacency_to_csr, csr_arcs, csr_edges
+from .model import Coloring_Solution, MODEL_METHOD
+from .symmetry import anchored_vertex_order, greedy_max_clique
+
+T = TypeVar('T')
+
+@dataclass
+class Sparse_Coloring_Model:
+    """ACR family model in matrix form: minimize c·z s.t. row_lower <= A·z <= row_upper.
+
+    Columns are laid out as [w (k), x (|V|·k), q (|V|·k)] with x and q stored
+    row-major per vertex, so x[v, c] is column k + v·k + c.
+    """
+    method: MODEL_METHOD
+    labels: List[T]
+    adjacency: sparse.csr_array
+    k: int
+    r: int
+    objective: NDArray[np.float64]
+    matrix: sparse.csr_array
+    row_lower: NDArray[np.float64]
+    row_upper: NDArray[np.float64]
+    col_lower: NDArray[np.float64]
+    col_upper: NDArray[np.float64]
+    integrality: NDArray[np.int8]
+    # Order along which colors first appear in canonical solutions (see symmetry_breaking)
+    vertex_order: NDArray[np.int64] = None
+    # Row of constraint 5 of every vertex, the only rows that depend on r
+    required_rows: NDArray[np.int64] = None
+
+    @property
+    def n_vertices(self) -> int:
+        return len(self.labels)
+
+    @property
+    def n_columns(self) -> int:
+        return self.k + 2 * self.n_vertices * self.k
+
+    def x_columns(self, v, c):
+        return self.k + np.asarray(v) * self.k + np.asarray(c)
+
+    def q_columns(self, v, c):
+        return self.k + (self.n_vertices + np.asarray(v)) * self.k + np.asarray(c)
+
+    def required_colors(self, r: int) -> NDArray[np.float64]:
+        """Right-hand side of constraint 5 for order r: min(r, deg(v)) per vertex."""
+        return np.minimum(r, np.diff(self.adjacency.indptr)).astype(np.float64)
+
+    def split(self, values: NDArray) -> Tuple[NDArray, NDArray, NDArray]:
+        """Split a solution vector into its (w, x, q) arrays."""
+        k, n_vertices = self.k, self.n_vertices
+        w = values[:k]
+        x = values[k:k + n_vertices * k].reshape(n_vertices, k)
+        q = values[k + n_vertices * k:].reshape(n_vertices, k)
+        return w, x, q
+
+    def solution_vector(self, colors: NDArray[np.int64]) -> Optional[NDArray[np.float64]]:
+        """Encode a coloring (one color per CSR row) as a column vector of this model.
+
+        Colors are relabeled by first appearance along vertex_order, which matches
+        the w ordering and the symmetry-breaking fixings. Returns None when the
+        coloring does not fit the column bounds (too many colors or fixed values).
+        """
+        colors = np.asarray(colors, dtype=np.int64)
+        order = self.vertex_order if self.vertex_order is not None else np.arange(self.n_vertices)
+        _, first_positions = np.unique(colors[order], return_index=True)
+        relabel = np.empty(colors.max() + 1, dtype=np.int64)
+        relabel[colors[order][first_positions]] = np.argsort(np.argsort(first_positions))
+        colors = relabel[colors]
+        if colors.max() >= self.k:
+            return None
+
+        x = np.zeros((self.n_vertices, self.k))
+        x[np.arange(self.n_vertices), colors] = 1
+        q = (self.adjacency @ x > 0).astype(np.float64)
+        w = np.zeros(self.k)
+        w[:colors.max() + 1] = 1
+        values = np.concatenate([w, x.ravel(), q.ravel()])
+        if np.any(values < self.col_lower) or np.any(values > self.col_upper):
+            return None
+        return values
+
+    def column_names(self) -> List[str]:
+        names = [f"w({k_i})" for k_i in range(self.k)]
+        names += [f"x({v},{k_i})" for v in self.labels for k_i in range(self.k)]
+        names += [f"q({v},{k_i})" for v in self.labels for k_i in range(self.k)]
+        return names
+
+    def to_solution(self, status: str, values: NDArray = None) -> Coloring_Solution:
+        if values is None:
+            return Coloring_Solution(status=status, labels=self.labels, w=None, x=None, q=None)
+        w, x, q = self.split(np.rint(values).astype(np.int_))
+        return Coloring_Solution(status=status, labels=self.labels, w=w, x=x, q=q)
+
+    def to_lp_problem(self, name: str = "Coloring"):
+        """Materialize the model as a PuLP problem (LP export and command line solvers)."""
+        from pulp import LpAffineExpression, LpConstraint, LpConstraintEQ, LpConstraintGE, LpConstraintLE, LpMinimize, LpProblem, LpVariable
+
+        variables = [
+            LpVariable(column_name, lowBound=lower, upBound=upper, cat="Binary")
+            for column_name, lower, upper in zip(self.column_names(), self.col_lower, self.col_upper)
+        ]
+        model = LpProblem(name=name, sense=LpMinimize)
+        model += LpAffineExpression([(variables[j], self.objective[j]) for j in np.flatnonzero(self.objective)])
+
+        indptr, indices, data = self.matrix.indptr, self.matrix.indices, self.matrix.data
+        for i in range(self.matrix.shape[0]):
+            expression = LpAffineExpression([(variables[j], a) for j, a in zip(indices[indptr[i]:indptr[i + 1]], data[indptr[i]:indptr[i + 1]])])
+            lower, upper = self.row_lower[i], self.row_upper[i]
+            if lower == upper:
+                model += LpConstraint(expression, LpConstraintEQ, rhs=lower)
+                continue
+            if np.isfinite(lower):
+                model += LpConstraint(expression, LpConstraintGE, rhs=lower)
+            if np.isfinite(upper):
+                model += LpConstraint(expression, LpConstraintLE, rhs=upper)
+        return model
+
+class _Row_Blocks:
+    """Accumulates COO triplets and row bounds block by block."""
+    def __init__(self):
+        self.rows: List[NDArray] = []
+        self.cols: List[NDArray] = []
+        self.data: List[NDArray] = []
+        self.lower: List[NDArray] = []
+        self.upper: List[NDArray] = []
+        self.n_rows = 0
+
+    def add(self, n_rows: int, rows: NDArray, cols: NDArray, data: NDArray, lower: float, upper: float):
+        rows = np.asarray(rows).ravel() + self.n_rows
+        self.rows.append(rows)
+        self.cols.append(np.asarray(cols).ravel())
+        self.data.append(np.broadcast_to(np.asarray(data, dtype=np.float64), rows.shape).ravel())
+        self.lower.append(np.broadcast_to(np.asarray(lower, dtype=np.float64), (n_rows,)))
+        self.upper.append(np.broadcast_to(np.asarray(upper, dtype=np.float64), (n_rows,)))
+        self.n_rows += n_rows
+
+    def to_csr(self, n_columns: int) -> Tuple[sparse.csr_array, NDArray, NDArray]:
+        matrix = sparse.coo_array(
+            (np.concatenate(self.data), (np.concatenate(self.rows), np.concatenate(self.cols))),
+            shape=(self.n_rows, n_columns)
+        ).tocsr()
+        return matrix, np.concatenate(self.lower), np.concatenate(self.upper)
+
+def build_sparse_model(
+    adjacency: Adjacency_Type,
+    model_name: MODEL_METHOD,
+    k: int,
+    r: int,
+    previous_variables: Coloring_Solution = None,
+    symmetry_breaking: bool = False,
+    lower_bound: int = None,
+    circulant_symmetry: bool = False,
+    required_colors: NDArray[np.int64] = None,
+) -> Sparse_Coloring_Model:
+    """Build the ACR/ACR-H/ACR-R/ACR-RH model directly as a sparse constraint matrix.
+
+    Args:
+        adjacency: Graph as an adjacency list or sparse adjacency matrix
+        model_name: Formulation to build
+        k: Number of available colors
+        r: Dynamic coloring order
+        previous_variables: Solution of a smaller graph whose colors are fixed (ACR-R, ACR-RH)
+        symmetry_breaking: Remove color permutation symmetry: fix a large clique to
+            colors 0..|K|-1 and let the vertex at position p of the anchored order use
+            only colors <= p
+        lower_bound: Known lower bound on the number of colors. For ACR and ACR-R it
+            fixes w[c] = 1 for c < lower_bound, so the solver's bound starts there and
+            the solve stops as soon as an incumbent reaches it
+        circulant_symmetry: Symmetry breaking for vertex-transitive graphs labeled so
+            that the rotation i -> i + 1 is an automorphism (circulants, antiprisms).
+            Rotating a vertex of the smallest color class to 0 and renaming its color
+            to 0 fixes x[0, 0] = 1 and, for ACR and ACR-R, makes color 0 the smallest
+            used class
+        required_colors: Per-vertex right-hand side of constraint 5 instead of
+            min(r, deg(v)), for quotient graphs whose vertices stand for several
+            vertices of a larger graph
+
+    Returns:
+        The model in matrix form, ready to be handed to a MILP solver in one call
+    """
+    method = MODEL_METHOD.parse(model_name)
+    if symmetry_breaking and previous_variables is not None:
+        raise ValueError("symmetry_breaking cannot be combined with previous_variables")
+    if circulant_symmetry and (symmetry_breaking or previous_variables is not None):
+        raise ValueError("circulant_symmetry cannot be combined with symmetry_breaking or previous_variables")
+
+    labels, adjacency_matrix = adjacency_to_csr(adjacency)
+    n_vertices = len(labels)
+    degrees = np.diff(adjacency_matrix.indptr)
+    heads, tails = csr_arcs(adjacency_matrix)
+    edge_u, edge_v = csr_edges(adjacency_matrix)
+    n_arcs, n_edges = len(heads), len(edge_u)
+
+    model = Sparse_Coloring_Model(
+        method=method, labels=labels, adjacency=adjacency_matrix, k=k, r=r,
+        objective=None, matrix=None, row_lower=None, row_upper=None,
+        col_lower=None, col_upper=None, integrality=None,
+    )
+    colors = np.arange(k)
+    vertices = np.arange(n_vertices)
+    w_columns = colors
+    x_columns = model.x_columns(vertices[:, None], colors[None, :])
+    q_columns = model.q_columns(vertices[:, None], colors[None, :])
+    hard_colors = method in [MODEL_METHOD.ACR_H, MODEL_METHOD.ACR_RH]
+
+    blocks = _Row_Blocks()
+    # Constraint 1: sum_c x[v, c] == 1
+    blocks.add(n_vertices, np.repeat(vertices, k), x_columns, 1, 1, 1)
+    # Constraint 2: x[u, c] + x[v, c] <= w[c] (<= 1 for ACR-H, ACR-RH)
+    edge_rows = (np.arange(n_edges)[:, None] * k + colors[None, :]).ravel()
+    if hard_colors:
+        blocks.add(
+            n_edges * k,
+            np.concatenate([edge_rows, edge_rows]),
+            np.concatenate([x_columns[edge_u].ravel(), x_columns[edge_v].ravel()]),
+            1, -np.inf, 1
+        )
+    else:
+        blocks.add(
+            n_edges * k,
+            np.concatenate([edge_rows, edge_rows, edge_rows]),
+            np.concatenate([x_columns[edge_u].ravel(), x_columns[edge_v].ravel(), np.tile(w_columns, n_edges)]),
+            np.concatenate([np.ones(2 * n_edges * k), -np.ones(n_edges * k)]),
+            -np.inf, 0
+        )
+        # Constraint 3: w[c] <= sum_v x[v, c]
+        blocks.add(
+            k,
+            np.concatenate([colors, np.tile(colors, n_vertices)]),
+            np.concatenate([w_columns, x_columns.ravel()]),
+            np.concatenate([np.ones(k), -np.ones(n_vertices * k)]),
+            -np.inf, 0
+        )
+        # Constraint 4: w[c - 1] >= w[c]
+        blocks.add(
+            k - 1,
+            np.concatenate([colors[:-1], colors[:-1]]),
+            np.concatenate([w_columns[:-1], w_columns[1:]]),
+            np.concatenate([np.ones(k - 1), -np.ones(k - 1)]),
+            0, np.inf
+        )
+    # Constraint 5: sum_c q[v, c] >= min(r, deg(v))
+    required = np.minimum(r, degrees) if required_colors is None else required_colors
+    model.required_rows = blocks.n_rows + vertices
+    blocks.add(n_vertices, np.repeat(vertices, k), q_columns, 1, required, np.inf)
+    # Constraint 6: sum_{u in N(v)} x[u, c] >= q[v, c]
+    blocks.add(
+        n_vertices * k,
+        np.concatenate([(heads[:, None] * k + colors[None, :]).ravel(), (vertices[:, None] * k + colors[None, :]).ravel()]),
+        np.concatenate([x_columns[tails].ravel(), q_columns.ravel()]),
+        np.concatenate([np.ones(n_arcs * k), -np.ones(n_vertices * k)]),
+        0, np.inf
+    )
+    # Constraint 7: q[v, c] >= x[u, c] for every u in N(v)
+    arc_rows = (np.arange(n_arcs)[:, None] * k + colors[None, :]).ravel()
+    blocks.add(
+        n_arcs * k,
+        np.concatenate([arc_rows, arc_rows]),
+        np.concatenate([q_columns[heads].ravel(), x_columns[tails].ravel()]),
+        np.concatenate([np.ones(n_arcs * k), -np.ones(n_arcs * k)]),
+        0, np.inf
+    )
+    if circulant_symmetry and not hard_colors and k > 1:
+        # Smallest class: sum_v x[v, 0] - sum_v x[v, c] + n * w[c] <= n for c >= 1
+        blocks.add(
+            k - 1,
+            np.concatenate([np.repeat(colors[:-1], n_vertices), np.repeat(colors[:-1], n_vertices), colors[:-1]]),
+            np.concatenate([np.tile(x_columns[:, 0], k - 1), x_columns[:, 1:].T.ravel(), w_columns[1:]]),
+            np.concatenate([np.ones(n_vertices * (k - 1)), -np.ones(n_vertices * (k - 1)), np.full(k - 1, n_vertices)]),
+            -np.inf, n_vertices
+        )
+
+    model.matrix, model.row_lower, model.row_upper = blocks.to_csr(model.n_columns)
+    model.objective = np.zeros(model.n_columns)
+    model.objective[w_columns] = 1
+    model.col_lower = np.zeros(model.n_columns)
+    model.col_upper = np.ones(model.n_columns)
+    model.integrality = np.ones(model.n_columns, dtype=np.int8)
+
+    if previous_variables is not None and previous_variables.has_solution() and method in [MODEL_METHOD.ACR_R, MODEL_METHOD.ACR_RH]:
+        previous_w = previous_variables.w[:k]
+        used = len(previous_w) if np.all(previous_w != 0) else int(np.argmin(previous_w != 0))
+        model.col_lower[w_columns[:used]] = model.col_upper[w_columns[:used]] = previous_w[:used]
+
+        previous_x = np.zeros((previous_variables.x.shape[0], k))
+        shared_colors = min(k, previous_variables.x.shape[1])
+        previous_x[:, :shared_colors] = previous_variables.x[:, :shared_colors]
+        fixed_columns = x_columns[:previous_x.shape[0]].ravel()
+        model.col_lower[fixed_columns] = model.col_upper[fixed_columns] = previous_x.ravel()
+
+    if symmetry_breaking:
+        clique = greedy_max_clique(adjacency_matrix)[:k]
+        order = anchored_vertex_order(n_vertices, clique)
+        # Vertex-anchored ordering: x[order[p], c] = 0 for c > p
+        positions = np.empty(n_vertices, dtype=np.int64)
+        positions[order] = np.arange(n_vertices)
+        model.col_upper[x_columns[colors[None, :] > positions[:, None]]] = 0
+        # Clique orbit fixing: x[clique[j], j] = 1
+        model.col_lower[x_columns[clique, np.arange(len(clique))]] = 1
+        model.vertex_order = order
+
+    if circulant_symmetry and n_vertices > 0:
+        model.col_lower[x_columns[0, 0]] = 1
+
+    if lower_bound is not None and not hard_colors:
+        model.col_lower[w_columns[:lower_bound]] = 1
+
+    return model
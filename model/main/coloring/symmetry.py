@@ -0,0 +1,53 @@
+from typing import List
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy import sparse
+
+# Number of highest-degree vertices used as clique seeds
+CLIQUE_SEEDS = 64
+
+def greedy_max_clique(adjacency_matrix: sparse.csr_array, seeds: int = CLIQUE_SEEDS) -> NDArray[np.int64]:
+    """Find a large clique by greedy extension from the highest-degree vertices.
+
+    Every vertex of the returned clique needs its own color, so it can be
+    fixed to colors 0..|K|-1 without losing optimality.
+
+    Args:
+        adjacency_matrix: Symmetric CSR adjacency matrix
+        seeds: Number of start vertices to try
+
+    Returns:
+        Vertex indices of the clique, in the order they were added
+    """
+    n_vertices = adjacency_matrix.shape[0]
+    if n_vertices == 0:
+        return np.empty(0, dtype=np.int64)
+
+    indptr, indices = adjacency_matrix.indptr, adjacency_matrix.indices
+    neighbors = lambda v: set(indices[indptr[v]:indptr[v + 1]].tolist())
+    degrees = np.diff(indptr)
+
+    best: List[int] = [int(np.argmax(degrees))]
+    for seed in np.argsort(-degrees, kind='stable')[:seeds].tolist():
+        if degrees[seed] < len(best):
+            break
+        clique = [seed]
+        candidates = neighbors(seed)
+        while candidates:
+            # Keep the candidate that leaves the most candidates behind
+            v = max(candidates, key=lambda u: (len(candidates & neighbors(u)), -u))
+            clique.append(v)
+            candidates &= neighbors(v)
+        if len(clique) > len(best):
+            best = clique
+    return np.asarray(best, dtype=np.int64)
+
+def anchored_vertex_order(n_vertices: int, clique: NDArray[np.int64]) -> NDArray[np.int64]:
+    """Order the vertices with the clique first and the rest by index.
+
+    Relabeling the colors of any coloring by first appearance along this order
+    gives the clique colors 0..|K|-1 and the vertex at position p a color <= p.
+    """
+    rest = np.setdiff1d(np.arange(n_vertices), clique, assume_unique=False)
+    return np.concatenate([clique, rest]).astype(np.int64)
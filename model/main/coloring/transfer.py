@@ -0,0 +1,218 @@
+import threading
+from functools import lru_cache
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+# Largest number of window states a transfer graph is built with
+MAX_TRANSFER_STATES = 2_000_000
+
+# Largest dense state array (entries) held while walking: states x start windows,
+# or the checkpointed frames of one coloring
+MAX_TRANSFER_CELLS = 200_000_000
+
+class Transfer_Deadline(TimeoutError):
+    """The deadline passed before any number of colors up to k was decided."""
+
+    def __init__(self, lower_bound: int):
+        super().__init__(f"Transfer graph search stopped by the deadline; at least {lower_bound} colors are needed")
+        # Every smaller number of colors was shown to admit no coloring
+        self.lower_bound = lower_bound
+
+def _proper_windows(connections: Tuple[int, ...], k: int, width: int) -> NDArray[np.int8]:
+    """Every color sequence of length width with c[i] != c[i + s] for s in S.
+
+    Rows are built prefix by prefix, so they come out in lexicographic order.
+    """
+    windows = np.arange(k, dtype=np.int8)[:, None]
+    for position in range(1, width):
+        windows = np.concatenate([
+            np.repeat(windows, k, axis=0),
+            np.tile(np.arange(k, dtype=np.int8), len(windows))[:, None]
+        ], axis=1)
+        proper = np.ones(len(windows), dtype=bool)
+        for s in connections:
+            if s <= position:
+                proper &= windows[:, position] != windows[:, position - s]
+        windows = windows[proper]
+        if len(windows) > MAX_TRANSFER_STATES:
+            raise ValueError(f"Transfer graph for S={list(connections)}, k={k} exceeds {MAX_TRANSFER_STATES} states")
+    return windows
+
+class Circulant_Transfer_Graph:
+    """Window-state transfer graph of the r-dynamic k-colorings of C_n(S).
+
+    A coloring of C_n(S) with n > 2s, s = max(S), is a cyclic word whose vertex
+    i only sees the colors of i - s .. i + s. States are the proper windows of
+    2s consecutive colors, and window j steps to window j + 1 when the 2s + 1
+    colors they span satisfy vertex j + s. The k-colorings of C_n(S) are then
+    the closed walks of length n, for every n at once.
+
+    Only edges inside strongly connected components are kept, since a closed
+    walk never leaves one, and walks are only started from windows in
+    canonical color order (colors numbered by first appearance).
+    """
+
+    def __init__(self, connections: Tuple[int, ...], r: int, k: int):
+        self.connections = tuple(sorted(set(connections)))
+        self.r = r
+        self.k = k
+        s = max(self.connections)
+        self.width = 2 * s
+        required = min(r, 2 * len(self.connections))
+
+        self.windows = _proper_windows(self.connections, k, self.width)
+        n_states = len(self.windows)
+        powers = k ** np.arange(self.width - 1, -1, -1, dtype=np.int64)
+        codes = self.windows.astype(np.int64) @ powers
+
+        # Window (c_0 .. c_2s-1) followed by color c steps to (c_1 .. c_2s-1, c)
+        next_codes = (codes % powers[0])[:, None] * k + np.arange(k)[None, :]
+        targets = np.minimum(np.searchsorted(codes, next_codes), n_states - 1)
+        spans = np.concatenate([
+            np.repeat(self.windows[:, None, :], k, axis=1),
+            np.broadcast_to(np.arange(k, dtype=np.int8)[None, :, None], (n_states, k, 1))
+        ], axis=2)
+        neighbors = np.sort(spans[:, :, [s + sign * t for t in self.connections for sign in (-1, 1)]], axis=2)
+        distinct = 1 + np.count_nonzero(np.diff(neighbors, axis=2), axis=2)
+        valid = (codes[targets] == next_codes) & (distinct >= required)
+
+        rows = np.repeat(np.arange(n_states), k)[valid.ravel()]
+        cols = targets.ravel()[valid.ravel()]
+        _, components = connected_components(
+            sparse.csr_array((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n_states, n_states)),
+            directed=True, connection='strong'
+        )
+        inside = components[rows] == components[cols]
+        rows, cols = rows[inside], cols[inside]
+        # Predecessor lists: row w holds the windows that step to w
+        self.reverse = sparse.csr_array(
+            (np.ones(len(rows), dtype=np.int8), (cols, rows)), shape=(n_states, n_states)
+        )
+
+        on_cycle = np.zeros(n_states, dtype=bool)
+        on_cycle[rows] = True
+        first_seen = np.maximum.accumulate(self.windows, axis=1)
+        canonical = (self.windows[:, 0] == 0) & np.all(self.windows[:, 1:] <= first_seen[:, :-1] + 1, axis=1)
+        self.starts = np.flatnonzero(canonical & on_cycle)
+
+        if n_states * len(self.starts) > MAX_TRANSFER_CELLS:
+            raise ValueError(
+                f"Transfer graph for S={list(self.connections)}, k={k} has {n_states} states and "
+                f"{len(self.starts)} start windows, more than {MAX_TRANSFER_CELLS} cells"
+            )
+
+        self._lock = threading.Lock()
+        # Column i marks the windows reachable from starts[i] in _steps steps
+        self._reachable = sparse.csr_array(
+            (np.ones(len(self.starts), dtype=np.int8), (self.starts, np.arange(len(self.starts)))),
+            shape=(n_states, len(self.starts))
+        ).toarray()
+        self._steps = 0
+        # n -> start window of a closed walk of length n, None when there is none
+        self._closing: Dict[int, Optional[int]] = {}
+
+    @property
+    def n_states(self) -> int:
+        return len(self.windows)
+
+    def closed_walk_start(self, n: int) -> Optional[int]:
+        """Start window of a closed walk of length n, or None if C_n(S) has no k-coloring.
+
+        Reachability is advanced one step at a time and every length passed on
+        the way is recorded, so a sweep over n costs one walk up to the largest n.
+        """
+        if n <= self.width:
+            raise ValueError(f"Transfer graph needs n > {self.width}, got n={n}")
+        with self._lock:
+            while self._steps < n and len(self.starts):
+                self._reachable = (self.reverse @ self._reachable > 0).astype(np.int8)
+                self._steps += 1
+                closing = np.flatnonzero(self._reachable[self.starts, np.arange(len(self.starts))])
+                self._closing[self._steps] = int(self.starts[closing[0]]) if len(closing) else None
+            return self._closing.get(n)
+
+    def feasible_orders(self, n_values: List[int]) -> Dict[int, bool]:
+        """Whether C_n(S) has an r-dynamic k-coloring, for every n given."""
+        return {n: self.closed_walk_start(n) is not None for n in n_values}
+
+    def _advance(self, forward: sparse.csr_array, frame: NDArray[np.bool_]) -> NDArray[np.bool_]:
+        """Windows one step after the windows marked in frame."""
+        following = np.zeros(self.n_states, dtype=bool)
+        following[forward[frame].indices] = True
+        return following
+
+    def coloring(self, n: int) -> Optional[NDArray[np.int64]]:
+        """An r-dynamic coloring of C_n(S) with at most k colors, one per vertex.
+
+        The windows reachable at each step are only kept every ~sqrt(n) steps;
+        the walk back recomputes the steps of one segment at a time from its
+        checkpoint, so memory grows with sqrt(n) rather than n.
+        """
+        start = self.closed_walk_start(n)
+        if start is None:
+            return None
+        stride = int(np.ceil(np.sqrt(n)))
+        if 2 * stride * self.n_states > MAX_TRANSFER_CELLS:
+            raise ValueError(f"Walk of length {n} over {self.n_states} states exceeds {MAX_TRANSFER_CELLS} cells")
+
+        forward = self.reverse.T.tocsr()
+        checkpoints = []
+        frame = np.zeros(self.n_states, dtype=bool)
+        frame[start] = True
+        for step in range(n):
+            if step % stride == 0:
+                checkpoints.append(frame)
+            if step < n - 1:
+                frame = self._advance(forward, frame)
+
+        # Walk back from the start to the start, one predecessor per step
+        walk = np.empty(n, dtype=np.int64)
+        state = start
+        for segment in range(len(checkpoints) - 1, -1, -1):
+            first = segment * stride
+            frames = [checkpoints[segment]]
+            for _ in range(first + 1, min(first + stride, n)):
+                frames.append(self._advance(forward, frames[-1]))
+            for step in range(first + len(frames) - 1, first - 1, -1):
+                predecessors = self.reverse.indices[self.reverse.indptr[state]:self.reverse.indptr[state + 1]]
+                state = int(predecessors[np.argmax(frames[step - first][predecessors])])
+                walk[step] = state
+        return self.windows[walk, 0].astype(np.int64)
+
+@lru_cache(maxsize=8)
+def transfer_graph(connections: Tuple[int, ...], r: int, k: int) -> Circulant_Transfer_Graph:
+    """Transfer graph for (S, r, k), built once and shared by every n."""
+    return Circulant_Transfer_Graph(connections, r, k)
+
+def transfer_matrix_coloring(
+    n_vertices: int,
+    connections: List[int],
+    r: int,
+    k: int,
+    lower_bound: int = None,
+    deadline: float = None,
+) -> Optional[NDArray[np.int64]]:
+    """Minimum r-dynamic coloring of C_n(S) with at most k colors, by transfer graphs.
+
+    The transfer graph is tried for every number of colors from the lower bound
+    up to k, so the first closed walk found is optimal. deadline, a
+    perf_counter() instant, is checked before each number of colors.
+
+    Returns:
+        Color per vertex, or None when k colors are not enough. Raises
+        Transfer_Deadline with the proven lower bound when the deadline passes
+    """
+    connections = tuple(sorted(set(connections)))
+    lower = max(min(r, 2 * len(connections)) + 1, lower_bound or 0)
+    for colors in range(lower, k + 1):
+        if deadline is not None and perf_counter() >= deadline:
+            raise Transfer_Deadline(colors)
+        coloring = transfer_graph(connections, r, colors).coloring(n_vertices)
+        if coloring is not None:
+            return coloring
+    return None
@@ -0,0 +1,95 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Union
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy import sparse
+
+from .adjacency import Adjacency_Type, T, adjacency_to_csr, csr_arcs
+
+@dataclass
+class Coloring_Violations:
+    # Vertices with no color
+    uncolored: List[T] = field(default_factory=list)
+    # Vertices that share their color with a neighbor
+    improper: List[T] = field(default_factory=list)
+    # Vertices whose neighbors show fewer than min(r, deg) colors
+    not_dynamic: List[T] = field(default_factory=list)
+    colors_used: int = 0
+
+    def is_valid(self) -> bool:
+        return not (self.uncolored or self.improper or self.not_dynamic)
+
+    def to_dict(self) -> dict:
+        return {
+            'valid': self.is_valid(),
+            'colors_used': self.colors_used,
+            'uncolored': self.uncolored,
+            'improper': self.improper,
+            'not_dynamic': self.not_dynamic,
+        }
+
+def neighbor_color_counts(adjacency_matrix: sparse.csr_array, colors: NDArray[np.int64]) -> NDArray[np.int64]:
+    """Number of distinct colors among the neighbors of every vertex.
+
+    Each arc becomes the key head * n_colors + color of its tail; the distinct
+    keys are counted per head after one sort.
+    """
+    heads, tails = csr_arcs(adjacency_matrix)
+    n_colors = int(colors.max()) + 1 if len(colors) else 1
+    keys = np.unique(heads * n_colors + colors[tails])
+    return np.bincount(keys // n_colors, minlength=adjacency_matrix.shape[0])
+
+def coloring_violations(
+    adjacency: Adjacency_Type,
+    coloring: Union[Dict[T, int], NDArray[np.int64]],
+    r: int,
+) -> Coloring_Violations:
+    """Check that a coloring is proper and r-dynamic, for every vertex at once.
+
+    Args:
+        adjacency: Adjacency list or square sparse matrix
+        coloring: Color per vertex label, or an array indexed like the CSR rows.
+            Negative colors count as missing
+        r: Dynamic coloring order
+
+    Returns:
+        Every violating vertex, by label
+    """
+    labels, adjacency_matrix = adjacency_to_csr(adjacency)
+    if isinstance(coloring, dict):
+        colors = np.fromiter((coloring.get(v, -1) for v in labels), dtype=np.int64, count=len(labels))
+    else:
+        colors = np.asarray(coloring, dtype=np.int64)
+        if len(colors) != len(labels):
+            raise ValueError(f"Coloring has {len(colors)} colors for {len(labels)} vertices")
+
+    def by_label(vertices: NDArray[np.int64]) -> List[T]:
+        return [labels[v] for v in vertices.tolist()]
+
+    uncolored = colors < 0
+    if np.any(uncolored):
+        return Coloring_Violations(uncolored=by_label(np.flatnonzero(uncolored)))
+
+    heads, tails = csr_arcs(adjacency_matrix)
+    improper = np.unique(heads[colors[heads] == colors[tails]])
+    degrees = np.diff(adjacency_matrix.indptr)
+    not_dynamic = np.flatnonzero(neighbor_color_counts(adjacency_matrix, colors) < np.minimum(r, degrees))
+    return Coloring_Violations(
+        improper=by_label(improper),
+        not_dynamic=by_label(not_dynamic),
+        colors_used=len(np.unique(colors)),
+    )
+
+def assert_valid_coloring(
+    adjacency: Adjacency_Type,
+    coloring: Union[Dict[T, int], NDArray[np.int64]],
+    r: int,
+) -> None:
+    """Raise ValueError naming the violating vertices if the coloring is not r-dynamic."""
+    violations = coloring_violations(adjacency, coloring, r)
+    if not violations.is_valid():
+        raise ValueError(
+            f"Invalid {r}-dynamic coloring: uncolored {violations.uncolored[:10]}, "
+            f"improper {violations.improper[:10]}, not dynamic {violations.not_dynamic[:10]}"
+        )
@@ -1,13 +1,15 @@
+from concurrent.futures import Future
 from typing import Callable, Union
 from loguru import logger
 import numpy as np
 from numpy.typing import NDArray
-from pulp import LpVariable, LpMinimize, LpStatus, LpProblem, lpSum, GLPK
-import networkx as nx
-import matplotlib.pyplot as plt
-import pandas as pd
 import os
-from .graph_constants import AVAILABLE_COLORS, MODEL_METHOD, EDGE_CONDITION
+from coloring.adjacency import adjacency_to_csr, csr_arcs, csr_edges
+from coloring.sparse_model import build_sparse_model
+from coloring.verify import Coloring_Violations, coloring_violations
+from coloring.solvers import SOLVER_BACKEND, solve_sparse_model
+from utils.render import RENDER_POOL, Plot_Style, render_plot_file
+from .graph_constants import AVAILABLE_COLORS, MODEL_METHOD, EDGE_CONDITION, TRIANGULAR_LATTICE_POSITION
 from .graph_details import Coloring_Solution, Graph_Colors, Graph_Details
 from .graph_types import EdgeType, SolutionCheckResponse, VertexType
         
@@ -75,228 +77,136 @@ class T_Grid_Graph():
         q: NDArray[NDArray[int]], 
         w: NDArray[int],
         model_name: MODEL_METHOD,
-        previous_variables: dict[str, LpVariable] = None,
+        previous_variables: Coloring_Solution = None,
     ):
+        """Check a model solution against constraints 1-7, each in one array pass.
+
+        Returns the first violated constraint with the values involved, or a
+        successful response when every constraint of the method holds.
+        """
         if model_name not in [MODEL_METHOD.ACR, MODEL_METHOD.ACR_H, MODEL_METHOD.ACR_R, MODEL_METHOD.ACR_RH]:
             raise ValueError(f"model_name must be '{MODEL_METHOD.ACR}', '{MODEL_METHOD.ACR_H}', '{MODEL_METHOD.ACR_R}' or '{MODEL_METHOD.ACR_RH}'")
 
-        if model_name != MODEL_METHOD.ACR:
-            raise NotImplementedError(f"model_name '{model_name}' is not implemented yet")  
-
-        adjacency_list = self.details.code.adjacency_list
-        edges = self.details.code.edges
-        degrees = self.details.misc.degree
-        k = len(w)
-        n = self.n
+        hard_colors = model_name in [MODEL_METHOD.ACR_H, MODEL_METHOD.ACR_RH]
+        labels, adjacency_matrix = adjacency_to_csr(self.details.code.adjacency_list)
+        x, q, w = np.asarray(x)[labels], np.asarray(q)[labels], np.asarray(w)
+        heads, tails = csr_arcs(adjacency_matrix)
+        edge_u, edge_v = csr_edges(adjacency_matrix)
+        degrees = np.diff(adjacency_matrix.indptr)
         r = self.r
 
+        def failure(constraint: int, expression: str, **variables):
+            return SolutionCheckResponse(success=False, constraint=constraint, expression=expression, variables=variables)
+
+        def first_violation(violated: NDArray[bool]):
+            hits = np.argwhere(violated)
+            return tuple(hits[0]) if len(hits) else None
+
         # Constraint 1
-        for v in adjacency_list.keys():
-            if not (np.sum(x[v]) == 1):
-                return SolutionCheckResponse(
-                    success=False,
-                    constraint=1,
-                    expression=f'{np.sum(x[v])} == 1',
-                    variables={
-                        "np.sum(x[v])": np.sum(x[v]),
-                        "v": v,
-                        "x[v]": x[v]
-                    }
-                )
-        
+        assigned = x.sum(axis=1)
+        violation = first_violation(assigned != 1)
+        if violation is not None:
+            v, = violation
+            return failure(1, f'{assigned[v]} == 1', v=labels[v], **{"x[v]": x[v]})
+
         # Constraint 2
-        for (u, v) in edges:
-            for k_i in range(k):
-                if model_name in [MODEL_METHOD.ACR_H, MODEL_METHOD.ACR_RH]:
-                    if not (x[u, k_i] + x[v, k_i] <= 1):
-                        return SolutionCheckResponse(
-                            success=False,
-                            constraint=2,
-                            expression=f'{x[u, k_i] + x[v, k_i]} <= 1',
-                            variables={
-                                "x[u, k_i]": x[u, k_i],
-                                "x[v, k_i]": x[v, k_i]
-                            }
-                        )
-                else:
-                    if not (x[u, k_i] + x[v, k_i] <= w[k_i]):
-                        return SolutionCheckResponse(
-                            success=False,
-                            constraint=2,
-                            expression=f'{x[u, k_i] + x[v, k_i]} <= {w[k_i]}',
-                            variables={
-                                "x[u, k_i]": x[u, k_i],
-                                "x[v, k_i]": x[v, k_i],
-                                "w[k_i]": w[k_i],
-                                "k_i": k_i,
-                                "u": u,
-                                "v": v
-                            }
-                        )
-        
-        # Constraint 3
-        if model_name in [MODEL_METHOD.ACR, MODEL_METHOD.ACR_R]:
-            for k_i  in range(k):
-                if not (w[k_i] <= np.sum(x[:, k_i])):
-                    return SolutionCheckResponse(
-                        success=False,
-                        constraint=3,
-                        expression=f'{np.sum(x[:, k_i])} <= {w[k_i]}',
-                        variables={
-                            "np.sum(x[:, k_i])": np.sum(x[:, k_i]),
-                            "w[k_i]": w[k_i],
-                            "k_i": k_i,
-                            "x[:, k_i]": x[:, k_i]
-                        }
-                    )
-        
-        # Constraint 4
-        if model_name in [MODEL_METHOD.ACR, MODEL_METHOD.ACR_R]:
-            for k_i in range(1, k):
-                if not (w[k_i - 1] >= w[k_i]):
-                    return SolutionCheckResponse(
-                        success=False,
-                        constraint=4,
-                        expression=f'{w[k_i - 1]} >= {w[k_i]}',
-                        variables={
-                            "w[k_i - 1]": w[k_i - 1],
-                            "w[k_i]": w[k_i],
-                            "k_i": k_i,
-                        }
-                    )
-        
+        edge_load = x[edge_u] + x[edge_v]
+        edge_limit = np.ones_like(w) if hard_colors else w
+        violation = first_violation(edge_load > edge_limit[None, :])
+        if violation is not None:
+            e, k_i = violation
+            return failure(
+                2, f'{edge_load[e, k_i]} <= {edge_limit[k_i]}',
+                u=labels[edge_u[e]], v=labels[edge_v[e]], k_i=k_i,
+                **{"x[u, k_i]": x[edge_u[e], k_i], "x[v, k_i]": x[edge_v[e], k_i], "w[k_i]": w[k_i]}
+            )
+
+        if not hard_colors:
+            # Constraint 3
+            class_sizes = x.sum(axis=0)
+            violation = first_violation(w > class_sizes)
+            if violation is not None:
+                k_i, = violation
+                return failure(3, f'{class_sizes[k_i]} >= {w[k_i]}', k_i=k_i, **{"w[k_i]": w[k_i], "x[:, k_i]": x[:, k_i]})
+
+            # Constraint 4
+            violation = first_violation(w[:-1] < w[1:])
+            if violation is not None:
+                k_i = violation[0] + 1
+                return failure(4, f'{w[k_i - 1]} >= {w[k_i]}', k_i=k_i, **{"w[k_i - 1]": w[k_i - 1], "w[k_i]": w[k_i]})
+
         # Constraint 5
-        for v, deg in degrees.items():
-            if not (np.sum(q[v]) >= min(r, deg)):
-                return SolutionCheckResponse(
-                    success=False,
-                    constraint=5,
-                    expression=f'{np.sum(q[v])} >= {min(r, deg)}',
-                    variables={
-                        "v": v,
-                        "deg": deg,
-                        "np.sum(q[v])": np.sum(q[v]),
-                        "min(r, deg)": min(r, deg),
-                        "q[v]": q[v],
-                        "r": r,
-                    }
-                )
-        
+        neighbor_colors = q.sum(axis=1)
+        required = np.minimum(r, degrees)
+        violation = first_violation(neighbor_colors < required)
+        if violation is not None:
+            v, = violation
+            return failure(
+                5, f'{neighbor_colors[v]} >= {required[v]}',
+                v=labels[v], deg=degrees[v], r=r, **{"q[v]": q[v]}
+            )
+
         # Constraint 6
-        for v, n_v in adjacency_list.items():
-            for k_i in range(k):
-                if not (np.sum(x[n_v, k_i]) >= q[v, k_i]):
-                    return SolutionCheckResponse(
-                        success=False,
-                        constraint=6,
-                        expression=f'{np.sum(x[n_v, k_i])} >= {q[v, k_i]}',
-                        variables={
-                            "np.sum(x[n_v, k_i])": np.sum(x[n_v, k_i]),
-                            "q[v, k_i]": q[v, k_i],
-                            "v": v,
-                            "k_i": k_i,
-                            "n_v": n_v,
-                            "x[n_v, k_i]": x[n_v, k_i]
-                        }
-                    )
-        
+        neighbor_counts = adjacency_matrix @ x
+        violation = first_violation(neighbor_counts < q)
+        if violation is not None:
+            v, k_i = violation
+            return failure(
+                6, f'{neighbor_counts[v, k_i]} >= {q[v, k_i]}',
+                v=labels[v], k_i=k_i, **{"q[v, k_i]": q[v, k_i]}
+            )
+
         # Constraint 7
-        for v, n_v in adjacency_list.items():
-            for u in n_v:
-                for k_i in range(k):
-                    if not (q[v, k_i] >= x[u, k_i]):
-                        return SolutionCheckResponse(
-                            success=False,
-                            constraint=7,
-                            expression=f'{q[v, k_i]} >= {x[u, k_i]}',
-                            variables={
-                                "q[v, k_i]": q[v, k_i],
-                                "x[u, k_i]": x[u, k_i],
-                                "v": v,
-                                "u": u,
-                                "k_i": k_i,
-                                "n_v": n_v
-                            }
-                        )
-        
+        violation = first_violation(q[heads] < x[tails])
+        if violation is not None:
+            arc, k_i = violation
+            v, u = heads[arc], tails[arc]
+            return failure(
+                7, f'{q[v, k_i]} >= {x[u, k_i]}',
+                v=labels[v], u=labels[u], k_i=k_i, **{"q[v, k_i]": q[v, k_i], "x[u, k_i]": x[u, k_i]}
+            )
+
         return SolutionCheckResponse(
             success=True
         )
         
 
-    def linear_programming_model(self, model_name: MODEL_METHOD, previous_variables=None, write_lp_path: str = None):
+    def linear_programming_model(
+        self,
+        model_name: MODEL_METHOD,
+        previous_variables: Coloring_Solution = None,
+        write_lp_path: str = None,
+        solver: SOLVER_BACKEND = None,
+        threads: int = None,
+        time_limit: float = None,
+        symmetry_breaking: bool = False,
+    ):
         if model_name not in [MODEL_METHOD.ACR, MODEL_METHOD.ACR_H, MODEL_METHOD.ACR_R, MODEL_METHOD.ACR_RH]:
             raise ValueError(f"model_name must be '{MODEL_METHOD.ACR}', '{MODEL_METHOD.ACR_H}', '{MODEL_METHOD.ACR_R}' or '{MODEL_METHOD.ACR_RH}'")
-        adjacency_list = self.details.code.adjacency_list
-        edges = self.details.code.edges
-        degrees = self.details.misc.degree
-        k = self.k
-        n = self.n
-        r = self.r
-
-        w: NDArray[LpVariable] = np.array([LpVariable(f"w({k_i})", 0, 1, cat="Binary") for k_i in range(k)])
-        x: NDArray[NDArray[LpVariable]] = np.array([[LpVariable(name=f"x({v},{k_i})", lowBound=0, upBound=1, cat="Binary") for k_i in range(k)] for v in range(len(adjacency_list)) ])
-        q: NDArray[NDArray[LpVariable]] = np.array([[LpVariable(name=f"q({v},{k_i})", lowBound=0, upBound=1, cat="Binary") for k_i in range(k)] for v in range(len(adjacency_list)) ])
 
-        model = LpProblem(name=f'Coloring_T{n}', sense=LpMinimize)
-        model += lpSum(w)
-
-        if previous_variables and model_name in [MODEL_METHOD.ACR_R, MODEL_METHOD.ACR_RH]:
-            for k_i in range(k):
-                if previous_variables["w"][k_i].varValue == 0:
-                    break
-                model += w[k_i] == previous_variables["w"][k_i].varValue
-            for v in range(previous_variables['x'].shape[0]):
-                for k_i in range(k):
-                    model += x[v, k_i] == previous_variables["x"][v, k_i].varValue
-
-        # Constraint 1
-        for v in adjacency_list.keys():
-            model += lpSum(x[v]) == 1
-        # Constraint 2
-        for (u, v) in edges:
-            for k_i in range(k):
-                if model_name in [MODEL_METHOD.ACR_H, MODEL_METHOD.ACR_RH]:
-                    model += x[u, k_i] + x[v, k_i] <= 1
-                else:
-                    model += x[u, k_i] + x[v, k_i] <= w[k_i]
-        if model_name in [MODEL_METHOD.ACR, MODEL_METHOD.ACR_R]:
-            # Constraint 3
-            for k_i  in range(k):
-                model += w[k_i] <= lpSum(x[:, k_i])
-            # Constraint 4
-            for k_i in range(1, k):
-                model += w[k_i - 1] >= w[k_i]
-        # Constraint 5
-        for v, deg in degrees.items():
-            model += lpSum(q[v]) >= min(r, deg)
-        # Constraint 6
-        for v, n_v in adjacency_list.items():
-            for k_i in range(k):
-                model += lpSum(x[n_v, k_i]) >= q[v, k_i]
-        # Constraint 7
-        for v, n_v in adjacency_list.items():
-            for u in n_v:
-                for k_i in range(k):
-                    model += q[v, k_i] >= x[u, k_i]
+        model = build_sparse_model(
+            adjacency=self.details.code.adjacency_list,
+            model_name=model_name,
+            k=self.k,
+            r=self.r,
+            previous_variables=previous_variables,
+            symmetry_breaking=symmetry_breaking,
+        )
 
         if write_lp_path:
-            model.writeLP(write_lp_path)
-
-        model.solve(solver=GLPK(msg=False))
+            model.to_lp_problem(f'Coloring_T{self.n}').writeLP(write_lp_path)
 
-        self.coloring_solution = Coloring_Solution(model=model, w=w, x=x, q=q)
+        self.coloring_solution = solve_sparse_model(model, solver=solver, threads=threads, time_limit=time_limit)
 
-        return LpStatus[model.status]
+        return self.coloring_solution.status
     
 
     def coloring_assignment(self, coloring_function: Union[Callable[VertexType.Coordinate, int], None] = None):
         if coloring_function == None:
-            x = self.coloring_solution.x
             to_coordinate = self.details.code.to_other
 
-            color_assignment_code = {v: [x_vc.varValue for x_vc in x_v].index(1) for v, x_v in enumerate(x)}
-            color_assignment_coordinate = {to_coordinate[v]: [x_vc.varValue for x_vc in x_v].index(1) for v, x_v in enumerate(x)}
+            color_assignment_code = self.coloring_solution.color_assignment()
+            color_assignment_coordinate = {to_coordinate[v]: c for v, c in color_assignment_code.items()}
         else:
             color_assignment_coordinate = {v: coloring_function(v) for v in self.details.coordinate.vertices}
             color_assignment_code = {self.details.coordinate.to_other[v]: c for v, c in color_assignment_coordinate.items()}
@@ -309,52 +219,57 @@ class T_Grid_Graph():
         chromatic_number = self.graph_colors.used_colors
         return chromatic_number
 
-    def graph_image(self, bw=False, label='color', output_file: str = None, output_directory: str=None):
-        vertices_coordinate = [str(v) for v in self.details.coordinate.vertices]
-        edges_coordinate = [[str(initial_vertex),str(final_vertex)] for (initial_vertex, final_vertex) in self.details.coordinate.edges]
-        color_assignment_coordinate = list({ str(v): AVAILABLE_COLORS[c] for v, c in self.graph_colors.coordinate.items()}.values())
+    def coloring_violations(self) -> Coloring_Violations:
+        """Vertex codes where the current coloring is not proper or not r-dynamic."""
+        return coloring_violations(self.details.code.adjacency_list, self.graph_colors.code, self.r)
 
-        positions = dict(zip(vertices_coordinate, self.details.coordinate.vertices))
+    def graph_image(self, bw=False, label='color', output_file: str = None, output_directory: str=None, wait: bool = True) -> Future:
+        """Draw the colored grid to output_directory/output_file on the render pool.
+
+        Args:
+            wait: Block until the file is written; otherwise return as soon as the render is queued
+
+        Returns:
+            Future of the written path
+        """
+        vertices_coordinate = self.details.coordinate.vertices
         if label=='color':
-            labels = { str(v): c for v, c in self.graph_colors.coordinate.items()}
+            labels = [str(self.graph_colors.coordinate[v]) for v in vertices_coordinate]
         elif label=='coordinate':
-            labels = { str(v): str(v) for v in self.graph_colors.coordinate.keys()}
+            labels = [str(v) for v in vertices_coordinate]
         elif label=='code':
-            labels = { str(v): str(v) for v in self.graph_colors.code.keys()}
+            labels = [str(self.details.coordinate.to_other[v]) for v in vertices_coordinate]
         else:
             raise ValueError("label must be 'color', 'coordinate' or 'code'")
 
-        G = nx.Graph()
-        G.add_nodes_from(vertices_coordinate)
-        G.add_edges_from(edges_coordinate)
-        plt.figure(figsize=(4+self.n, 4+self.n))
-        
-        options = {
-            "node_color": "#000000" if bw else color_assignment_coordinate,
-            'edge_color': 'black',
-            "node_size": 1100,
-            "with_labels": True,
-            "labels": labels,
-            "font_color": '#ffffff' if  bw else '#000000',
-            'font_size': 11,
-        }
-
-        nx.draw(G, pos=positions, **options)
-        plt.axis('equal')
+        index = {v: i for i, v in enumerate(vertices_coordinate)}
+        positions = np.array([TRIANGULAR_LATTICE_POSITION(v) for v in vertices_coordinate], dtype=np.float64)
+        edges = np.array([[index[u], index[v]] for u, v in self.details.coordinate.edges], dtype=np.int64).reshape(-1, 2)
+        colors = ['#000000' if bw else AVAILABLE_COLORS[self.graph_colors.coordinate[v]] for v in vertices_coordinate]
+        style = Plot_Style(
+            figsize=(4+self.n, 4+self.n),
+            dpi=100,
+            node_size=1100,
+            node_linewidth=0,
+            edge_width=1.0,
+            font_weight='normal',
+            font_color='#ffffff' if bw else '#000000',
+            transparent=False,
+        )
 
         if output_directory == None:
             output_directory = "graphs"
 
-        if not os.path.exists(output_directory):
-            os.makedirs(output_directory)
-
         if output_file == None:
             output_file = f'r{self.r}_n{self.n}_k{self.graph_colors.used_colors}.png'
 
         output_path = f'{output_directory}/{output_file}'
-        plt.savefig(output_path)
-        plt.clf()
-        plt.close('all')
+        # Color labels change with every coloring, so only fixed labels reuse the drawn grid
+        key = None if label == 'color' else f'T_{self.n}:{label}:{bw}'
+        future = RENDER_POOL.submit(output_path, render_plot_file, output_path, key, labels, edges, positions, colors, style)
+        if wait:
+            future.result()
+        return future
 
     def coloring_table(self):
         vertices_coordinate = [str(v) for v in self.details.coordinate.vertices]
@@ -367,12 +282,14 @@ class T_Grid_Graph():
         print(color_adjacent_coordinate)
 
     def export_solution(self):
+        import pandas as pd
+
         if not os.path.exists("graphs"):
             os.makedirs("graphs")
         
-        x_values_matrix = pd.DataFrame([ [x_vc.varValue for x_vc in x_v] for x_v in self.coloring_solution.x])
+        x_values_matrix = pd.DataFrame(self.coloring_solution.x)
         x_values_matrix.to_csv(f"graphs/r{self.r}_x.csv", index=False, header=False)
-        q_values_matrix = pd.DataFrame([ [q_vc.varValue for q_vc in q_v] for q_v in self.coloring_solution.q])
+        q_values_matrix = pd.DataFrame(self.coloring_solution.q)
         q_values_matrix.to_csv(f"graphs/r{self.r}_q.csv", index=False, header=False)
-        w_values_matrix = pd.DataFrame([ [w_vc.varValue for w_vc in self.coloring_solution.w]])
+        w_values_matrix = pd.DataFrame([self.coloring_solution.w])
         w_values_matrix.to_csv(f"graphs/r{self.r}_w.csv", index=False, header=False)
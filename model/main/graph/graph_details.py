@@ -1,9 +1,7 @@
 from dataclasses import dataclass
 from typing import TypeVar, Generic, List, Tuple, Dict
 
-from numpy.typing import NDArray
-from pulp import LpProblem, LpVariable
-
+from coloring.model import Coloring_Solution
 from .graph_types import VertexType
 
 T = TypeVar('T')
@@ -52,13 +50,6 @@ class Graph_Details:
             "coordinate": self.coordinate.to_json()
         }
 
-@dataclass
-class Coloring_Solution:
-    model: LpProblem
-    w: NDArray[LpVariable]
-    x: NDArray[NDArray[LpVariable]]
-    q: NDArray[NDArray[LpVariable]]
-
 @dataclass
 class Graph_Colors:
     code: Dict[VertexType.Code, int]
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 class VertexType:
     Coordinate = Tuple[int, int]
@@ -12,7 +12,7 @@ class EdgeType:
 @dataclass
 class SolutionCheckResponse:
     success: bool
-    constraint: int
-    expression: str
-    variables: Dict[str, Any]
+    constraint: Optional[int] = None
+    expression: Optional[str] = None
+    variables: Optional[Dict[str, Any]] = None
     
\ No newline at end of file
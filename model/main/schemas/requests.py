@@ -1,39 +1,64 @@
 from typing import Dict, List, Literal, Tuple, Union, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class BaseColoringRequest(BaseModel):
-    method: Literal['ACR', 'ACR_H', 'ACR_R', 'ACR_RH']
-    k: int
+    method: Literal['ACR', 'ACR_H', 'ACR_R', 'ACR_RH', 'HEURISTIC']
+    k: Optional[int] = None
     r: int
+    solver: Literal['HIGHS', 'GLPK', 'CBC'] = 'HIGHS'
+    threads: Optional[int] = None
+    symmetry_breaking: bool = False
+    # Seconds before the best coloring found so far is returned
+    time_limit: Optional[float] = Field(None, gt=0)
+    # Relative gap between coloring and lower bound at which the solver may stop
+    mip_gap: Optional[float] = Field(None, ge=0, lt=1)
 
 class BaseColoringBatchRequest(BaseModel):
-    method: Literal['ACR', 'ACR_H', 'ACR_R', 'ACR_RH']
+    method: Literal['ACR', 'ACR_H', 'ACR_R', 'ACR_RH', 'HEURISTIC']
     k_range: Optional[Tuple[int, int]] = None
     r_range: Tuple[int, int]
+    solver: Literal['HIGHS', 'GLPK', 'CBC'] = 'HIGHS'
+    threads: Optional[int] = None
+    symmetry_breaking: bool = False
+    # Per case, as in BaseColoringRequest
+    time_limit: Optional[float] = Field(None, gt=0)
+    mip_gap: Optional[float] = Field(None, ge=0, lt=1)
+    # Solve all r of each graph with one model, r after r (model methods, GENERIC and SYMMETRIC only)
+    r_sweep: bool = False
 
 class ColoringGraphRequest(BaseColoringRequest):
     graph_type: Literal['adjacency_list', 'adjacency_matrix']
     graph: Union[Dict[int, List[int]], List[List[int]]]
 
+class VerifyColoringRequest(BaseModel):
+    graph_type: Literal['adjacency_list', 'adjacency_matrix']
+    graph: Union[Dict[int, List[int]], List[List[int]]]
+    coloring: Dict[int, int]
+    r: int
+
 class CirculantRequest(BaseColoringRequest):
     n: int
     connections: List[int]
+    circulant_mode: Literal['GENERIC', 'SYMMETRIC', 'PERIODIC', 'TRANSFER'] = 'GENERIC'
 
 class CirculantBatchRequest(BaseColoringBatchRequest):
     n_range: Tuple[int, int]
     connections: List[int]
-    k: int
+    k: Optional[int] = None
+    circulant_mode: Literal['GENERIC', 'SYMMETRIC', 'PERIODIC', 'TRANSFER'] = 'GENERIC'
 
 class AntiprismRequest(BaseColoringRequest):
     n: int
+    circulant_mode: Literal['GENERIC', 'SYMMETRIC', 'PERIODIC', 'TRANSFER'] = 'GENERIC'
 
 class AntiprismBatchRequest(BaseColoringBatchRequest):
     n_range: Tuple[int, int]
-    k: int
+    k: Optional[int] = None
+    circulant_mode: Literal['GENERIC', 'SYMMETRIC', 'PERIODIC', 'TRANSFER'] = 'GENERIC'
 
 class Planar3TreeRequest(BaseColoringRequest):
     n: int
     
 class Planar3TreeBatchRequest(BaseColoringBatchRequest):
     n_range: Tuple[int, int]
-    k: int
\ No newline at end of file
+    k: Optional[int] = None
\ No newline at end of file
@@ -1,101 +1,541 @@
-from typing import Dict, List, Tuple, Optional
+from typing import AsyncIterator, Dict, List, Tuple, Optional, Union
+from itertools import groupby
+from os import getenv
+import asyncio
 import concurrent.futures
-from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 from loguru import logger
 import numpy as np
 
-from ..coloring.r_dynamic import linear_programming_model
+from ..coloring.adjacency import Adjacency_Type, adjacency_to_csr
+from ..coloring.bounds import color_bounds, lower_bound as color_lower_bound
+from ..coloring.circulant import CIRCULANT_MODE, canonical_rotation, circulant_connections, periodic_upper_bound
+from ..coloring.transfer import Transfer_Deadline, transfer_matrix_coloring
+from ..coloring.heuristic import HEURISTIC_METHOD, heuristic_color_assignment
+from ..coloring.r_sweep import r_sweep
+from ..coloring.model import COLORING_STATUS, MODEL_METHOD, STATUS_INFEASIBLE, STATUS_OPTIMAL, STATUS_NOT_SOLVED, STATUS_UNDEFINED, Coloring_Result
+from ..coloring.solvers import solve_sparse_model
+from ..coloring.sparse_model import build_sparse_model
+from ..coloring.verify import assert_valid_coloring
+from .metrics import Phase_Trace, graph_order, set_family, solve_in_flight
+from .scheduler import PRIORITY, SOLVER_SCHEDULER, estimate_solve_cost
+from .solution_cache import SOLUTION_CACHE
 from ..schemas.requests import AntiprismBatchRequest, CirculantBatchRequest
-from ..utils.graph_utils import adjacency_matrix_to_adjacency_list
-from ..utils.antiprism import create_antiprism_adjacency_matrix
+from ..utils.antiprism import create_antiprism_graph, create_circulant_graph
+
+# Time budget in seconds for requests that do not set one; unset means no limit
+DEFAULT_TIME_LIMIT: Optional[float] = float(getenv('COLORING_TIME_LIMIT')) if getenv('COLORING_TIME_LIMIT') else None
 
 class ColoringService:
     @staticmethod
-    def color_graph(adjacency_list: Dict[int, List[int]], method: str, k: int, r: int) -> Dict[int, int]:
+    def color_graph(
+        adjacency_list: Adjacency_Type,
+        method: str,
+        k: Optional[int],
+        r: int,
+        solver: str = None,
+        threads: Optional[int] = None,
+        symmetry_breaking: bool = False,
+        k_range: Optional[Tuple[int, int]] = None,
+        circulant_mode: str = CIRCULANT_MODE.GENERIC.value,
+        time_limit: Optional[float] = None,
+        mip_gap: Optional[float] = None
+    ) -> Coloring_Result:
         """Color a graph using the specified method.
+
+        The model is sized with k colors, or with the greedy upper bound when k is
+        not given, and the solve stops once it reaches the cheap lower bound.
+        The HEURISTIC method skips the model and returns the DSatur coloring.
+        Graphs already solved for the same r and method, up to isomorphism, are
+        answered from the solution cache. Every new coloring is verified before
+        it is cached or returned.
+
+        For circulant graphs labeled as C_n(S), circulant_mode SYMMETRIC adds the
+        rotational symmetry fixings to the model and PERIODIC also starts it from
+        the best periodic coloring, which often beats the greedy upper bound.
+        TRANSFER answers exactly from the window transfer graph of (S, r, k),
+        shared by every n, and falls back to SYMMETRIC when n <= 2 max(S) or the
+        graph would be too large.
+
+        time_limit bounds the whole request (COLORING_TIME_LIMIT when not
+        given). When it runs out, or the search reaches mip_gap, the best
+        coloring found is returned as FEASIBLE together with the proven lower
+        bound. The greedy upper bound coloring serves when the solver found
+        none within k colors; otherwise the result is TIMEOUT_NO_SOLUTION.
+        Only OPTIMAL colorings are cached.
         
         Args:
-            adjacency_list: Graph represented as an adjacency list
+            adjacency_list: Graph as an adjacency list or a sparse adjacency matrix
             method: Coloring method to use
-            k: Number of colors
+            k: Number of colors (None to use the greedy upper bound)
             r: Dynamic coloring order
+            solver: Solver backend (HIGHS, GLPK or CBC)
+            threads: Thread budget for the solver
+            symmetry_breaking: Add color symmetry-breaking fixings to the model
+            k_range: Inclusive range the number of colors is clamped to
+            circulant_mode: GENERIC, SYMMETRIC, PERIODIC or TRANSFER (circulant graphs only)
+            time_limit: Wall time budget in seconds (None for COLORING_TIME_LIMIT)
+            mip_gap: Relative gap between coloring and bound at which the solver may stop
             
         Returns:
-            Dictionary mapping vertices to their assigned colors
+            The coloring with its status, proven lower bound and gap
         """
-        solution = linear_programming_model(
-            adjacency_list=adjacency_list,
-            model_name=method,
-            k=k,
-            r=r
-        )
-        
-        color_assignment = {v: [x_vc.varValue for x_vc in x_v].index(1) 
-                          for v, x_v in enumerate(solution.x)}
+        cache_method = method if method == HEURISTIC_METHOD else MODEL_METHOD.parse(method).name
+        trace = Phase_Trace(method=cache_method, n_vertices=graph_order(adjacency_list))
+        with solve_in_flight():
+            try:
+                return ColoringService._color_graph(
+                    trace, adjacency_list, cache_method, k, r, solver, threads, symmetry_breaking, k_range, circulant_mode,
+                    time_limit if time_limit is not None else DEFAULT_TIME_LIMIT, mip_gap
+                )
+            finally:
+                trace.finish()
+
+    @staticmethod
+    def _color_graph(
+        trace: Phase_Trace,
+        adjacency_list: Adjacency_Type,
+        method: str,
+        k: Optional[int],
+        r: int,
+        solver: str,
+        threads: Optional[int],
+        symmetry_breaking: bool,
+        k_range: Optional[Tuple[int, int]],
+        circulant_mode: str,
+        time_limit: Optional[float],
+        mip_gap: Optional[float]
+    ) -> Coloring_Result:
+        """color_graph with every phase timed on trace; method is already the cache name."""
+        deadline = perf_counter() + time_limit if time_limit is not None else None
+
+        def remaining() -> Optional[float]:
+            return max(deadline - perf_counter(), 0.0) if deadline is not None else None
+
+        if graph_order(adjacency_list) == 0:
+            trace.status = STATUS_OPTIMAL
+            return Coloring_Result({}, COLORING_STATUS.OPTIMAL, 0)
+
+        limits = [limit for limit in (k, k_range[1] if k_range else None) if limit is not None]
+        with trace.phase('cache'):
+            cached = SOLUTION_CACHE.get(adjacency_list, r, method, min(limits, default=None))
+        if cached is not None and method != HEURISTIC_METHOD:
+            # Only optimal colorings of the model methods are cached
+            trace.status = 'cached'
+            return Coloring_Result(cached, COLORING_STATUS.OPTIMAL, max(cached.values(), default=-1) + 1)
+
+        if method == HEURISTIC_METHOD:
+            lower = color_lower_bound(adjacency_to_csr(adjacency_list)[1], r)
+            if cached is not None:
+                trace.status = 'cached'
+                return Coloring_Result.from_coloring(cached, lower)
+            with trace.phase('heuristic'):
+                color_assignment = heuristic_color_assignment(adjacency_list, r)
+            with trace.phase('verify'):
+                assert_valid_coloring(adjacency_list, color_assignment, r)
+            colors_used = max(color_assignment.values(), default=-1) + 1
+            max_colors = min(limits, default=colors_used)
+            if colors_used > max_colors:
+                raise ValueError(f"Heuristic coloring needs {colors_used} colors, more than the {max_colors} allowed")
+            logger.info(f'Heuristic solution ({colors_used} colors): {color_assignment}')
+            with trace.phase('cache'):
+                SOLUTION_CACHE.put(adjacency_list, r, method, color_assignment)
+            trace.status = 'heuristic'
+            return Coloring_Result.from_coloring(color_assignment, lower)
+
+        with trace.phase('bounds'):
+            bounds = color_bounds(adjacency_list, r)
+        upper_bound, initial_coloring = bounds.upper, bounds.upper_coloring
+        circulant_mode = CIRCULANT_MODE(circulant_mode)
+        if circulant_mode != CIRCULANT_MODE.GENERIC:
+            labels, adjacency_matrix = adjacency_to_csr(adjacency_list)
+            connections = circulant_connections(adjacency_matrix)
+            if connections is None:
+                raise ValueError(f"circulant_mode={circulant_mode.value} needs a circulant graph labeled as C_n(S)")
+            if circulant_mode == CIRCULANT_MODE.PERIODIC:
+                with trace.phase('periodic'):
+                    periodic = periodic_upper_bound(
+                        adjacency_matrix, r, k or bounds.upper, lower_bound=bounds.lower, solver=solver, threads=threads,
+                        deadline=deadline
+                    )
+                if periodic is not None and periodic.max() + 1 < upper_bound:
+                    upper_bound, initial_coloring = int(periodic.max()) + 1, periodic
+                    logger.info(f'Periodic coloring with {upper_bound} colors')
+            initial_coloring = canonical_rotation(initial_coloring)
+
+        if k is None:
+            k = upper_bound
+        if k_range is not None:
+            k = min(max(k, k_range[0]), k_range[1])
+        logger.info(f'Color bounds: lower={bounds.lower}, upper={upper_bound}, k={k}')
+
+        if k < bounds.lower:
+            raise ValueError(f"k={k} is below the lower bound of {bounds.lower} colors for r={r}")
+
+        if circulant_mode == CIRCULANT_MODE.TRANSFER:
+            try:
+                with trace.phase('transfer'):
+                    colors = transfer_matrix_coloring(len(labels), connections, r, k, lower_bound=bounds.lower, deadline=deadline)
+            except Transfer_Deadline as e:
+                lower = max(bounds.lower, e.lower_bound)
+                trace.status = STATUS_NOT_SOLVED
+                if initial_coloring.max(initial=-1) + 1 > k:
+                    logger.info(f'Time limit of {time_limit}s reached without a coloring with k={k}, r={r}')
+                    return Coloring_Result(None, COLORING_STATUS.TIMEOUT_NO_SOLUTION, lower)
+                color_assignment = dict(zip(labels, initial_coloring.tolist()))
+                with trace.phase('verify'):
+                    assert_valid_coloring(adjacency_list, color_assignment, r)
+                logger.info(f'Time limit of {time_limit}s reached in the transfer graph search, answering with the greedy upper bound coloring')
+                return Coloring_Result.from_coloring(color_assignment, lower)
+            except ValueError as e:
+                logger.info(f'Transfer graph not usable ({e}), solving the symmetric model')
+            else:
+                if colors is None:
+                    trace.status = STATUS_INFEASIBLE
+                    raise ValueError(f"No coloring found with k={k}, r={r} (transfer graph)")
+                color_assignment = dict(zip(labels, colors.tolist()))
+                with trace.phase('verify'):
+                    assert_valid_coloring(adjacency_list, color_assignment, r)
+                with trace.phase('cache'):
+                    SOLUTION_CACHE.put(adjacency_list, r, method, color_assignment)
+                logger.info(f'Transfer graph solution: {color_assignment}')
+                trace.status = 'transfer'
+                # The first number of colors with a closed walk is the minimum
+                return Coloring_Result(color_assignment, COLORING_STATUS.OPTIMAL, int(colors.max()) + 1)
+
+        with trace.phase('build'):
+            model = build_sparse_model(
+                adjacency=adjacency_list,
+                model_name=method,
+                k=k,
+                r=r,
+                symmetry_breaking=symmetry_breaking,
+                lower_bound=bounds.lower,
+                circulant_symmetry=circulant_mode != CIRCULANT_MODE.GENERIC
+            )
+        logger.debug(f'Model: {model.matrix.shape[0]} rows, {model.n_columns} columns, {model.matrix.nnz} non-zeros')
+        with trace.phase('solve'):
+            solution = solve_sparse_model(
+                model, solver=solver, threads=threads, time_limit=remaining(), initial_coloring=initial_coloring, mip_gap=mip_gap
+            )
+        trace.status = solution.status
+
+        # The objective counts colors, so the solver's dual bound is a bound on colors
+        lower = bounds.lower
+        if solution.result is not None and solution.result.bound is not None:
+            lower = max(lower, int(np.ceil(solution.result.bound - 1e-6)))
         
-        logger.info(f'Solution: {color_assignment}')
-        return color_assignment
+        if not solution.has_solution():
+            if deadline is None or solution.status not in (STATUS_NOT_SOLVED, STATUS_UNDEFINED):
+                raise ValueError(f"No coloring found with k={k}, r={r} (status '{solution.status}')")
+            if initial_coloring is None or initial_coloring.max(initial=-1) + 1 > k:
+                logger.info(f'Time limit of {time_limit}s reached without a coloring with k={k}, r={r}')
+                return Coloring_Result(None, COLORING_STATUS.TIMEOUT_NO_SOLUTION, lower)
+            color_assignment = dict(zip(model.labels, initial_coloring.tolist()))
+            logger.info(f'Time limit of {time_limit}s reached, answering with the greedy upper bound coloring')
+        else:
+            with trace.phase('extract'):
+                color_assignment = solution.color_assignment()
+        with trace.phase('verify'):
+            assert_valid_coloring(adjacency_list, color_assignment, r)
+
+        result = Coloring_Result.from_coloring(color_assignment, lower)
+        if result.status == COLORING_STATUS.OPTIMAL:
+            with trace.phase('cache'):
+                SOLUTION_CACHE.put(adjacency_list, r, method, color_assignment)
+
+        logger.info(f'Solution ({result.status.value}, {result.colors_used} colors, lower bound {result.lower_bound}): {color_assignment}')
+        return result
     
     @staticmethod
-    def process_single_case(r: int, n: int, method: str, k: int) -> tuple[int, int, Optional[Dict[int, int]], Optional[str]]:
-        """Process a single (r, n) case for antiprism coloring.
+    async def color_graph_async(
+        adjacency_list: Adjacency_Type,
+        method: str,
+        k: Optional[int],
+        r: int,
+        solver: str = None,
+        threads: Optional[int] = None,
+        symmetry_breaking: bool = False,
+        circulant_mode: str = CIRCULANT_MODE.GENERIC.value,
+        time_limit: Optional[float] = None,
+        mip_gap: Optional[float] = None
+    ) -> Coloring_Result:
+        """Run color_graph on the solver scheduler with interactive priority.
+
+        Interactive requests go ahead of every queued batch case and the event
+        loop stays free while the solve runs.
+        """
+        future = SOLVER_SCHEDULER.submit(
+            ColoringService.color_graph,
+            adjacency_list, method, k, r, solver, threads, symmetry_breaking,
+            circulant_mode=circulant_mode,
+            time_limit=time_limit,
+            mip_gap=mip_gap,
+            priority=PRIORITY.INTERACTIVE,
+            cpus=threads or 1
+        )
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def process_single_case(r: int, n: int, method: str, k: Optional[int], solver: str = None, threads: Optional[int] = None, symmetry_breaking: bool = False, k_range: Optional[Tuple[int, int]] = None, connections: Optional[List[int]] = None, circulant_mode: str = CIRCULANT_MODE.GENERIC.value, time_limit: Optional[float] = None, mip_gap: Optional[float] = None) -> tuple[int, int, Optional[Dict[int, int]], Optional[str], float]:
+        """Process a single (r, n) case of a batch.
         
         Args:
             r: Dynamic coloring order
-            n: Number of vertices in the antiprism graph
+            n: Order of the circulant graph, or of the antiprism (2n vertices)
             method: Coloring method to use
-            k: Number of colors
+            k: Number of colors (None to use the greedy upper bound)
+            solver: Solver backend (HIGHS, GLPK or CBC)
+            threads: Thread budget for the solver
+            symmetry_breaking: Add color symmetry-breaking fixings to the model
+            k_range: Inclusive range the number of colors is clamped to
+            connections: Circulant connection set, None for the antiprism
+            circulant_mode: GENERIC, SYMMETRIC, PERIODIC or TRANSFER
+            time_limit: Wall time budget in seconds for this case
+            mip_gap: Relative gap at which the solver may stop
             
         Returns:
-            Tuple containing (r, n, color_assignment, error)
+            Tuple containing (r, n, color_assignment, error, solve_ms); a case
+            that ran out of time without a coloring reports an error
         """
         logger.info(f'Processing: r={r}, n={n}')
+        set_family('antiprism' if connections is None else 'circulant')
+        start = perf_counter()
         try:
-            adjacency_matrix = create_antiprism_adjacency_matrix(n)
-            adjacency_list = adjacency_matrix_to_adjacency_list(adjacency_matrix)
-            color_assignment = ColoringService.color_graph(adjacency_list, method, k, r)
-            logger.info(f'Solution for r={r}, n={n}: {color_assignment}')
-            return r, n, color_assignment, None
+            if connections is None:
+                adjacency_matrix = create_antiprism_graph(n)
+            else:
+                adjacency_matrix = create_circulant_graph(n, *connections)
+            result = ColoringService.color_graph(adjacency_matrix, method, k, r, solver, threads, symmetry_breaking, k_range, circulant_mode, time_limit, mip_gap)
+            if result.coloring is None:
+                raise ValueError(f"Time limit reached without a coloring (lower bound {result.lower_bound})")
+            logger.info(f'Solution for r={r}, n={n} ({result.status.value}): {result.coloring}')
+            return r, n, result.coloring, None, (perf_counter() - start) * 1000
         except Exception as e:
             logger.error(f'Error: {e} on r={r}, n={n}')
-            return r, n, None, str(e)
+            return r, n, None, str(e), (perf_counter() - start) * 1000
 
     @staticmethod
-    def process_circulant_batch(request: CirculantBatchRequest) -> Dict[int, Dict[int, Dict[int, int]]]:
-        """Process a batch of circulant coloring requests.
+    def process_r_sweep(r_values: List[int], n: int, method: str, k: Optional[int], solver: str = None, threads: Optional[int] = None, symmetry_breaking: bool = False, k_range: Optional[Tuple[int, int]] = None, connections: Optional[List[int]] = None, circulant_mode: str = CIRCULANT_MODE.GENERIC.value, time_limit: Optional[float] = None, mip_gap: Optional[float] = None) -> List[tuple[int, int, Optional[Dict[int, int]], Optional[str], float]]:
+        """Process every r of one n of a batch with a single model (see r_sweep).
+
+        Takes the arguments of process_single_case with all r values at once;
+        time_limit applies to each r. Optimal colorings are cached as in
+        color_graph.
+
+        Returns:
+            One (r, n, color_assignment, error, solve_ms) tuple per r, as
+            process_single_case; after an error every remaining r reports it
+        """
+        r_values = sorted(set(r_values))
+        logger.info(f'Processing: r={r_values}, n={n} (r sweep)')
+        set_family('antiprism' if connections is None else 'circulant')
+        cache_method = MODEL_METHOD.parse(method).name
+        records = []
+        start = perf_counter()
+        try:
+            if connections is None:
+                adjacency_matrix = create_antiprism_graph(n)
+            else:
+                adjacency_matrix = create_circulant_graph(n, *connections)
+            trace = Phase_Trace(method=cache_method, n_vertices=graph_order(adjacency_matrix))
+            with solve_in_flight():
+                try:
+                    with trace.phase('r_sweep'):
+                        sweep = r_sweep(
+                            adjacency_matrix, method, r_values, k=k, k_range=k_range, solver=solver, threads=threads,
+                            time_limit=time_limit if time_limit is not None else DEFAULT_TIME_LIMIT, mip_gap=mip_gap,
+                            symmetry_breaking=symmetry_breaking,
+                            circulant_symmetry=CIRCULANT_MODE(circulant_mode) == CIRCULANT_MODE.SYMMETRIC
+                        )
+                        for r, result, seconds in sweep:
+                            if result.coloring is None:
+                                records.append((r, n, None, f"Time limit reached without a coloring (lower bound {result.lower_bound})", seconds * 1000))
+                                continue
+                            if result.status == COLORING_STATUS.OPTIMAL:
+                                SOLUTION_CACHE.put(adjacency_matrix, r, cache_method, result.coloring)
+                            logger.info(f'Solution for r={r}, n={n} ({result.status.value}): {result.coloring}')
+                            records.append((r, n, result.coloring, None, seconds * 1000))
+                    trace.status = 'r_sweep'
+                finally:
+                    trace.finish()
+        except Exception as e:
+            logger.error(f'Error: {e} on r={r_values[len(records):]}, n={n}')
+            elapsed = (perf_counter() - start) * 1000 - sum(record[4] for record in records)
+            records += [(r, n, None, str(e), elapsed) for r in r_values[len(records):]]
+        return records
+
+    @staticmethod
+    def batch_cases(request: Union[CirculantBatchRequest, AntiprismBatchRequest]) -> List[Tuple[int, int]]:
+        """Every (r, n) case of a batch request."""
+        return [
+            (r, n)
+            for r in range(request.r_range[0], request.r_range[1] + 1)
+            for n in range(request.n_range[0], request.n_range[1] + 1)
+        ]
+
+    @staticmethod
+    def batch_case_size(n: int, connections: Optional[List[int]] = None) -> Tuple[int, int]:
+        """(|V|, degree) of the antiprism of order n, or of C_n(connections)."""
+        if connections is None:
+            return 2 * n, 4
+        return n, sum(1 if 2 * s == n else 2 for s in set(connections) if 0 < s <= n // 2)
+
+    @staticmethod
+    def submit_batch_case(request: Union[CirculantBatchRequest, AntiprismBatchRequest], r: int, n: int, connections: Optional[List[int]] = None) -> concurrent.futures.Future:
+        """Queue one batch case on the solver scheduler with its estimated cost.
+
+        The future resolves to the (r, n, color_assignment, error, solve_ms)
+        tuple of process_single_case.
+        """
+        n_vertices, degree = ColoringService.batch_case_size(n, connections)
+        return SOLVER_SCHEDULER.submit(
+            ColoringService.process_single_case,
+            priority=PRIORITY.BATCH,
+            cost=estimate_solve_cost(n_vertices, degree, r),
+            cpus=request.threads or 1,
+            r=r,
+            n=n,
+            method=request.method,
+            k=request.k,
+            solver=request.solver,
+            threads=request.threads,
+            symmetry_breaking=request.symmetry_breaking,
+            k_range=request.k_range,
+            connections=connections,
+            circulant_mode=request.circulant_mode,
+            time_limit=request.time_limit,
+            mip_gap=request.mip_gap
+        )
+
+    @staticmethod
+    def submit_batch_sweep(request: Union[CirculantBatchRequest, AntiprismBatchRequest], r_values: List[int], n: int, connections: Optional[List[int]] = None) -> concurrent.futures.Future:
+        """Queue every r of one n as a single r sweep, costed as its largest r.
+
+        The future resolves to the list of (r, n, color_assignment, error,
+        solve_ms) tuples of process_r_sweep.
+        """
+        n_vertices, degree = ColoringService.batch_case_size(n, connections)
+        return SOLVER_SCHEDULER.submit(
+            ColoringService.process_r_sweep,
+            priority=PRIORITY.BATCH,
+            cost=estimate_solve_cost(n_vertices, degree, max(r_values)),
+            cpus=request.threads or 1,
+            r_values=r_values,
+            n=n,
+            method=request.method,
+            k=request.k,
+            solver=request.solver,
+            threads=request.threads,
+            symmetry_breaking=request.symmetry_breaking,
+            k_range=request.k_range,
+            connections=connections,
+            circulant_mode=request.circulant_mode,
+            time_limit=request.time_limit,
+            mip_gap=request.mip_gap
+        )
+
+    @staticmethod
+    def submit_batch(request: Union[CirculantBatchRequest, AntiprismBatchRequest], cases: List[Tuple[int, int]], connections: Optional[List[int]] = None) -> List[Tuple[List[Tuple[int, int]], concurrent.futures.Future]]:
+        """Queue the (r, n) cases of a batch: one job per case, or with r_sweep one per n.
+
+        r_sweep is ignored for the HEURISTIC method and the PERIODIC and
+        TRANSFER circulant modes, which have no single model to reuse.
+
+        Returns:
+            (cases, future) per queued job; read each result with case_results
+        """
+        sweep = request.r_sweep and request.method != HEURISTIC_METHOD and CIRCULANT_MODE(request.circulant_mode) in (CIRCULANT_MODE.GENERIC, CIRCULANT_MODE.SYMMETRIC)
+        if not sweep:
+            return [([(r, n)], ColoringService.submit_batch_case(request, r, n, connections)) for r, n in cases]
+        jobs = []
+        for n, group in groupby(sorted(cases, key=lambda case: (case[1], case[0])), key=lambda case: case[1]):
+            group = list(group)
+            jobs.append((group, ColoringService.submit_batch_sweep(request, [r for r, _ in group], n, connections)))
+        return jobs
+
+    @staticmethod
+    def case_results(result: Union[tuple, List[tuple]]) -> List[tuple]:
+        """The (r, n, color_assignment, error, solve_ms) tuples of a submit_batch future result."""
+        return result if isinstance(result, list) else [result]
+
+    @staticmethod
+    def process_batch_cases(request: Union[CirculantBatchRequest, AntiprismBatchRequest], connections: Optional[List[int]] = None) -> Dict[int, Dict[int, Dict[int, int]]]:
+        """Solve every (r, n) case of a batch on the solver scheduler.
+
+        Cases are queued with batch priority and their estimated cost, so the
+        largest graphs start first and interactive requests overtake them.
         
         Args:
             request: Batch request containing parameters for multiple colorings
+            connections: Circulant connection set, None for antiprisms
             
         Returns:
             Nested dictionary of color assignments: {r: {n: color_assignment}}
         """
-        logger.info(f'Circulant Batch Request: {request}')
         solutions_object = {}
+        futures = [
+            future for _, future in ColoringService.submit_batch(request, ColoringService.batch_cases(request), connections)
+        ]
         
-        r_values = range(request.r_range[0], request.r_range[1] + 1)
-        n_values = range(request.n_range[0], request.n_range[1] + 1)
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for r in r_values:
-                for n in n_values:
-                    futures.append(executor.submit(
-                        ColoringService.process_single_case,
-                        r=r,
-                        n=n,
-                        method=request.method,
-                        k=request.k
-                    ))
-            
-            # Process results as they complete
-            for future in concurrent.futures.as_completed(futures):
-                r, n, result, error = future.result()
+        # Process results as they complete
+        for future in concurrent.futures.as_completed(futures):
+            for r, n, result, error, _ in ColoringService.case_results(future.result()):
                 if error is None:
                     solutions_object.setdefault(r, {})[n] = result
                 else:
                     logger.error(f"Failed to process r={r}, n={n}: {error}")
         
         return solutions_object
+
+    @staticmethod
+    async def stream_batch_cases(request: Union[CirculantBatchRequest, AntiprismBatchRequest], connections: Optional[List[int]] = None) -> AsyncIterator[dict]:
+        """Yield one record per (r, n) case as soon as its solve finishes.
+
+        With r_sweep the records of one n arrive together when its sweep
+        finishes. Cases still queued are cancelled when the consumer stops
+        early, e.g. because the client disconnected.
+        
+        Args:
+            request: Batch request containing parameters for multiple colorings
+            connections: Circulant connection set, None for antiprisms
+            
+        Yields:
+            {r, n, coloring, colors_used, solve_ms} records, with an error
+            message and a null coloring for failed cases
+        """
+        futures = [
+            future for _, future in ColoringService.submit_batch(request, ColoringService.batch_cases(request), connections)
+        ]
+        try:
+            for next_result in asyncio.as_completed([asyncio.wrap_future(future) for future in futures]):
+                for r, n, color_assignment, error, solve_ms in ColoringService.case_results(await next_result):
+                    record = {
+                        'r': r,
+                        'n': n,
+                        'coloring': color_assignment,
+                        'colors_used': max(color_assignment.values(), default=-1) + 1 if color_assignment is not None else None,
+                        'solve_ms': round(solve_ms, 3),
+                    }
+                    if error is not None:
+                        record['error'] = error
+                    yield record
+        finally:
+            for future in futures:
+                future.cancel()
+
+    @staticmethod
+    def process_circulant_batch(request: CirculantBatchRequest) -> Dict[int, Dict[int, Dict[int, int]]]:
+        """Process a batch of circulant coloring requests.
+        
+        Args:
+            request: Batch request containing parameters for multiple colorings
+            
+        Returns:
+            Nested dictionary of color assignments: {r: {n: color_assignment}}
+        """
+        logger.info(f'Circulant Batch Request: {request}')
+        return ColoringService.process_batch_cases(request, connections=request.connections)
     
     @staticmethod
     def process_antiprism_batch(request: AntiprismBatchRequest) -> Dict[int, Dict[int, Dict[int, int]]]:
@@ -108,28 +548,4 @@ class ColoringService:
             Nested dictionary of color assignments: {r: {n: color_assignment}}
         """
         logger.info(f'Antiprism Batch Request: {request}')
-        solutions_object = {}
-        
-        r_values = range(request.r_range[0], request.r_range[1] + 1)
-        n_values = range(request.n_range[0], request.n_range[1] + 1)
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for r in r_values:
-                for n in n_values:
-                    futures.append(executor.submit(
-                        ColoringService.process_single_case,
-                        r=r,
-                        n=n,
-                        method=request.method,
-                        k=request.k
-                    ))
-            
-            # Process results as they complete
-            for future in concurrent.futures.as_completed(futures):
-                r, n, result, error = future.result()
-                if error is None:
-                    solutions_object.setdefault(r, {})[n] = result
-                else:
-                    logger.error(f"Failed to process r={r}, n={n}: {error}")
-        
-        return solutions_object
+        return ColoringService.process_batch_cases(request)
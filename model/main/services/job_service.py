@@ -0,0 +1,82 @@
+import threading
+import uuid
+from concurrent.futures import Future
+from os import getenv
+from typing import Callable, Dict, List, Optional, Tuple, Type, Union
+
+from loguru import logger
+from pydantic import BaseModel
+
+from ..schemas.requests import AntiprismBatchRequest, CirculantBatchRequest
+from .coloring_service import ColoringService
+from .job_store import Job_Store
+
+# Job kind -> (request model, circulant connections of a request)
+JOB_KINDS: Dict[str, Tuple[Type[BaseModel], Callable[[BaseModel], Optional[List[int]]]]] = {
+    'circulant': (CirculantBatchRequest, lambda request: request.connections),
+    'antiprism': (AntiprismBatchRequest, lambda request: None),
+}
+
+class Job_Manager:
+    """Batch jobs that run in the background on the solver scheduler.
+
+    Cases are queued through ColoringService.submit_batch and each result
+    is written to the job store when it finishes, so clients poll for progress
+    instead of holding a connection open.
+    """
+
+    def __init__(self, store: Job_Store):
+        self.store = store
+        # Job id -> ([(r, n)], future) of the jobs queued by this process; an r sweep covers several cases
+        self._futures: Dict[str, List[Tuple[List[Tuple[int, int]], Future]]] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, job_id: str, future: Future) -> None:
+        if future.cancelled():
+            return
+        for r, n, color_assignment, error, _ in ColoringService.case_results(future.result()):
+            self.store.finish_case(job_id, r, n, color_assignment, error)
+
+    def _schedule(self, job_id: str, kind: str, request: BaseModel, cases: List[Tuple[int, int]]) -> None:
+        _, connections = JOB_KINDS[kind]
+        futures = ColoringService.submit_batch(request, cases, connections(request))
+        for _, future in futures:
+            future.add_done_callback(lambda future, job_id=job_id: self._record(job_id, future))
+        with self._lock:
+            self._futures[job_id] = futures
+
+    def submit(self, kind: str, request: Union[CirculantBatchRequest, AntiprismBatchRequest]) -> str:
+        """Store a new job, queue all its cases and return the job id."""
+        job_id = uuid.uuid4().hex
+        cases = ColoringService.batch_cases(request)
+        self.store.create_job(job_id, kind, request.model_dump_json(), cases)
+        self._schedule(job_id, kind, request, cases)
+        logger.info(f'Job {job_id} ({kind}): {len(cases)} cases queued')
+        return job_id
+
+    def status(self, job_id: str) -> Optional[dict]:
+        """Job status, progress and partial results, or None if unknown."""
+        return self.store.get_job(job_id)
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """Cancel every case that has not started; running cases still finish."""
+        with self._lock:
+            futures = self._futures.pop(job_id, [])
+        cancelled = [case for job_cases, future in futures if future.cancel() for case in job_cases]
+        if self.store.get_job(job_id) is None:
+            return None
+        self.store.cancel_cases(job_id, cancelled)
+        logger.info(f'Job {job_id}: {len(cancelled)} pending cases cancelled')
+        return self.store.get_job(job_id)
+
+    def resume_pending(self) -> None:
+        """Queue the unfinished cases of jobs left pending by a previous process."""
+        for job_id, kind, request, cases in self.store.pending_jobs():
+            with self._lock:
+                if job_id in self._futures:
+                    continue
+            request_model, _ = JOB_KINDS[kind]
+            self._schedule(job_id, kind, request_model.model_validate_json(request), cases)
+            logger.info(f'Job {job_id} ({kind}): resumed {len(cases)} pending cases')
+
+JOB_MANAGER = Job_Manager(Job_Store(getenv('COLORING_JOB_DB', 'jobs.sqlite3')))
@@ -0,0 +1,152 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+JOB_PENDING = 'pending'
+JOB_COMPLETED = 'completed'
+JOB_CANCELLED = 'cancelled'
+
+CASE_PENDING = 'pending'
+CASE_DONE = 'done'
+CASE_FAILED = 'failed'
+CASE_CANCELLED = 'cancelled'
+
+class Job_Store:
+    """SQLite store of batch jobs and their (r, n) cases.
+
+    Every finished case is written as soon as it completes, so a restart only
+    loses the cases that were still running. The file is opened on first use.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._database: Optional[sqlite3.Connection] = None
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        """The database connection, opened and created on first use rather than at import."""
+        with self._open_lock:
+            if self._database is None:
+                self._database = self._open(self.path)
+            return self._database
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                request TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS job_cases (
+                job_id TEXT NOT NULL REFERENCES jobs(id),
+                r INTEGER NOT NULL,
+                n INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                coloring TEXT,
+                error TEXT,
+                PRIMARY KEY (job_id, r, n)
+            );
+        ''')
+        return connection
+
+    def create_job(self, job_id: str, kind: str, request: str, cases: List[Tuple[int, int]]) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute('BEGIN')
+            self._connection.execute(
+                'INSERT INTO jobs (id, kind, request, status, created, updated) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, kind, request, JOB_PENDING if cases else JOB_COMPLETED, now, now)
+            )
+            self._connection.executemany(
+                'INSERT INTO job_cases (job_id, r, n, status) VALUES (?, ?, ?, ?)',
+                [(job_id, r, n, CASE_PENDING) for r, n in cases]
+            )
+
+    def finish_case(self, job_id: str, r: int, n: int, coloring: Optional[Dict[int, int]], error: Optional[str]) -> None:
+        """Record a case result and complete the job once no case is pending."""
+        with self._lock, self._connection:
+            self._connection.execute('BEGIN')
+            self._connection.execute(
+                'UPDATE job_cases SET status = ?, coloring = ?, error = ? WHERE job_id = ? AND r = ? AND n = ? AND status = ?',
+                (CASE_DONE if error is None else CASE_FAILED, json.dumps(coloring) if coloring is not None else None, error, job_id, r, n, CASE_PENDING)
+            )
+            pending = self._connection.execute(
+                'SELECT COUNT(*) FROM job_cases WHERE job_id = ? AND status = ?', (job_id, CASE_PENDING)
+            ).fetchone()[0]
+            self._connection.execute(
+                'UPDATE jobs SET status = CASE WHEN ? = 0 AND status = ? THEN ? ELSE status END, updated = ? WHERE id = ?',
+                (pending, JOB_PENDING, JOB_COMPLETED, time.time(), job_id)
+            )
+
+    def cancel_cases(self, job_id: str, cases: List[Tuple[int, int]]) -> None:
+        """Mark the given pending cases and the job as cancelled.
+
+        Cases left out (already running) are still recorded when they finish.
+        """
+        with self._lock, self._connection:
+            self._connection.execute('BEGIN')
+            self._connection.executemany(
+                'UPDATE job_cases SET status = ? WHERE job_id = ? AND r = ? AND n = ? AND status = ?',
+                [(CASE_CANCELLED, job_id, r, n, CASE_PENDING) for r, n in cases]
+            )
+            self._connection.execute(
+                'UPDATE jobs SET status = ?, updated = ? WHERE id = ? AND status = ?', (JOB_CANCELLED, time.time(), job_id, JOB_PENDING)
+            )
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Job status, case counts and the results so far, or None if unknown."""
+        with self._lock:
+            job = self._connection.execute(
+                'SELECT kind, status, created, updated FROM jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            cases = self._connection.execute(
+                'SELECT r, n, status, coloring, error FROM job_cases WHERE job_id = ?', (job_id,)
+            ).fetchall()
+
+        kind, status, created, updated = job
+        results: Dict[int, Dict[int, Dict[int, int]]] = {}
+        errors: Dict[int, Dict[int, str]] = {}
+        counts = {CASE_PENDING: 0, CASE_DONE: 0, CASE_FAILED: 0, CASE_CANCELLED: 0}
+        for r, n, case_status, coloring, error in cases:
+            counts[case_status] += 1
+            if coloring is not None:
+                results.setdefault(r, {})[n] = {int(v): c for v, c in json.loads(coloring).items()}
+            if error is not None:
+                errors.setdefault(r, {})[n] = error
+        return {
+            'job_id': job_id,
+            'kind': kind,
+            'status': status,
+            'total': len(cases),
+            'completed': counts[CASE_DONE] + counts[CASE_FAILED],
+            'failed': counts[CASE_FAILED],
+            'created': created,
+            'updated': updated,
+            'results': results,
+            'errors': errors,
+        }
+
+    def pending_jobs(self) -> List[Tuple[str, str, str, List[Tuple[int, int]]]]:
+        """(job id, kind, request JSON, pending cases) of every unfinished job."""
+        with self._lock:
+            jobs = self._connection.execute(
+                'SELECT id, kind, request FROM jobs WHERE status = ? ORDER BY created', (JOB_PENDING,)
+            ).fetchall()
+            return [
+                (job_id, kind, request, self._connection.execute(
+                    'SELECT r, n FROM job_cases WHERE job_id = ? AND status = ?', (job_id, CASE_PENDING)
+                ).fetchall())
+                for job_id, kind, request in jobs
+            ]
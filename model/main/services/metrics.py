@@ -0,0 +1,215 @@
+import bisect
+import contextvars
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from scipy import sparse
+
+from ..coloring.adjacency import Adjacency_Type
+from ..utils.render import RENDER_POOL
+from .scheduler import SOLVER_SCHEDULER
+
+# Upper bounds in seconds, from sub-millisecond conversions to long MILP solves
+PHASE_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# |V| bucket labels, by largest vertex count
+VERTEX_BUCKETS: Tuple[int, ...] = (16, 64, 256, 1024, 4096, 16384)
+
+PHASE_LABELS = ('phase', 'endpoint', 'method', 'family', 'vertices', 'status')
+
+def vertex_bucket(n_vertices: int) -> str:
+    """Label of the |V| bucket: the smallest bound of VERTEX_BUCKETS that holds n_vertices."""
+    index = bisect.bisect_left(VERTEX_BUCKETS, n_vertices)
+    return f'le_{VERTEX_BUCKETS[index]}' if index < len(VERTEX_BUCKETS) else f'gt_{VERTEX_BUCKETS[-1]}'
+
+def graph_order(adjacency: Adjacency_Type) -> int:
+    """|V| of an adjacency list or sparse adjacency matrix."""
+    return adjacency.shape[0] if sparse.issparse(adjacency) else len(adjacency)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return ','.join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus data model, one series per label set."""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        # Label values -> (count per bucket, +Inf included, sum)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels: str):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            total[0] += seconds
+
+    def expose(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = [(key, list(counts), total[0]) for key, (counts, total) in sorted(self._series.items())]
+        for key, counts, total in series:
+            labels = _format_labels(self.label_names, key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+        return lines
+
+class Gauge:
+    """Gauge read from a callback when the metrics are scraped."""
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+
+    def expose(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge', f'{self.name} {float(self.read())}']
+
+class Metrics_Registry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def expose(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        return '\n'.join(line for metric in self._metrics for line in metric.expose()) + '\n'
+
+@dataclass
+class Request_Context:
+    endpoint: str = 'none'
+    family: str = 'none'
+    started: Optional[float] = None
+
+# Set by the metrics middleware and the endpoints; copied onto solver threads by the scheduler
+REQUEST_CONTEXT: contextvars.ContextVar[Request_Context] = contextvars.ContextVar('request_context', default=Request_Context())
+
+METRICS = Metrics_Registry()
+
+PHASE_SECONDS = METRICS.register(Histogram(
+    'coloring_phase_seconds',
+    'Seconds spent in each phase of a request or solve.',
+    PHASE_LABELS,
+    PHASE_BUCKETS,
+))
+
+RENDER_WAIT_SECONDS = METRICS.register(Histogram(
+    'coloring_render_queue_seconds',
+    'Seconds a plot waited in the render queue before rendering started.',
+    ('status',),
+    PHASE_BUCKETS,
+))
+
+_in_flight = [0]
+_in_flight_lock = threading.Lock()
+
+METRICS.register(Gauge('coloring_solves_in_flight', 'Solves currently running in color_graph.', lambda: _in_flight[0]))
+METRICS.register(Gauge('coloring_solver_queue_depth', 'Jobs waiting on the solver scheduler.', lambda: SOLVER_SCHEDULER.stats()['queued']))
+METRICS.register(Gauge('coloring_solver_cpus_in_use', 'CPUs of the solver budget held by running jobs.', lambda: SOLVER_SCHEDULER.stats()['cpus_in_use']))
+METRICS.register(Gauge('coloring_render_queue_depth', 'Plots queued or rendering on the render pool.', lambda: RENDER_POOL.stats()['pending']))
+
+@dataclass
+class Phase_Trace:
+    """Phase timings of one solve, observed together once its status is known.
+
+    A phase entered more than once (the cache lookup and store) is observed
+    as its total. The status stays 'error' unless the solve sets it.
+    """
+    method: str
+    n_vertices: int
+    context: Request_Context = field(default_factory=lambda: REQUEST_CONTEXT.get())
+    status: str = 'error'
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + perf_counter() - start
+
+    def finish(self):
+        for name, seconds in self.phases.items():
+            PHASE_SECONDS.observe(
+                seconds, phase=name, endpoint=self.context.endpoint, method=self.method,
+                family=self.context.family, vertices=vertex_bucket(self.n_vertices), status=self.status
+            )
+        self.phases.clear()
+
+@contextmanager
+def solve_in_flight() -> Iterator[None]:
+    with _in_flight_lock:
+        _in_flight[0] += 1
+    try:
+        yield
+    finally:
+        with _in_flight_lock:
+            _in_flight[0] -= 1
+
+def set_family(family: str) -> Request_Context:
+    """Tag the current request, and every solve it submits, with its graph family."""
+    context = REQUEST_CONTEXT.get()
+    context = Request_Context(endpoint=context.endpoint, family=family, started=context.started)
+    REQUEST_CONTEXT.set(context)
+    return context
+
+def request_parsed(family: str, method: str = 'none', n_vertices: int = 0):
+    """Called first thing in an endpoint: tag the request with its graph family and
+    record the time since the middleware saw it, which is mostly body parsing."""
+    context = set_family(family)
+    if context.started is not None:
+        PHASE_SECONDS.observe(
+            perf_counter() - context.started, phase='parse', endpoint=context.endpoint, method=method,
+            family=family, vertices=vertex_bucket(n_vertices), status='ok'
+        )
+
+@contextmanager
+def request_phase(name: str, method: str = 'none', n_vertices: int = 0) -> Iterator[None]:
+    """Time a phase that runs in the endpoint itself, outside any solve."""
+    context = REQUEST_CONTEXT.get()
+    start = perf_counter()
+    status = 'error'
+    try:
+        yield
+        status = 'ok'
+    finally:
+        PHASE_SECONDS.observe(
+            perf_counter() - start, phase=name, endpoint=context.endpoint, method=method,
+            family=context.family, vertices=vertex_bucket(n_vertices), status=status
+        )
+
+def _observe_render(name: str, render_seconds: float, wait_seconds: float, failed: bool):
+    RENDER_WAIT_SECONDS.observe(wait_seconds, status='error' if failed else 'ok')
+
+RENDER_POOL.listeners.append(_observe_render)
+
+class Metrics_Middleware:
+    """ASGI middleware that stamps each request with its path and arrival time."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        token = REQUEST_CONTEXT.set(Request_Context(endpoint=scope['path'], started=perf_counter()))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            REQUEST_CONTEXT.reset(token)
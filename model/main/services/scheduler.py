@@ -0,0 +1,122 @@
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+from os import getenv
+from typing import Any, Callable, Dict, List
+
+class PRIORITY(IntEnum):
+    # Lower values are served first
+    INTERACTIVE = 0
+    BATCH = 1
+
+@dataclass(order=True)
+class Scheduled_Job:
+    priority: int
+    # Negated estimated cost, so the most expensive job of a priority goes first
+    neg_cost: float
+    sequence: int
+    cpus: int = field(compare=False)
+    function: Callable[..., Any] = field(compare=False)
+    args: tuple = field(compare=False)
+    kwargs: Dict[str, Any] = field(compare=False)
+    future: Future = field(compare=False)
+    # Context of the submitter, so request-scoped context variables reach the solver thread
+    context: contextvars.Context = field(compare=False)
+
+class Solver_Scheduler:
+    """Process-wide queue in front of every solve.
+
+    Jobs are served by priority (interactive before batch), then by estimated
+    cost, largest first, so the long cases of a batch do not start last. A job
+    holds cpus of the CPU budget while it runs and the next job only starts
+    once its cpus fit, which caps concurrent solver work across all requests.
+    """
+
+    def __init__(self, cpu_budget: int):
+        self.cpu_budget = max(1, cpu_budget)
+        self._queue: List[Scheduled_Job] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._cpus_in_use = 0
+        self._running = 0
+        self._workers: List[threading.Thread] = []
+
+    def _start_workers(self):
+        # One thread per CPU of the budget is enough since every job takes at least one
+        while len(self._workers) < self.cpu_budget:
+            worker = threading.Thread(target=self._work, name=f'solver-{len(self._workers)}', daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._queue or self._cpus_in_use + self._queue[0].cpus > self.cpu_budget:
+                    self._condition.wait()
+                job = heapq.heappop(self._queue)
+                self._cpus_in_use += job.cpus
+                self._running += 1
+
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    try:
+                        job.future.set_result(job.context.run(job.function, *job.args, **job.kwargs))
+                    except BaseException as e:
+                        job.future.set_exception(e)
+            finally:
+                with self._condition:
+                    self._cpus_in_use -= job.cpus
+                    self._running -= 1
+                    self._condition.notify_all()
+
+    def submit(self, function: Callable[..., Any], *args, priority: PRIORITY = PRIORITY.BATCH, cost: float = 0.0, cpus: int = 1, **kwargs) -> Future:
+        """Queue function(*args, **kwargs) and return its future.
+
+        Args:
+            function: Callable to run on a solver thread
+            priority: PRIORITY.INTERACTIVE or PRIORITY.BATCH
+            cost: Estimated cost; larger jobs of the same priority run first
+            cpus: CPUs the job keeps busy (the solver thread count), clamped to the budget
+        """
+        future = Future()
+        job = Scheduled_Job(
+            priority=int(priority),
+            neg_cost=-cost,
+            sequence=next(self._sequence),
+            cpus=min(max(1, cpus or 1), self.cpu_budget),
+            function=function,
+            args=args,
+            kwargs=kwargs,
+            future=future,
+            context=contextvars.copy_context(),
+        )
+        with self._condition:
+            self._start_workers()
+            heapq.heappush(self._queue, job)
+            self._condition.notify_all()
+        return future
+
+    def stats(self) -> Dict[str, int]:
+        """Queued and running jobs and CPUs in use."""
+        with self._condition:
+            return {
+                'cpu_budget': self.cpu_budget,
+                'cpus_in_use': self._cpus_in_use,
+                'running': self._running,
+                'queued': len(self._queue),
+            }
+
+def estimate_solve_cost(n_vertices: int, degree: int, r: int) -> float:
+    """Rough relative cost of solving a regular graph, for ordering batch cases.
+
+    The model has one constraint block per arc and color, and higher r makes
+    the neighborhood constraints bind on more vertices.
+    """
+    return float(n_vertices * max(degree, 1) * (min(r, degree) + 1))
+
+SOLVER_SCHEDULER = Solver_Scheduler(int(getenv('SOLVER_CPU_BUDGET', os.cpu_count() or 1)))
@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from os import getenv
+from typing import Dict, List, Optional, Tuple, TypeVar
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+from scipy import sparse
+
+from ..coloring.adjacency import Adjacency_Type, adjacency_to_csr
+from ..coloring.canonical import find_isomorphism, graph_fingerprint
+
+T = TypeVar('T')
+
+Cache_Key = Tuple[str, int, str]
+
+@dataclass
+class Cached_Coloring:
+    adjacency_matrix: sparse.csr_array
+    # Color per CSR row of adjacency_matrix
+    colors: NDArray[np.int64]
+
+    @property
+    def colors_used(self) -> int:
+        return int(self.colors.max()) + 1 if len(self.colors) else 0
+
+    def to_json(self) -> dict:
+        return {
+            'n': self.adjacency_matrix.shape[0],
+            'indptr': self.adjacency_matrix.indptr.tolist(),
+            'indices': self.adjacency_matrix.indices.tolist(),
+            'colors': self.colors.tolist(),
+        }
+
+    @staticmethod
+    def from_json(data: dict) -> 'Cached_Coloring':
+        n = data['n']
+        indices = np.asarray(data['indices'], dtype=np.int32)
+        matrix = sparse.csr_array(
+            (np.ones(len(indices), dtype=np.int8), indices, np.asarray(data['indptr'], dtype=np.int32)),
+            shape=(n, n)
+        )
+        return Cached_Coloring(matrix, np.asarray(data['colors'], dtype=np.int64))
+
+class Solution_Cache:
+    """Colorings keyed by graph structure, r and method.
+
+    Graphs are matched up to isomorphism: the key holds a WL fingerprint and a
+    hit is confirmed with an explicit isomorphism, which also maps the stored
+    colors onto the caller's vertex labels. k is not part of the key. A stored
+    coloring answers any request that allows at least as many colors, and a key
+    keeps the coloring with the fewest colors seen so far (one per
+    non-isomorphic graph sharing the fingerprint).
+
+    The memory tier is an LRU bounded by max_entries keys. When a directory is
+    given, entries are also written there as JSON and read back on a memory
+    miss, so they survive restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: 'OrderedDict[Cache_Key, List[Cached_Coloring]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: Cache_Key) -> str:
+        fingerprint, r, method = key
+        return os.path.join(self.directory, f'{fingerprint}_r{r}_{method}.json')
+
+    def _load(self, key: Cache_Key) -> Optional[List[Cached_Coloring]]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key)) as file:
+                return [Cached_Coloring.from_json(entry) for entry in json.load(file)]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f'Ignoring unreadable cache file {self._path(key)}: {e}')
+            return None
+
+    def _store(self, key: Cache_Key, entries: List[Cached_Coloring]) -> None:
+        if not self.directory:
+            return
+        path = self._path(key)
+        temporary_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            with open(temporary_path, 'w') as file:
+                json.dump([entry.to_json() for entry in entries], file)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            logger.warning(f'Could not write cache file {path}: {e}')
+
+    def _remember(self, key: Cache_Key, entries: List[Cached_Coloring]) -> None:
+        self._entries[key] = entries
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, adjacency: Adjacency_Type, r: int, method: str, max_colors: Optional[int] = None) -> Optional[Dict[T, int]]:
+        """Look up a coloring of the graph, relabeled to the caller's vertices.
+
+        Args:
+            adjacency: Adjacency list or sparse matrix of the graph
+            r: Dynamic coloring order
+            method: Coloring method name
+            max_colors: Largest number of colors the caller accepts
+
+        Returns:
+            Dictionary mapping vertices to their colors, or None on a miss
+        """
+        labels, adjacency_matrix = adjacency_to_csr(adjacency)
+        key = (graph_fingerprint(adjacency_matrix), r, method)
+
+        with self._lock:
+            entries = self._entries.get(key)
+            tier = 'memory'
+            if entries is None:
+                entries = self._load(key)
+                tier = 'disk'
+                if entries is not None:
+                    self._remember(key, entries)
+            else:
+                self._entries.move_to_end(key)
+
+        for entry in entries or []:
+            if max_colors is not None and entry.colors_used > max_colors:
+                continue
+            mapping = find_isomorphism(entry.adjacency_matrix, adjacency_matrix)
+            if mapping is None:
+                continue
+            colors = np.empty_like(entry.colors)
+            colors[mapping] = entry.colors
+            with self._lock:
+                if tier == 'memory':
+                    self.memory_hits += 1
+                else:
+                    self.disk_hits += 1
+            logger.info(f'Solution cache {tier} hit for r={r}, method={method}')
+            return dict(zip(labels, colors.tolist()))
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, adjacency: Adjacency_Type, r: int, method: str, color_assignment: Dict[T, int]) -> None:
+        """Store a coloring, keeping the one with fewer colors per graph.
+
+        Args:
+            adjacency: Adjacency list or sparse matrix of the graph
+            r: Dynamic coloring order
+            method: Coloring method name
+            color_assignment: Dictionary mapping vertices to their colors
+        """
+        labels, adjacency_matrix = adjacency_to_csr(adjacency)
+        key = (graph_fingerprint(adjacency_matrix), r, method)
+        new_entry = Cached_Coloring(
+            adjacency_matrix,
+            np.asarray([color_assignment[label] for label in labels], dtype=np.int64)
+        )
+
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries is None:
+                entries = self._load(key) or []
+
+        entries = list(entries)
+        for i, entry in enumerate(entries):
+            if find_isomorphism(entry.adjacency_matrix, adjacency_matrix) is not None:
+                if new_entry.colors_used >= entry.colors_used:
+                    return
+                entries[i] = new_entry
+                break
+        else:
+            entries.append(new_entry)
+
+        with self._lock:
+            self._remember(key, entries)
+            self._store(key, entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and the number of keys in memory."""
+        with self._lock:
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+            }
+
+    def clear(self) -> None:
+        """Drop the memory tier and reset the counters (disk files are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+SOLUTION_CACHE = Solution_Cache(
+    max_entries=int(getenv('COLORING_CACHE_SIZE', 1024)),
+    directory=getenv('COLORING_CACHE_DIR')
+)
@@ -1,9 +1,15 @@
 from copy import deepcopy
-from typing import List
+import itertools
+import random
+from typing import Dict, Iterator, List, Tuple
+from scipy import sparse
+from coloring.adjacency import adjacency_to_csr
+from coloring.canonical import find_isomorphism, graph_fingerprint
 from graph.graph_coloring import T_Grid_Graph
+from graph.graph_types import VertexType
 from .star_utils import update_grid, verify_not_adjacent
 from .star_types import INDEX_ACCESS_TRIAD, RESULTANT_GRAPHS, Star_Triad_Type
-from .star_details import Graph_Priority_Queue
+from .star_details import Graph_Priority_Queue, Star_Graph_Information
 from loguru import logger
 
 class T_Star_Grid_Graphs():
@@ -12,83 +18,162 @@ class T_Star_Grid_Graphs():
         # List of T_Grid_Graph is actually T_Star_Graph
         self.TOTAL_GRAPHS: List[T_Grid_Graph] = []
         self.TOTAL_GRAPHS_HISTORY: List[List[Star_Triad_Type]] = []
+        # Number of enumerated graphs isomorphic to each graph of TOTAL_GRAPHS
+        self.TOTAL_GRAPHS_MULTIPLICITY: List[int] = []
+        self.RAW_GRAPHS: int = 0
+        # WL fingerprint -> (index in TOTAL_GRAPHS, adjacency matrix) of its classes
+        self.CANONICAL_CLASSES: Dict[str, List[Tuple[int, sparse.csr_array]]] = {}
 
     def validate_max_graphs(self, max_graphs: int):
         if max_graphs == -1:
             return True
         return len(self.TOTAL_GRAPHS) < max_graphs
 
-    def define_full_graphs(self, max_graphs: int):
-        code_to_coordinate = self.BASE_GRAPH.details.code.to_other
+    def find_isomorphism_class(self, adjacency_list: Dict[VertexType.Code, List[VertexType.Code]]):
+        """Count a finished graph in its isomorphism class.
+
+        Returns the index of the class when an isomorphic graph was already
+        seen, or None after registering the graph as a new class with the next
+        index of TOTAL_GRAPHS_MULTIPLICITY.
+        """
+        self.RAW_GRAPHS += 1
+        _, adjacency_matrix = adjacency_to_csr(adjacency_list)
+        classes = self.CANONICAL_CLASSES.setdefault(graph_fingerprint(adjacency_matrix), [])
+        for index, representative in classes:
+            if find_isomorphism(representative, adjacency_matrix) is not None:
+                self.TOTAL_GRAPHS_MULTIPLICITY[index] += 1
+                return index
+
+        classes.append((len(self.TOTAL_GRAPHS_MULTIPLICITY), adjacency_matrix))
+        self.TOTAL_GRAPHS_MULTIPLICITY.append(1)
+        return None
+
+    def iterate_triangulations(self, deduplicate: bool = True) -> Iterator[Tuple[int, Star_Graph_Information]]:
+        """Enumerate every triangulation of the region outside the border.
+
+        Each step cuts an ear of the remaining border, adding the chord between
+        its two neighbors. A triangulation can be reached through many ear
+        orders, so only its canonical order is followed: cutting the ear at
+        position i forbids the chords of the ears before it for the rest of that
+        branch, which makes i the first ear of the final triangulation. Every
+        triangulation is produced once without remembering visited states, and
+        the queue only holds siblings along the current branch.
+
+        With deduplicate, only the first graph of each isomorphism class is
+        yielded; TOTAL_GRAPHS_MULTIPLICITY keeps counting the class sizes and is
+        final once the generator is exhausted.
+
+        Yields:
+            (class index, adjacency list, border and ear history) per graph
+        """
+        base_adjacency_list = self.BASE_GRAPH.details.code.adjacency_list
 
         self.PRIORITY_QUEUE = Graph_Priority_Queue()
-        for border_target_index in range(len(self.BASE_GRAPH.details.code.border)):
-            evaluation_triad: Star_Triad_Type = [
-                self.BASE_GRAPH.details.code.border[(border_target_index - 1) % len(self.BASE_GRAPH.details.code.border)],
-                self.BASE_GRAPH.details.code.border[border_target_index],
-                self.BASE_GRAPH.details.code.border[(border_target_index + 1) % len(self.BASE_GRAPH.details.code.border)]
-            ]
-
-            if not verify_not_adjacent(evaluation_triad, self.BASE_GRAPH.details.code.adjacency_list, self.BASE_GRAPH.n):
-                continue
-
-            self.PRIORITY_QUEUE.push(Graph_Priority_Queue.Graph_Priority_Queue_Element(
-                graph=deepcopy(self.BASE_GRAPH.details.code.adjacency_list),
-                border=deepcopy(self.BASE_GRAPH.details.code.border),
-                border_target_index=border_target_index,
-                border_target_history=[]
-            ))
+        self.PRIORITY_QUEUE.push(Graph_Priority_Queue.Graph_Priority_Queue_Element(
+            border=tuple(self.BASE_GRAPH.details.code.border),
+            chords=frozenset(),
+            forbidden=frozenset(),
+            border_target_history=None
+        ))
 
         self.queue_size_sequence: List[int] = [len(self.PRIORITY_QUEUE.heap)]
 
-        while not self.PRIORITY_QUEUE.is_empty() and self.validate_max_graphs(max_graphs):
-            # logger.debug(f'Current elements: {PRIORITY_QUEUE.heap}')
+        while not self.PRIORITY_QUEUE.is_empty():
             element = self.PRIORITY_QUEUE.pop()
             self.queue_size_sequence.append(len(self.PRIORITY_QUEUE.heap))
 
-            # logger.debug(f'Available triads: {list(map(lambda triad: list(map(lambda v: code_to_coordinate[v], triad)), element.triads))}')
-
             if len(element.border) <= 3:
-                t_star_graph = update_grid(element, deepcopy(self.BASE_GRAPH))
-                self.TOTAL_GRAPHS.append(t_star_graph)
-                self.TOTAL_GRAPHS_HISTORY.append(element.border_target_history)
+                graph = {vertex: list(neighbors) for vertex, neighbors in base_adjacency_list.items()}
+                for vertex_1, vertex_2 in element.chords:
+                    graph[vertex_1].append(vertex_2)
+                    graph[vertex_2].append(vertex_1)
+
+                if deduplicate:
+                    if self.find_isomorphism_class(graph) is not None:
+                        continue
+                else:
+                    self.RAW_GRAPHS += 1
+                    self.TOTAL_GRAPHS_MULTIPLICITY.append(1)
+                yield len(self.TOTAL_GRAPHS_MULTIPLICITY) - 1, Star_Graph_Information(
+                    graph=graph,
+                    border=list(element.border),
+                    border_target_history=element.history()
+                )
                 continue
 
-            selected_triad: Star_Triad_Type = [
-                element.border[(element.border_target_index - 1) % len(element.border)],
-                element.border[element.border_target_index],
-                element.border[(element.border_target_index + 1) % len(element.border)]
-            ]
-            # logger.debug(f'Selected triad: {[code_to_coordinate[v] for v in selected_triad]}')
-
-            element.border_target_history.append(selected_triad[INDEX_ACCESS_TRIAD.MIDDLE.value])
-
-            element.graph[selected_triad[INDEX_ACCESS_TRIAD.VERTEX_1.value]].append(selected_triad[INDEX_ACCESS_TRIAD.VERTEX_2.value])
-            element.graph[selected_triad[INDEX_ACCESS_TRIAD.VERTEX_2.value]].append(selected_triad[INDEX_ACCESS_TRIAD.VERTEX_1.value])
-            
-            element.border.remove(selected_triad[INDEX_ACCESS_TRIAD.MIDDLE.value])
-
-            # logger.debug(f'Result: {list(map(lambda triad: list(map(lambda v: code_to_coordinate[v], triad)), element.triads))}')
-
+            forbidden = element.forbidden
             for border_target_index in range(len(element.border)):
                 evaluation_triad: Star_Triad_Type = [
                     element.border[(border_target_index - 1) % len(element.border)],
                     element.border[border_target_index],
                     element.border[(border_target_index + 1) % len(element.border)]
                 ]
+                vertex_1 = evaluation_triad[INDEX_ACCESS_TRIAD.VERTEX_1.value]
+                vertex_2 = evaluation_triad[INDEX_ACCESS_TRIAD.VERTEX_2.value]
+                chord = (min(vertex_1, vertex_2), max(vertex_1, vertex_2))
 
-                if not verify_not_adjacent(evaluation_triad, element.graph, self.BASE_GRAPH.n):
+                if not verify_not_adjacent(evaluation_triad, base_adjacency_list, self.BASE_GRAPH.n) or chord in element.chords or chord in forbidden:
                     continue
 
                 self.PRIORITY_QUEUE.push(Graph_Priority_Queue.Graph_Priority_Queue_Element(
-                    graph=deepcopy(element.graph),
-                    border=deepcopy(element.border),
-                    border_target_history=deepcopy(element.border_target_history),
-                    border_target_index=border_target_index
+                    border=element.border[:border_target_index] + element.border[border_target_index + 1:],
+                    chords=element.chords | {chord},
+                    forbidden=forbidden,
+                    border_target_history=(evaluation_triad[INDEX_ACCESS_TRIAD.MIDDLE.value], element.border_target_history)
                 ))
+                forbidden = forbidden | {chord}
         
         self.queue_size_sequence.append(len(self.PRIORITY_QUEUE.heap))
 
+    def sample_triangulations(self, sample_graphs: int, max_graphs: int = -1, deduplicate: bool = True) -> Iterator[Tuple[int, Star_Graph_Information]]:
+        """Uniform sample of the first max_graphs triangulations (reservoir sampling).
+
+        Only the adjacency lists of the sampled triangulations are held while
+        the enumeration runs; they are yielded in enumeration order at the end.
+        """
+        reservoir: List[Tuple[int, Star_Graph_Information]] = []
+        for seen, item in enumerate(itertools.islice(self.iterate_triangulations(deduplicate), None if max_graphs == -1 else max_graphs)):
+            if seen < sample_graphs:
+                reservoir.append(item)
+                continue
+            slot = random.randint(0, seen)
+            if slot < sample_graphs:
+                reservoir[slot] = item
+        yield from sorted(reservoir, key=lambda item: item[0])
+
+    def iterate_full_graphs(self, max_graphs: int = -1, sample_graphs: int = None, deduplicate: bool = True) -> Iterator[Tuple[int, T_Grid_Graph]]:
+        """Yield each T-star graph as soon as its triangulation completes.
+
+        Nothing is stored in TOTAL_GRAPHS, so only the graph being consumed is
+        alive. max_graphs stops the stream after that many graphs (classes
+        with deduplicate) and sample_graphs draws a uniform sample of them.
+        The BASE_GRAPH must be defined first (see iterate_graphs).
+
+        Yields:
+            (class index, T_Grid_Graph) pairs
+        """
+        if sample_graphs:
+            triangulations = self.sample_triangulations(sample_graphs, max_graphs, deduplicate)
+        else:
+            triangulations = itertools.islice(self.iterate_triangulations(deduplicate), None if max_graphs == -1 else max_graphs)
+        for index, completed in triangulations:
+            yield index, update_grid(completed, deepcopy(self.BASE_GRAPH))
+
+    def define_full_graphs(self, max_graphs: int, deduplicate: bool = True):
+        """Collect the full set in TOTAL_GRAPHS and TOTAL_GRAPHS_HISTORY.
+
+        With deduplicate, TOTAL_GRAPHS keeps one graph per isomorphism class
+        (max_graphs counts classes) and TOTAL_GRAPHS_MULTIPLICITY their sizes.
+        """
+        triangulations = self.iterate_triangulations(deduplicate)
+        while self.validate_max_graphs(max_graphs):
+            completed = next(triangulations, None)
+            if completed is None:
+                break
+            _, completed = completed
+            self.TOTAL_GRAPHS.append(update_grid(completed, deepcopy(self.BASE_GRAPH)))
+            self.TOTAL_GRAPHS_HISTORY.append(completed.border_target_history)
+
     def define_max_degree_graphs(self):
 
         GRID: T_Grid_Graph = deepcopy(self.BASE_GRAPH)
@@ -132,12 +217,21 @@ class T_Star_Grid_Graphs():
 
         GRID.add_edges(new_edges)
         self.TOTAL_GRAPHS.append(GRID)
+        self.TOTAL_GRAPHS_MULTIPLICITY.append(1)
+        self.RAW_GRAPHS += 1
         
-    def define_graph(self, max_graphs: int = -1, resultant_graphs: RESULTANT_GRAPHS = RESULTANT_GRAPHS.FULL_SET):
+    def define_graph(self, max_graphs: int = -1, resultant_graphs: RESULTANT_GRAPHS = RESULTANT_GRAPHS.FULL_SET, deduplicate: bool = True):
         self.BASE_GRAPH.define_graph()
         if resultant_graphs == RESULTANT_GRAPHS.FULL_SET:
-            self.define_full_graphs(max_graphs)
+            self.define_full_graphs(max_graphs, deduplicate)
         elif resultant_graphs == RESULTANT_GRAPHS.MAX_DEGREE:
             self.define_max_degree_graphs()
 
-        
\ No newline at end of file
+    def iterate_graphs(self, max_graphs: int = -1, resultant_graphs: RESULTANT_GRAPHS = RESULTANT_GRAPHS.FULL_SET, sample_graphs: int = None, deduplicate: bool = True) -> Iterator[Tuple[int, T_Grid_Graph]]:
+        """Streaming counterpart of define_graph, yielding (index, graph) pairs."""
+        self.BASE_GRAPH.define_graph()
+        if resultant_graphs == RESULTANT_GRAPHS.FULL_SET:
+            yield from self.iterate_full_graphs(max_graphs, sample_graphs, deduplicate)
+        elif resultant_graphs == RESULTANT_GRAPHS.MAX_DEGREE:
+            self.define_max_degree_graphs()
+            yield 0, self.TOTAL_GRAPHS.pop()
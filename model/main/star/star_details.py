@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Dict, Set, List, Tuple
+from typing import Dict, FrozenSet, Optional, Set, List, Tuple
 import heapq
 
 @dataclass
@@ -11,8 +11,26 @@ class Star_Graph_Information():
 class Graph_Priority_Queue():
 
     @dataclass
-    class Graph_Priority_Queue_Element(Star_Graph_Information):
-        border_target_index: int
+    class Graph_Priority_Queue_Element():
+        """Partial triangulation of the outer border.
+
+        The state is the remaining border plus the chords added so far; the
+        graph itself is the shared base adjacency list with these chords on top.
+        """
+        border: Tuple[int, ...]
+        chords: FrozenSet[Tuple[int, int]]
+        # Ear chords passed over by an earlier sibling, never added below this state
+        forbidden: FrozenSet[Tuple[int, int]]
+        # (removed middle vertex, parent history) pairs, shared with the parent
+        border_target_history: Optional[Tuple[int, 'Optional[tuple]']]
+
+        def history(self) -> List[int]:
+            history = []
+            node = self.border_target_history
+            while node is not None:
+                history.append(node[0])
+                node = node[1]
+            return history[::-1]
 
         def __lt__(self, other):
             return len(self.border) < len(other.border)
@@ -1,7 +1,7 @@
 from typing import Dict, List, Union
 from graph.graph_coloring import T_Grid_Graph
 from .star_types import INDEX_ACCESS_TRIAD, Star_Triad_Type
-from .star_details import Graph_Priority_Queue
+from .star_details import Star_Graph_Information
 from graph.graph_types import VertexType
 
 def verify_not_adjacent(triad: Star_Triad_Type, adjacency_list: Dict[VertexType.Code, List[VertexType.Code]], n: int):
@@ -13,7 +13,7 @@ def verify_not_adjacent(triad: Star_Triad_Type, adjacency_list: Dict[VertexType.
 
     return True
 
-def update_grid(element: Graph_Priority_Queue.Graph_Priority_Queue_Element, graph: T_Grid_Graph):
+def update_grid(element: Star_Graph_Information, graph: T_Grid_Graph):
     graph.details.code.adjacency_list = element.graph
     graph.details.code.border = list(element.border)
     graph.details.code.edges = list(set([tuple(sorted([initial_vertex, final_vertex])) for initial_vertex in element.graph for final_vertex in element.graph[initial_vertex]]))
@@ -0,0 +1,49 @@
+from time import perf_counter
+from coloring.bounds import color_bounds
+from coloring.model import MODEL_METHOD
+from coloring.r_dynamic import linear_programming_model
+from coloring.r_sweep import r_sweep
+from coloring.verify import assert_valid_coloring
+from utils.antiprism import create_antiprism_graph, create_circulant_graph
+
+# Sweep options of the three circulant modes a batch can sweep with
+SWEEP_MODES = {
+    'plain': {},
+    'symmetry_breaking': {'symmetry_breaking': True},
+    'circulant_symmetry': {'circulant_symmetry': True},
+}
+
+def independent_chromatic_numbers(adjacency, r_values, model_name: MODEL_METHOD = MODEL_METHOD.ACR) -> dict[int, int]:
+    """χ_r of every r, each from a model of its own."""
+    numbers = {}
+    for r in r_values:
+        bounds = color_bounds(adjacency, r)
+        solution = linear_programming_model(adjacency, model_name, k=bounds.upper, r=r, lower_bound=bounds.lower)
+        assert solution.status == 'Optimal', f'r={r}: {solution.status}'
+        numbers[r] = len(set(solution.color_assignment().values()))
+    return numbers
+
+def compare_sweep(name: str, adjacency, r_values, expected: dict[int, int] = None):
+    start = perf_counter()
+    independent = independent_chromatic_numbers(adjacency, r_values)
+    independent_seconds = perf_counter() - start
+    if expected is not None:
+        assert independent == expected, f'{name}: independent solves give {independent}, expected {expected}'
+
+    row = {'graph': name, 'chi': list(independent.values()), 'independent_seconds': round(independent_seconds, 3)}
+    for mode, options in SWEEP_MODES.items():
+        start = perf_counter()
+        sweep = {}
+        for r, result, _ in r_sweep(adjacency, MODEL_METHOD.ACR, r_values, **options):
+            assert result.status.value == 'optimal', f'{name} {mode} r={r}: {result.status.value}'
+            assert_valid_coloring(adjacency, result.coloring, r)
+            sweep[r] = result.colors_used
+        assert sweep == independent, f'{name} {mode}: sweep gives {sweep}, independent solves {independent}'
+        row[f'{mode}_seconds'] = round(perf_counter() - start, 3)
+    print(row)
+
+# Δ = 4: every r >= 4 asks all neighbors to differ, and G² of C_13(1,5) is K_13
+compare_sweep('C_13(1,5)', create_circulant_graph(13, 1, 5), range(1, 9), {1: 4, 2: 4, 3: 6, 4: 13, 5: 13, 6: 13, 7: 13, 8: 13})
+compare_sweep('C_12(1,3)', create_circulant_graph(12, 1, 3), range(1, 7), {1: 2, 2: 4, 3: 4, 4: 6, 5: 6, 6: 6})
+compare_sweep('antiprism 8', create_antiprism_graph(8), range(1, 7), {1: 4, 2: 4, 3: 4, 4: 6, 5: 6, 6: 6})
+compare_sweep('C_10(1,2,4)', create_circulant_graph(10, 1, 2, 4), [6, 2, 4, 3])
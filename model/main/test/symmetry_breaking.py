@@ -0,0 +1,33 @@
+from coloring.bounds import color_bounds
+from coloring.model import MODEL_METHOD
+from coloring.r_dynamic import linear_programming_model
+from coloring.verify import assert_valid_coloring
+from utils.antiprism import create_antiprism_graph, create_circulant_graph
+
+# Timings of larger circulants are in benchmarks/symmetry_breaking.py
+def check_symmetry_breaking(name: str, adjacency, r_values, model_name: MODEL_METHOD = MODEL_METHOD.ACR, time_limit: float = 60):
+    """The clique fixings and the anchored color ordering must keep χ_r."""
+    for r in r_values:
+        bounds = color_bounds(adjacency, r)
+        found = {}
+        for symmetry_breaking in [False, True]:
+            solution = linear_programming_model(
+                adjacency, model_name, k=bounds.upper, r=r, time_limit=time_limit, symmetry_breaking=symmetry_breaking
+            )
+            colors = None
+            if solution.has_solution():
+                coloring = solution.color_assignment()
+                assert_valid_coloring(adjacency, coloring, r)
+                colors = len(set(coloring.values()))
+            found[symmetry_breaking] = (solution.status, colors)
+        assert found[True] == found[False], f'{name} r={r}: plain {found[False]}, symmetry breaking {found[True]}'
+        assert found[False][0] == 'Optimal', f'{name} r={r}: {found[False][0]}'
+    print(f'ok {name}')
+
+check_symmetry_breaking('C_10(1,2)', create_circulant_graph(10, 1, 2, output_format='list'), range(1, 5))
+check_symmetry_breaking('C_12(1,3)', create_circulant_graph(12, 1, 3, output_format='list'), range(1, 5))
+check_symmetry_breaking('C_12(1,2,3)', create_circulant_graph(12, 1, 2, 3, output_format='list'), range(4, 7))
+check_symmetry_breaking('C_13(1,5)', create_circulant_graph(13, 1, 5, output_format='list'), range(1, 4))
+check_symmetry_breaking('antiprism 6', create_antiprism_graph(6), range(1, 5))
+check_symmetry_breaking('antiprism 9', create_antiprism_graph(9), range(1, 5))
+check_symmetry_breaking('antiprism 9, ACR-H', create_antiprism_graph(9), range(2, 4), MODEL_METHOD.ACR_H)
@@ -0,0 +1,69 @@
+import numpy as np
+from coloring.verify import assert_valid_coloring, coloring_violations
+from utils.antiprism import create_circulant_graph
+
+def naive_violations(adjacency_list: dict, coloring: dict, r: int) -> tuple[list, list, list]:
+    """Vertex by vertex check of the r-dynamic conditions, independent of coloring_violations."""
+    uncolored = sorted(v for v in adjacency_list if v not in coloring)
+    if uncolored:
+        return uncolored, [], []
+    improper = sorted(v for v, neighbors in adjacency_list.items() if any(coloring[u] == coloring[v] for u in neighbors))
+    not_dynamic = sorted(
+        v for v, neighbors in adjacency_list.items()
+        if len({coloring[u] for u in neighbors}) < min(r, len(neighbors))
+    )
+    return uncolored, improper, not_dynamic
+
+def check(name: str, adjacency, coloring, r: int, uncolored=(), improper=(), not_dynamic=()):
+    violations = coloring_violations(adjacency, coloring, r)
+    found = (violations.uncolored, violations.improper, violations.not_dynamic)
+    expected = (list(uncolored), list(improper), list(not_dynamic))
+    assert found == expected, f'{name}: expected {expected}, got {found}'
+    valid = not (uncolored or improper or not_dynamic)
+    try:
+        assert_valid_coloring(adjacency, coloring, r)
+        assert valid, f'{name}: assert_valid_coloring accepted an invalid coloring'
+    except ValueError:
+        assert not valid, f'{name}: assert_valid_coloring rejected a valid coloring'
+    print(f'ok {name}')
+
+cycle_5 = {v: [(v - 1) % 5, (v + 1) % 5] for v in range(5)}
+path_3 = {0: [1], 1: [0, 2], 2: [1]}
+
+# C_5 needs 5 colors to be 2-dynamic; the proper 3-coloring fails at the repeated color 1 around 0 and 4
+check('C_5 3-coloring, r=1', cycle_5, {0: 0, 1: 1, 2: 2, 3: 0, 4: 1}, 1)
+check('C_5 3-coloring, r=2', cycle_5, {0: 0, 1: 1, 2: 2, 3: 0, 4: 1}, 2, not_dynamic=[0, 4])
+check('C_5 5-coloring, r=2', cycle_5, np.arange(5), 2)
+check('C_5 improper', cycle_5, np.array([0, 0, 1, 2, 3]), 1, improper=[0, 1])
+check('C_5 uncolored', cycle_5, {0: 0, 1: 1, 2: 2, 3: 0}, 1, uncolored=[4])
+check('C_5 negative color', cycle_5, np.array([0, 1, 2, 0, -1]), 1, uncolored=[4])
+# min(r, deg): the ends of a path have one neighbor, so r=3 only asks two colors of the center
+check('P_3 r=3', path_3, {0: 0, 1: 1, 2: 2}, 3)
+check('P_3 r=2', path_3, {0: 0, 1: 1, 2: 0}, 2, not_dynamic=[1])
+check('labels', {'a': ['b'], 'b': ['a', 'c'], 'c': ['b']}, {'a': 0, 'b': 1, 'c': 0}, 2, not_dynamic=['b'])
+# A list of neighbor lists, as the API accepts for adjacency_list, is labeled 0..n-1
+check('list of lists K_3', [[1, 2], [0, 2], [0, 1]], {0: 0, 1: 1, 2: 2}, 2)
+check('list of lists K_3 improper', [[1, 2], [0, 2], [0, 1]], {0: 0, 1: 1, 2: 1}, 2, improper=[1, 2], not_dynamic=[0])
+check('sparse C_13(1,5), r=4', create_circulant_graph(13, 1, 5), np.arange(13), 4)
+# i mod 3 is proper along +1 and +5 except where the edge 12 - 0 wraps around
+check('sparse C_13(1,5), r=1', create_circulant_graph(13, 1, 5), np.arange(13) % 3, 1, improper=[0, 12])
+
+try:
+    coloring_violations(cycle_5, np.arange(4), 1)
+    raise AssertionError('a coloring of the wrong length was accepted')
+except ValueError:
+    print('ok wrong length')
+
+# Random graphs and colorings against the vertex by vertex check
+rng = np.random.default_rng(0)
+for trial in range(300):
+    n = int(rng.integers(1, 12))
+    upper = np.triu(rng.random((n, n)) < rng.uniform(0.1, 0.7), 1)
+    matrix = upper | upper.T
+    adjacency_list = {v: np.flatnonzero(matrix[v]).tolist() for v in range(n)}
+    coloring = {v: int(c) for v, c in enumerate(rng.integers(0, int(rng.integers(1, n + 2)), n))}
+    r = int(rng.integers(1, 5))
+    violations = coloring_violations(adjacency_list, coloring, r)
+    expected = naive_violations(adjacency_list, coloring, r)
+    assert (violations.uncolored, violations.improper, violations.not_dynamic) == expected, (adjacency_list, coloring, r)
+print('ok 300 random graphs match the vertex by vertex check')
@@ -1,61 +1,73 @@
-# Your first line of Python code
-from typing import List
+from typing import Dict, List, Union
 import numpy as np
-import sys
+from numpy.typing import NDArray
+from scipy import sparse
 
-def create_antiprism_adjacency_matrix(n):
+Circulant_Graph = Union[NDArray[np.int64], sparse.csr_array, Dict[int, List[int]], List[List[int]]]
+
+def circulant_offsets(n: int, *connections: int) -> NDArray[np.int64]:
+    """Sorted neighbor offsets ±s mod n of C_n(S), for the s in S with 0 < s <= n/2."""
+    connection_set = np.array(sorted(set(s for s in connections if 0 < s <= n // 2)), dtype=np.int64)
+    return np.unique(np.concatenate([connection_set, -connection_set]) % n) if n else connection_set
+
+def create_circulant_graph(n: int, *connections: int, output_format: str = 'csr') -> Circulant_Graph:
     """
-    Generates the adjacency matrix for an n-antiprism graph.
-    The graph is isomorphic to the circulant graph Ci_(2n)(1,2).
-    
+    Generates the circulant graph C_n(S), where i is adjacent to i ± s (mod n).
+
+    The neighbors of every vertex come from broadcasting the offsets over
+    0..n-1, so building the graph costs O(n·|S|) instead of the n² of a
+    dense matrix.
+
     Args:
-        n (int): Defines the antiprism (must be even, based on user query).
-        
+        n (int): Number of vertices.
+        connections (int): The connection set S; values outside 0 < s <= n/2 are ignored.
+        output_format (str): 'edges' for an (m, 2) array of edges u < v,
+                             'csr' for a sparse adjacency matrix,
+                             'list' for an adjacency list (dict of lists)
+                             or 'matrix' for a dense adjacency matrix (list of lists).
+
     Returns:
-        numpy.ndarray: The 2n x 2n adjacency matrix.
+        Circulant_Graph: The generated graph.
     """
-    
-    # # 1. Validate Input (based on user query constraint)
-    # if n % 2 != 0:
-    #     print("Error: The input 'n' must be an even number as requested.", file=sys.stderr)
-    #     return None
-        
-    # N is the total number of vertices (2n) [1]
-    N = 2 * n
-    
-    # Initialize the N x N adjacency matrix with zeros
-    A = np.zeros((N, N), dtype=int)
-    
-    # The circulant graph Ci_(N)(1,2) connects each vertex i to:
-    # i ± 1 (modulo N) and i ± 2 (modulo N).
-    connection_set = {1, 2}
-    
-    # 2. Populate the Matrix
-    for i in range(N):
-        for s in connection_set:
-            # Connection i + s (forward connection)
-            j_plus = (i + s) % N
-            A[i, j_plus] = 1
-            
-            # Connection i - s (backward connection)
-            # We add N before taking modulo to ensure positive results for negative indices
-            j_minus = (i - s + N) % N
-            A[i, j_minus] = 1
-            
-    # The matrix is now complete, defined by the Ci_(2n)(1,2) structure [1]
-    return A.tolist()
+    offsets = circulant_offsets(n, *connections)
+    neighbors = (np.arange(n, dtype=np.int64)[:, None] + offsets[None, :]) % n
+
+    if output_format == 'edges':
+        vertices = np.repeat(np.arange(n, dtype=np.int64), len(offsets))
+        neighbors = neighbors.ravel()
+        upper = vertices < neighbors
+        return np.stack([vertices[upper], neighbors[upper]], axis=1)
+    if output_format == 'list':
+        return dict(enumerate(np.sort(neighbors, axis=1).tolist()))
+
+    neighbors.sort(axis=1)
+    adjacency_matrix = sparse.csr_array(
+        (np.ones(neighbors.size, dtype=np.int8), neighbors.ravel(), np.arange(n + 1) * len(offsets)),
+        shape=(n, n)
+    )
+    if output_format == 'csr':
+        return adjacency_matrix
+    if output_format == 'matrix':
+        return adjacency_matrix.toarray().astype(int).tolist()
+    raise ValueError("output_format must be 'edges', 'csr', 'list' or 'matrix'")
+
+def create_antiprism_graph(n: int, output_format: str = 'csr') -> Circulant_Graph:
+    """
+    Generates the n-antiprism graph, the circulant graph Ci_(2n)(1,2).
+
+    Args:
+        n (int): Defines the antiprism (2n vertices).
+        output_format (str): 'edges', 'csr', 'list' or 'matrix', as in create_circulant_graph.
+
+    Returns:
+        Circulant_Graph: The generated graph.
+    """
+    return create_circulant_graph(2 * n, 1, 2, output_format=output_format)
+
+def create_antiprism_adjacency_matrix(n):
+    """Dense 2n x 2n adjacency matrix (list of lists) of the n-antiprism graph."""
+    return create_antiprism_graph(n, output_format='matrix')
 
 def create_circulant_adjacency_matrix(n: int, *connections: int):
-    A = np.zeros((n, n), dtype=int)
-
-    connection_set = set(filter(lambda x: x <= n//2 and x > 0, connections))
-
-    for i in range(n):
-        for s in connection_set:
-            j_plus = (i + s) % n
-            A[i, j_plus] = 1
-            
-            j_minus = (i - s + n) % n
-            A[i, j_minus] = 1
-    
-    return A.tolist()
\ No newline at end of file
+    """Dense n x n adjacency matrix (list of lists) of C_n(S)."""
+    return create_circulant_graph(n, *connections, output_format='matrix')
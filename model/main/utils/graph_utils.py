@@ -1,12 +1,18 @@
 from typing import Dict, List
+import numpy as np
 
 def adjacency_matrix_to_adjacency_list(graph: List[List[int]]) -> Dict[int, List[int]]:
     """Convert an adjacency matrix to an adjacency list.
-    
+
     Args:
         graph: Adjacency matrix as a 2D list
-        
+
     Returns:
         Adjacency list as a dictionary
     """
-    return {i: [j for j in range(len(graph)) if graph[i][j] == 1] for i in range(len(graph))}
+    if len(graph) == 0:
+        return {}
+    matrix = np.asarray(graph).reshape(len(graph), len(graph))
+    rows, cols = np.nonzero(matrix == 1)
+    neighbors = np.split(cols, np.searchsorted(rows, np.arange(1, len(graph))))
+    return {i: row.tolist() for i, row in enumerate(neighbors)}
@@ -1,91 +1,139 @@
-from typing import List, Dict
-import networkx as nx
-import matplotlib.pyplot as plt
-import io
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, List, Dict, Tuple
+import hashlib
+import threading
+import numpy as np
+from numpy.typing import NDArray
+from scipy import sparse
 
-def plot_graph_to_bytes(adjacency_list: Dict[int, List[int]], coloring: Dict[int, int]) -> bytes:
+from ..coloring.adjacency import adjacency_to_csr, csr_edges
+from .render import RENDER_POOL, render_plot
+
+def circular_layout(adjacency_matrix: sparse.csr_array) -> NDArray[np.float64]:
+    """Vertices 0..n-1 clockwise on the unit circle, starting at the top (circulants, antiprisms)."""
+    angles = np.pi / 2 - 2 * np.pi * np.arange(adjacency_matrix.shape[0]) / max(adjacency_matrix.shape[0], 1)
+    return np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+def planar_3_tree_layout(adjacency_matrix: sparse.csr_array) -> NDArray[np.float64]:
+    """Recursive barycentric placement of a planar 3-tree from generate_planar_3_tree.
+
+    Vertices 0, 1, 2 are the corners of the outer triangle, and every later
+    vertex sits at the barycenter of the face it was added to: its three
+    smaller neighbors. Each iteration's vertices are placed in one step.
+    """
+    n_vertices = adjacency_matrix.shape[0]
+    indptr, indices = adjacency_matrix.indptr, adjacency_matrix.indices
+    angles = np.pi / 2 + 2 * np.pi * np.arange(3) / 3
+    positions = np.zeros((n_vertices, 2))
+    positions[:min(3, n_vertices)] = np.stack([np.cos(angles), np.sin(angles)], axis=1)[:n_vertices]
+
+    start, count = 3, 1
+    while start < n_vertices:
+        block = np.arange(start, min(start + count, n_vertices))
+        parents = indices[indptr[block][:, None] + np.arange(3)[None, :]]
+        if np.any(parents >= block[:, None]):
+            raise ValueError("Graph is not a planar 3-tree labeled in construction order")
+        positions[block] = positions[parents].mean(axis=1)
+        start, count = start + count, 3 * count
+    return positions
+
+def spring_layout(adjacency_matrix: sparse.csr_array) -> NDArray[np.float64]:
+    """Seeded spring layout for graphs without a family layout."""
+    import networkx as nx
+
+    positions = nx.spring_layout(nx.from_scipy_sparse_array(adjacency_matrix), k=0.2, iterations=60, seed=0)
+    return np.array([positions[v] for v in range(adjacency_matrix.shape[0])])
+
+LAYOUTS: Dict[str, Callable[[sparse.csr_array], NDArray[np.float64]]] = {
+    'circular': circular_layout,
+    'planar3': planar_3_tree_layout,
+    'spring': spring_layout,
+}
+
+def structure_key(adjacency_matrix: sparse.csr_array) -> str:
+    """Digest of the labeled structure; unlike graph_fingerprint, relabeled graphs differ."""
+    digest = hashlib.sha1(np.int64(adjacency_matrix.shape[0]).tobytes())
+    digest.update(adjacency_matrix.indptr.astype(np.int64).tobytes())
+    digest.update(adjacency_matrix.indices.astype(np.int64).tobytes())
+    return digest.hexdigest()
+
+class Layout_Cache:
+    """LRU cache of layouts, keyed by layout and labeled structure."""
+
+    def __init__(self, max_layouts: int = 64):
+        self.max_layouts = max_layouts
+        self._layouts: 'OrderedDict[Tuple[str, str], NDArray[np.float64]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def layout(self, layout: str, adjacency_matrix: sparse.csr_array, key: str) -> NDArray[np.float64]:
+        with self._lock:
+            if (layout, key) in self._layouts:
+                self._layouts.move_to_end((layout, key))
+                return self._layouts[(layout, key)]
+        positions = LAYOUTS[layout](adjacency_matrix)
+        with self._lock:
+            self._layouts[(layout, key)] = positions
+            while len(self._layouts) > self.max_layouts:
+                self._layouts.popitem(last=False)
+        return positions
+
+LAYOUT_CACHE = Layout_Cache()
+
+def submit_graph_plot(
+    adjacency_list: Dict[int, List[int]],
+    coloring: Dict[int, int],
+    layout: str = 'spring',
+    block: bool = True,
+) -> Future:
+    """
+    Queue a plot of a colored graph on the render pool.
+
+    The layout is computed here and cached; the render process keeps the
+    drawn edges of the last few graphs, so replotting the same graph with a
+    new coloring only redraws the nodes.
+
+    Args:
+        adjacency_list: A dictionary where keys are node IDs and values are lists of neighbor IDs.
+        coloring: A dictionary mapping node IDs to their assigned color (integer).
+        layout: 'circular' (circulants, antiprisms), 'planar3' (planar 3-trees) or 'spring'.
+        block: Wait for room in the render queue instead of raising Render_Queue_Full.
+
+    Returns:
+        Future: Resolves to the PNG image data.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of {list(LAYOUTS)}")
+    labels, adjacency_matrix = adjacency_to_csr(adjacency_list)
+    key = structure_key(adjacency_matrix)
+    positions = LAYOUT_CACHE.layout(layout, adjacency_matrix, key)
+    edges = np.stack(csr_edges(adjacency_matrix), axis=1)
+    colors = np.array([coloring.get(label, 0) for label in labels], dtype=np.int64)
+    return RENDER_POOL.submit(
+        f'{layout} plot of {len(labels)} vertices',
+        render_plot, f'{layout}:{key}', [str(label) for label in labels], edges, positions, colors,
+        block=block
+    )
+
+def plot_graph_to_bytes(adjacency_list: Dict[int, List[int]], coloring: Dict[int, int], layout: str = 'spring') -> bytes:
     """
     Plots a graph with colored vertices based on an adjacency list and coloring dictionary.
     Returns the generated image as bytes (PNG format).
-    
+
+    Blocking form of submit_graph_plot.
+
     Args:
         adjacency_list: A dictionary where keys are node IDs and values are lists of neighbor IDs.
         coloring: A dictionary mapping node IDs to their assigned color (integer).
-        
+        layout: 'circular' (circulants, antiprisms), 'planar3' (planar 3-trees) or 'spring'.
+
     Returns:
         bytes: The PNG image data.
     """
-    # Initialize the graph
-    G = nx.Graph()
-    
-    # Add all nodes first to ensure they exist even if they have no neighbors
-    G.add_nodes_from(adjacency_list.keys())
-    
-    # Add edges
-    for node, neighbors in adjacency_list.items():
-        for neighbor in neighbors:
-            G.add_edge(node, neighbor)
-
-    # Create the figure with a high-definition setting
-    plt.figure(figsize=(16, 14), dpi=300, facecolor='none')
-    
-    # Calculate a layout that looks balanced
-    pos = nx.spring_layout(G, k=0.2, iterations=60)
-    
-    # Get the sequence of nodes and their corresponding colors
-    node_list = list(G.nodes())
-    colors = [coloring.get(node, 0) for node in node_list]
-    
-    # Draw the edges with subtle styling
-    nx.draw_networkx_edges(
-        G, pos, 
-        # alpha=0.4, 
-        edge_color="#000000", 
-        # edge_color="#A0A0A0", 
-        width=1.5
-    )
-    
-    # Draw the nodes with a premium qualitative colormap
-    # 'Set2', 'Set3', or 'Paired' are excellent for discrete graph colorings
-    nx.draw_networkx_nodes(
-        G, pos, 
-        nodelist=node_list,
-        node_color=colors,
-        cmap=plt.cm.get_cmap('Set3'),
-        node_size=1200,
-        edgecolors='#000000',
-        # edgecolors='#2C3E50',
-        linewidths=2.0
-    )
-    
-    # Add labels with a clean, centered font
-    nx.draw_networkx_labels(
-        G, pos, 
-        font_size=11, 
-        font_family="sans-serif", 
-        font_weight="bold",
-        # font_color="#2C3E50"
-        font_color="#000000"
-    )
-
-    # Final touches: remove axis, set tight layout
-    plt.axis('off')
-    plt.tight_layout(pad=0)
-
-    # Export to a bytes buffer
-    buf = io.BytesIO()
-    plt.show()
-    plt.savefig(buf, format='png', dpi=300, bbox_inches='tight', transparent=True)
-    plt.close()
-    
-    buf.seek(0)
-    image_bytes = buf.getvalue()
-    buf.close()
-    
-    return image_bytes
+    return submit_graph_plot(adjacency_list, coloring, layout).result()
 
 if __name__ == "__main__":
-    
+
     data = plot_graph_to_bytes(
         {0: [1, 3, 7, 9], 1: [0, 2, 4, 8], 2: [1, 3, 5, 9], 3: [0, 2, 4, 6], 4: [1, 3, 5, 7], 5: [2, 4, 6, 8], 6: [3, 5, 7, 9], 7: [0, 4, 6, 8], 8: [1, 5, 7, 9], 9: [0, 2, 6, 8]},
         {
@@ -99,9 +147,9 @@ if __name__ == "__main__":
         7: 3,
         8: 2,
         9: 0
-    }
+    },
+        layout='circular'
     )
 
-    # plot the image
-    plt.imshow(data)
-    plt.show()
\ No newline at end of file
+    with open('circulant_plot.png', 'wb') as image_file:
+        image_file.write(data)
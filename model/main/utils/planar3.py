@@ -1,85 +1,109 @@
-from typing import Dict, List, Union
-import networkx as nx
-import matplotlib.pyplot as plt
+from typing import Dict, List, Tuple, Union
+import numpy as np
+from numpy.typing import NDArray
+from scipy import sparse
 
-def generate_planar_3_tree(n: int, output_format: str = 'list') -> Union[Dict[int, List[int]], List[List[int]]]:
+def planar_3_tree_size(n: int) -> Tuple[int, int, int]:
+    """Vertices, edges and faces after n iterations, in closed form.
+
+    Iteration t adds one vertex and three edges per face and triples the faces,
+    so after n iterations there are 3^n faces, 3 + (3^n - 1) / 2 vertices and
+    3 + 3 (3^n - 1) / 2 edges.
+    """
+    added = (3 ** n - 1) // 2
+    return 3 + added, 3 + 3 * added, 3 ** n
+
+def planar_3_tree_edges(n: int) -> NDArray[np.int64]:
+    """Edges of the iterative planar 3-tree, in creation order.
+
+    The face list and the edge array are preallocated from the closed-form
+    counts and every iteration fills them with array slices.
+    """
+    n_vertices, n_edges, n_faces = planar_3_tree_size(n)
+    edges = np.empty((n_edges, 2), dtype=np.int64)
+    edges[:3] = [(0, 1), (0, 2), (1, 2)]
+    # Faces are represented by triples of vertices in cyclic order; the two
+    # buffers take turns holding the current and the next iteration.
+    faces, next_faces = np.empty((n_faces, 3), dtype=np.int64), np.empty((n_faces, 3), dtype=np.int64)
+    faces[0] = (0, 1, 2)
+
+    next_vertex, next_edge, face_count = 3, 3, 1
+    for _ in range(n):
+        current = faces[:face_count]
+        # A new vertex z inside every face (u, v, w), connected to u, v and w
+        z = np.arange(next_vertex, next_vertex + face_count, dtype=np.int64)
+        edges[next_edge:next_edge + 3 * face_count, 0] = np.repeat(z, 3)
+        edges[next_edge:next_edge + 3 * face_count, 1] = current.ravel()
+
+        # (u, v, w) is replaced by (u, v, z), (v, w, z), (w, u, z)
+        children = next_faces[:3 * face_count].reshape(face_count, 3, 3)
+        children[:, :, 0] = current
+        children[:, :, 1] = np.roll(current, -1, axis=1)
+        children[:, :, 2] = z[:, None]
+
+        next_vertex += face_count
+        next_edge += 3 * face_count
+        face_count *= 3
+        faces, next_faces = next_faces, faces
+
+    return edges
+
+def generate_planar_3_tree(n: int, output_format: str = 'list') -> Union[Dict[int, List[int]], List[List[int]], sparse.csr_array, NDArray[np.int64]]:
     """
     Generates an iterative planar 3-tree graph.
     
     The graph starts as a K3 (a triangle). In each iteration, a new vertex 
-    is added inside every face (including the outer face) and connected 
-    to the three vertices forming that face.
+    is added inside every face and connected to the three vertices forming
+    that face.
     
     Efficiency Analysis:
     -------------------
-    The best output format for this graph is the **Adjacency List**.
+    The best output formats for this graph are the **Adjacency List** and **CSR**.
     
     1. **Sparsity**: Planar graphs are sparse by nature (edges E <= 3V - 6). 
-       An adjacency list stores only existing edges, making it much more 
-       memory-efficient than an adjacency matrix, which stores V^2 entries.
+       An adjacency list or a CSR matrix stores only existing edges, making it
+       much more memory-efficient than an adjacency matrix, which stores V^2 entries.
     2. **Exponential Growth**: The number of vertices grows exponentially 
-       with the number of iterations (V = 3^n + 2). 
+       with the number of iterations (V = 3 + (3^n - 1) / 2). 
        - At n=0: V=3
-       - At n=1: V=5
-       - At n=5: V=245
-       - At n=10: V=59,051
-       For n=10, a dense adjacency matrix would consume several gigabytes of RAM,
-       while an adjacency list remains lightweight.
+       - At n=1: V=4
+       - At n=5: V=124
+       - At n=10: V=29,527
+       For n=10, a dense adjacency matrix would consume gigabytes of RAM,
+       while the edge array of planar_3_tree_edges takes about 1 MB.
     
     Args:
         n (int): The number of iterations to perform. 
-        output_format (str): 'list' for an adjacency list (dict of lists) 
+        output_format (str): 'list' for an adjacency list (dict of lists),
+                             'csr' for a sparse adjacency matrix,
+                             'edges' for the (E, 2) edge array
                              or 'matrix' for an adjacency matrix (list of lists).
                              
     Returns:
-        Union[Dict[int, List[int]], List[List[int]]]: The generated graph.
+        The generated graph. Neighbors are listed in the order their edges were created.
     """
-    
-    # Start with K3
-    # Vertices: 0, 1, 2
-    # Adjacency list representation
-    adj = {0: [1, 2], 1: [0, 2], 2: [0, 1]}
-    
-    # Faces are represented by triples of vertices in cyclic order.
-    # Initially, K3 has two faces (the "inside" and "outside").
-    faces = [(0, 1, 2)]
-    # faces = [(0, 1, 2), (0, 2, 1)]
-    
-    next_vertex = 3
-    
-    # Perform n iterations
-    for _ in range(n):
-        new_faces = []
-        for u, v, w in faces:
-            # Create a new vertex in this face
-            z = next_vertex
-            next_vertex += 1
-            
-            # Connect new vertex z to the three vertices of the face
-            adj[z] = [u, v, w]
-            adj[u].append(z)
-            adj[v].append(z)
-            adj[w].append(z)
-            
-            # This face (u, v, w) is replaced by three new triangular faces:
-            # (u, v, z), (v, w, z), (w, u, z)
-            new_faces.append((u, v, z))
-            new_faces.append((v, w, z))
-            new_faces.append((w, u, z))
-            
-        faces = new_faces
-        
+    edges = planar_3_tree_edges(n)
+    if output_format == 'edges':
+        return edges
+
+    n_vertices, _, _ = planar_3_tree_size(n)
+    # Both directions of every edge, grouped by tail in creation order
+    tails = edges.ravel()
+    heads = edges[:, ::-1].ravel()
+    order = np.argsort(tails, kind='stable')
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(tails, minlength=n_vertices))])
+    adjacency_matrix = sparse.csr_array(
+        (np.ones(len(order), dtype=np.int8), heads[order], indptr), shape=(n_vertices, n_vertices)
+    )
+
+    if output_format == 'csr':
+        return adjacency_matrix
     if output_format == 'matrix':
-        num_v = next_vertex
-        # Initialize matrix with 0s
-        matrix = [[0 for _ in range(num_v)] for _ in range(num_v)]
-        # Fill the matrix based on the adjacency list
-        for u, neighbors in adj.items():
-            for v in neighbors:
-                matrix[u][v] = 1
-        return matrix
-    
-    return adj
+        return adjacency_matrix.toarray().astype(int).tolist()
+    if output_format == 'list':
+        neighbors = np.split(adjacency_matrix.indices, indptr[1:-1])
+        return {v: row.tolist() for v, row in enumerate(neighbors)}
+    raise ValueError("output_format must be 'list', 'csr', 'edges' or 'matrix'")
 
 def visualize_planar_3_tree(graph_data: Union[Dict[int, List[int]], List[List[int]]]):
     """
@@ -88,6 +112,9 @@ def visualize_planar_3_tree(graph_data: Union[Dict[int, List[int]], List[List[in
     Args:
         graph_data: Adjacency list (dict) or Adjacency matrix (list of lists).
     """
+    import networkx as nx
+    import matplotlib.pyplot as plt
+
     if isinstance(graph_data, dict):
         G = nx.Graph(graph_data)
     else:
@@ -0,0 +1,265 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from os import getenv
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import io
+import os
+import threading
+import numpy as np
+from numpy.typing import NDArray
+from loguru import logger
+
+# Color per node: class indices mapped through the style's colormap, or explicit colors
+Node_Colors = Union[NDArray[np.int64], Sequence[str]]
+
+@dataclass(frozen=True)
+class Plot_Style:
+    figsize: Tuple[float, float] = (16, 14)
+    dpi: int = 300
+    node_size: float = 1200
+    node_edgecolor: str = '#000000'
+    node_linewidth: float = 2.0
+    edge_color: str = '#000000'
+    edge_width: float = 1.5
+    font_size: float = 11
+    font_weight: str = 'bold'
+    font_color: str = '#000000'
+    # Qualitative colormap for class indices; 'Set2', 'Set3' or 'Paired' suit discrete colorings
+    cmap: str = 'Set3'
+    # Transparent background cropped to the drawing, or the whole figure on white
+    transparent: bool = True
+
+class Render_Queue_Full(RuntimeError):
+    pass
+
+class Graph_Plot:
+    """Edges of one laid-out graph drawn once with the Agg canvas, recolored per render.
+
+    The edges are rendered into a background buffer; a new coloring restores
+    that buffer and only redraws the nodes and their labels on top of it, so
+    the labels can change between renders too.
+    Only the object-oriented Figure API is used, never pyplot's global state.
+    matplotlib is imported here, so only the render processes load it.
+    """
+
+    def __init__(self, labels: List[str], edges: NDArray[np.int64], positions: NDArray[np.float64], style: Plot_Style):
+        import matplotlib
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.collections import LineCollection
+        from matplotlib.figure import Figure
+
+        self.style = style
+        self.labels = list(labels)
+        self.figure = Figure(figsize=style.figsize, dpi=style.dpi, facecolor='none' if style.transparent else 'white')
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.axes = self.figure.add_axes((0, 0, 1, 1))
+        self.axes.set_axis_off()
+        self.axes.set_aspect('equal', adjustable='datalim')
+
+        self.axes.add_collection(LineCollection(
+            positions[edges] if len(edges) else np.zeros((0, 2, 2)),
+            colors=style.edge_color,
+            linewidths=style.edge_width,
+            zorder=1
+        ))
+        self.nodes = self.axes.scatter(
+            positions[:, 0], positions[:, 1],
+            c=np.zeros(len(labels)),
+            cmap=matplotlib.colormaps[style.cmap],
+            s=style.node_size,
+            edgecolors=style.node_edgecolor,
+            linewidths=style.node_linewidth,
+            zorder=2,
+            animated=True
+        )
+        self.texts = [
+            self.axes.text(
+                x, y, label,
+                fontsize=style.font_size, fontfamily="sans-serif", fontweight=style.font_weight, color=style.font_color,
+                ha='center', va='center', zorder=3, animated=True
+            )
+            for label, (x, y) in zip(labels, positions.tolist())
+        ]
+        self.axes.margins(0.05)
+        self.axes.autoscale_view()
+
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+
+    def set_labels(self, labels: List[str]):
+        """Replace the vertex labels; they are drawn with the nodes, not into the background."""
+        for text, label in zip(self.texts, labels):
+            text.set_text(label)
+        self.labels = list(labels)
+
+    def render(self, colors: Node_Colors) -> bytes:
+        """PNG of the graph with the given color per node."""
+        import matplotlib.image
+
+        self.canvas.restore_region(self.background)
+        if isinstance(colors, np.ndarray) and np.issubdtype(colors.dtype, np.integer):
+            self.nodes.set_array(colors)
+            self.nodes.set_clim(colors.min(initial=0), colors.max(initial=0))
+        else:
+            self.nodes.set_array(None)
+            self.nodes.set_facecolor(list(colors))
+        self.axes.draw_artist(self.nodes)
+        for text in self.texts:
+            self.axes.draw_artist(text)
+        image = np.asarray(self.canvas.buffer_rgba())
+
+        if self.style.transparent:
+            rows = np.flatnonzero(image[:, :, 3].any(axis=1))
+            cols = np.flatnonzero(image[:, :, 3].any(axis=0))
+            if len(rows):
+                image = image[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+        buf = io.BytesIO()
+        matplotlib.image.imsave(buf, image, format='png')
+        return buf.getvalue()
+
+# Drawn plots kept by each render process; each holds full-resolution buffers
+_PLOTS: 'OrderedDict[str, Graph_Plot]' = OrderedDict()
+_PLOT_CACHE_SIZE = int(getenv('PLOT_CACHE_SIZE', 2))
+
+def render_plot(
+    key: Optional[str],
+    labels: List[str],
+    edges: NDArray[np.int64],
+    positions: NDArray[np.float64],
+    colors: Node_Colors,
+    style: Plot_Style = Plot_Style(),
+) -> Tuple[bytes, float]:
+    """Render one plot, reusing the drawn edges of key when this process has them.
+
+    key identifies the structure and layout only; the labels of a cached plot
+    are replaced when they differ.
+
+    Returns:
+        Tuple of (PNG bytes, render seconds)
+    """
+    start = perf_counter()
+    plot = _PLOTS.get(key) if key is not None else None
+    if plot is None:
+        plot = Graph_Plot(labels, edges, positions, style)
+        if key is not None and _PLOT_CACHE_SIZE > 0:
+            _PLOTS[key] = plot
+            while len(_PLOTS) > _PLOT_CACHE_SIZE:
+                _PLOTS.popitem(last=False)
+    else:
+        _PLOTS.move_to_end(key)
+        if plot.labels != list(labels):
+            plot.set_labels(labels)
+    return plot.render(colors), perf_counter() - start
+
+def render_plot_file(path: str, *args, **kwargs) -> Tuple[str, float]:
+    """render_plot written straight to path by the render process."""
+    data, seconds = render_plot(*args, **kwargs)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as image_file:
+        image_file.write(data)
+    return path, seconds
+
+class Render_Pool:
+    """Process pool that renders every plot, off the event loop and off pyplot.
+
+    At most max_pending renders are queued or running; submit blocks, or
+    raises Render_Queue_Full when block is False, until a slot frees up. Each
+    render is logged with its queue wait and render time and passed to every
+    listener as (name, render seconds, queue seconds, failed). workers=0
+    renders in the calling thread.
+    """
+
+    def __init__(self, workers: int = 1, max_pending: int = 8):
+        self.workers = workers
+        self.max_pending = max(1, max_pending)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._rendered = 0
+        self._failed = 0
+        self._pending = 0
+        self._render_seconds = 0.0
+        self._wait_seconds = 0.0
+        self.listeners: List[Callable[[str, float, float, bool], None]] = []
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def submit(self, name: str, function: Callable[..., Tuple[Any, float]], *args, block: bool = True, **kwargs) -> Future:
+        """Queue function(*args, **kwargs), which returns (result, render seconds).
+
+        Returns:
+            Future of the result alone
+        """
+        if not self._slots.acquire(blocking=block):
+            raise Render_Queue_Full(f"Render queue is full ({self.max_pending} pending)")
+        with self._lock:
+            self._pending += 1
+        submitted = perf_counter()
+        result: Future = Future()
+
+        def finish(inner: Future):
+            elapsed = perf_counter() - submitted
+            self._slots.release()
+            with self._lock:
+                self._pending -= 1
+                if inner.exception() is not None:
+                    self._failed += 1
+                else:
+                    _, seconds = inner.result()
+                    self._rendered += 1
+                    self._render_seconds += seconds
+                    self._wait_seconds += max(elapsed - seconds, 0.0)
+            seconds = 0.0 if inner.exception() is not None else inner.result()[1]
+            for listener in self.listeners:
+                listener(name, seconds, max(elapsed - seconds, 0.0), inner.exception() is not None)
+            if inner.exception() is not None:
+                logger.error(f'Render {name} failed: {inner.exception()}')
+                result.set_exception(inner.exception())
+            else:
+                logger.debug(f'Render {name}: {seconds:.2f}s rendering, {max(elapsed - seconds, 0.0):.2f}s queued')
+                result.set_result(inner.result()[0])
+
+        executor = self._get_executor()
+        if executor is None:
+            inner: Future = Future()
+            try:
+                inner.set_result(function(*args, **kwargs))
+            except Exception as e:
+                inner.set_exception(e)
+            finish(inner)
+        else:
+            executor.submit(function, *args, **kwargs).add_done_callback(finish)
+        return result
+
+    def shutdown(self, wait: bool = True):
+        """Stop the render processes; the next submit starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Render counts, pending renders and mean render and queue times."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending,
+                'rendered': self._rendered,
+                'failed': self._failed,
+                'mean_render_seconds': self._render_seconds / self._rendered if self._rendered else 0.0,
+                'mean_wait_seconds': self._wait_seconds / self._rendered if self._rendered else 0.0,
+            }
+
+RENDER_POOL = Render_Pool(
+    workers=int(getenv('RENDER_WORKERS', 1)),
+    max_pending=int(getenv('RENDER_QUEUE_SIZE', 8)),
+)
@@ -1,13 +1,144 @@
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass
 from loguru import logger
+from graph.graph_coloring import T_Grid_Graph
 from graph.graph_constants import MODEL_METHOD
+from coloring.adjacency import adjacency_to_csr
+from coloring.r_dynamic import linear_programming_model
+from coloring.verify import assert_valid_coloring
 from utils.check_multigraph import has_repeated_edges
 from star.star_algorithm import T_Star_Grid_Graphs
 from star.star_types import RESULTANT_GRAPHS
+from scipy import sparse
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Tuple
 from tqdm import tqdm
+import os
 import random
 
 random.seed(2)
 
+@dataclass
+class Graph_Solve_Result:
+    index: int
+    status: str
+    # Color per CSR row of the adjacency sent to the worker
+    colors: List[int]
+    colors_used: int
+    wall_time: float
+    worker: int
+
+def solve_compact_graph(index: int, adjacency_matrix: sparse.csr_array, r: int, k: int, solver: str = None) -> Graph_Solve_Result:
+    """Solve the ACR model of one graph given only by its CSR adjacency.
+
+    This is the process pool entry point, so it takes and returns plain data
+    instead of a T_Grid_Graph. The solver runs single-threaded; parallelism
+    comes from the pool.
+    """
+    start = perf_counter()
+    solution = linear_programming_model(
+        adjacency_list=adjacency_matrix,
+        model_name=MODEL_METHOD.ACR,
+        k=k,
+        r=r,
+        solver=solver,
+        threads=1,
+    )
+    colors = list(solution.color_assignment().values()) if solution.has_solution() else []
+    return Graph_Solve_Result(
+        index=index,
+        status=solution.status,
+        colors=colors,
+        colors_used=max(colors) + 1 if colors else 0,
+        wall_time=perf_counter() - start,
+        worker=os.getpid(),
+    )
+
+def graph_executor(workers: Optional[int]):
+    """Process pool for workers > 1, otherwise a context that solves in-process."""
+    if workers is not None and workers > 1:
+        return ProcessPoolExecutor(max_workers=workers)
+    return nullcontext()
+
+def solve_graph_stream(
+    graphs: Iterable[Tuple[int, T_Grid_Graph]],
+    dynamic_coloring_order: int,
+    available_colors: int,
+    order: int,
+    executor: Optional[ProcessPoolExecutor] = None,
+    workers: int = 1,
+    output_directory: str = None,
+    solver: str = None,
+) -> List[Graph_Solve_Result]:
+    """Solve (index, graph) pairs, in the process pool when one is given.
+
+    Only the CSR adjacency of each graph is sent to the workers. At most two
+    graphs per worker are in flight, so the stream is not read ahead further
+    than that. Images go to the render pool, whose bounded queue throttles
+    the stream when rendering falls behind.
+
+    Returns:
+        Solve results sorted by graph index
+    """
+    workers = workers if executor is not None else 1
+    in_flight: Dict[Future, Tuple[T_Grid_Graph, list]] = {}
+    images: List[Future] = []
+    results: List[Graph_Solve_Result] = []
+
+    def finish(graph: T_Grid_Graph, labels: list, result: Graph_Solve_Result):
+        if result.status != "Optimal":
+            raise ValueError(f'Graph {result.index} {graph.details.coordinate.adjacency_list} is  {result.status}')
+        code_colors = dict(zip(labels, result.colors))
+        assert_valid_coloring(graph.details.code.adjacency_list, code_colors, dynamic_coloring_order)
+        if output_directory:
+            graph.coloring_assignment(coloring_function=lambda v: code_colors[graph.details.coordinate.to_other[v]])
+            images.append(graph.graph_image(
+                output_file=f"TStar{order}-{dynamic_coloring_order}-{result.index}.png",
+                output_directory=output_directory,
+                wait=False
+            ))
+        logger.debug(f'Graph {result.index}: {result.colors_used} colors in {result.wall_time:.3f}s on worker {result.worker}')
+        results.append(result)
+
+    def drain(return_when: str):
+        done, _ = wait(in_flight, return_when=return_when)
+        for future in done:
+            finish(*in_flight.pop(future), future.result())
+
+    start = perf_counter()
+    for i, graph in tqdm(graphs):
+
+        if has_repeated_edges(graph.details.code.adjacency_list):
+            logger.info(f'Graph {i} {graph.details.coordinate.adjacency_list} has repeated edges')
+            continue
+
+        labels, adjacency_matrix = adjacency_to_csr(graph.details.code.adjacency_list)
+        if executor is None:
+            finish(graph, labels, solve_compact_graph(i, adjacency_matrix, dynamic_coloring_order, available_colors, solver))
+            continue
+
+        if len(in_flight) >= 2 * workers:
+            drain(FIRST_COMPLETED)
+        future = executor.submit(solve_compact_graph, i, adjacency_matrix, dynamic_coloring_order, available_colors, solver)
+        in_flight[future] = (graph, labels)
+
+    if in_flight:
+        drain(ALL_COMPLETED)
+    # Images render in the background while solving continues; surface any failure
+    for image in images:
+        image.result()
+
+    elapsed = perf_counter() - start
+    busy = sum(result.wall_time for result in results)
+    if results:
+        logger.info(
+            f'T-star {order}, r={dynamic_coloring_order}: {len(results)} graphs in {elapsed:.2f}s on {workers} workers, '
+            f'per graph mean {busy / len(results):.3f}s max {max(result.wall_time for result in results):.3f}s, '
+            f'utilization {busy / (elapsed * workers):.0%}'
+        )
+    return sorted(results, key=lambda result: result.index)
+
 def solve_max_degree(
     dynamic_coloring_order: int,
     available_colors: int,
@@ -15,49 +146,40 @@ def solve_max_degree(
     end_order: int = None,
     max_graphs: int = -1,
     output_directory: str = None,
-    sample_graphs: int = None
+    sample_graphs: int = None,
+    workers: int = None,
+    solver: str = None
 ):
     if end_order == None:
         end_order = start_order
 
     response = {}
 
-    for order in tqdm(range(start_order, end_order + 1)):
-        graph_class = T_Star_Grid_Graphs(order, dynamic_coloring_order, available_colors)
-        graph_class.define_graph(max_graphs, RESULTANT_GRAPHS.MAX_DEGREE)
-
-        logger.info("Total graphs: ", len(graph_class.TOTAL_GRAPHS))
-
-        if sample_graphs:
-            graph_class.TOTAL_GRAPHS = random.sample(graph_class.TOTAL_GRAPHS, sample_graphs)
+    with graph_executor(workers) as executor:
+        for order in tqdm(range(start_order, end_order + 1)):
+            graph_class = T_Star_Grid_Graphs(order, dynamic_coloring_order, available_colors)
+            graph_class.define_graph(max_graphs, RESULTANT_GRAPHS.MAX_DEGREE)
+
+            logger.info(f'Total graphs: {len(graph_class.TOTAL_GRAPHS)}')
+
+            if sample_graphs:
+                graph_class.TOTAL_GRAPHS = random.sample(graph_class.TOTAL_GRAPHS, sample_graphs)
+
+            results = solve_graph_stream(
+                enumerate(graph_class.TOTAL_GRAPHS),
+                dynamic_coloring_order,
+                available_colors,
+                order,
+                executor=executor,
+                workers=workers or 1,
+                output_directory=output_directory,
+                solver=solver,
+            )
 
-        colors: list[int] = []
-        for i, graph in tqdm(enumerate(graph_class.TOTAL_GRAPHS)):
+            distinct_colors = set(result.colors_used for result in results)
 
-            if has_repeated_edges(graph.details.code.adjacency_list):
-                logger.info(f'Graph {i} {graph.details.coordinate.adjacency_list} has repeated edges')
-                continue
+            response[order] = list(distinct_colors)
 
-            solution_status = graph.linear_programming_model(
-                model_name=MODEL_METHOD.ACR, 
-                previous_variables=None,
-            )
-
-            if solution_status != "Optimal":
-                raise ValueError(f'Graph {i} {graph.details.coordinate.adjacency_list} is  {solution_status}')
-            
-            colors_used = graph.coloring_assignment(coloring_function=None)
-            if output_directory:
-                graph.graph_image(
-                    output_file=f"TStar{order}-{dynamic_coloring_order}-{i}.png", 
-                    output_directory=output_directory
-                )
-            colors.append(colors_used)
-
-        distinct_colors = set(colors)
-
-        response[order] = list(distinct_colors)
-            
     return response
 
 def solve_full_set(
@@ -67,49 +189,45 @@ def solve_full_set(
     end_order: int = None,
     max_graphs: int = -1,
     output_directory: str = None,
-    sample_graphs: int = None
+    sample_graphs: int = None,
+    workers: int = None,
+    solver: str = None
 ):
+    """Solve one representative per isomorphism class of the full T-star set.
+
+    Graphs are solved as the enumeration streams them, in a pool of workers
+    processes when workers > 1, so only the graphs in flight are held. The
+    report logged per order lists, for every class, how many enumerated graphs
+    it covers, the colors its representative needs and its solve time.
+    """
 
     if end_order == None:
         end_order = start_order
 
     response = {}
 
-    for order in tqdm(range(start_order, end_order + 1)):
-        graph_class = T_Star_Grid_Graphs(order, dynamic_coloring_order, available_colors)
-        graph_class.define_graph(max_graphs, RESULTANT_GRAPHS.FULL_SET)
-
-        logger.info("Total graphs: ", graph_class.TOTAL_GRAPHS)
-        if sample_graphs:
-            graph_class.TOTAL_GRAPHS = random.sample(graph_class.TOTAL_GRAPHS, sample_graphs)
-
-        print(len(graph_class.TOTAL_GRAPHS))
+    with graph_executor(workers) as executor:
+        for order in tqdm(range(start_order, end_order + 1)):
+            graph_class = T_Star_Grid_Graphs(order, dynamic_coloring_order, available_colors)
+
+            results = solve_graph_stream(
+                graph_class.iterate_graphs(max_graphs, RESULTANT_GRAPHS.FULL_SET, sample_graphs),
+                dynamic_coloring_order,
+                available_colors,
+                order,
+                executor=executor,
+                workers=workers or 1,
+                output_directory=output_directory,
+                solver=solver,
+            )
 
-        colors: list[int] = []
-        for i, graph in tqdm(enumerate(graph_class.TOTAL_GRAPHS)):
+            multiplicity = graph_class.TOTAL_GRAPHS_MULTIPLICITY
+            logger.info(f'T-star {order}, r={dynamic_coloring_order}: {len(results)} classes solved covering {sum(multiplicity[result.index] for result in results)} of {graph_class.RAW_GRAPHS} graphs enumerated ({len(multiplicity)} classes)')
+            for result in results:
+                logger.info(f'  class {result.index}: {multiplicity[result.index]} graphs, {result.colors_used} colors, {result.wall_time:.3f}s')
 
-            if has_repeated_edges(graph.details.code.adjacency_list):
-                logger.info(f'Graph {i} {graph.details.coordinate.adjacency_list} has repeated edges')
-                continue
+            distinct_colors = set(result.colors_used for result in results)
 
-            solution_status = graph.linear_programming_model(
-                model_name=MODEL_METHOD.ACR, 
-                previous_variables=None,
-            )
+            response[order] = list(distinct_colors)
 
-            if solution_status != "Optimal":
-                raise ValueError(f'Graph {i} {graph.details.coordinate.adjacency_list} is  {solution_status}')
-            
-            colors_used = graph.coloring_assignment(coloring_function=None)
-            if output_directory:
-                graph.graph_image(
-                    output_file=f"TStar{order}-{dynamic_coloring_order}-{i}.png", 
-                    output_directory=output_directory
-                )
-            colors.append(colors_used)
-
-        distinct_colors = set(colors)
-
-        response[order] = list(distinct_colors)
-            
-    return response
\ No newline at end of file
+    return response